@@ -1,10 +1,11 @@
 import jsonschema
-import requests
 import logging
 
 from UPISAS.exceptions import ServerNotReachable, IncompleteJSONSchema
+from UPISAS.transport import HTTPTransport
 
 pull_image_tasks = {}
+_default_transport = None
 
 
 def show_progress(line, progress):
@@ -22,25 +23,92 @@ def show_progress(line, progress):
         progress.update(pull_image_tasks[id], completed=line['progressDetail']['current'])
 
 
-def get_response_for_get_request(url):
-    try:
-        logging.info("GET request to " + str(url))
-        response = requests.get(url)
-        return response
-    except requests.exceptions.ConnectionError as e:
-        logging.error(e)
-        logging.error("Please check that the server is reachable and retry.")
-        raise ServerNotReachable
+def get_response_for_get_request(url, transport=None, headers=None):
+    """ Perform a GET request through the given transport, or through a shared pooled one if none is given."""
+    global _default_transport
+    if transport is None:
+        if _default_transport is None:
+            _default_transport = HTTPTransport()
+        transport = _default_transport
+    if headers:
+        return transport.get(url, headers=headers)
+    return transport.get(url)
+
+
+_validator_cache = {}
+_VALIDATOR_CACHE_SIZE = 64
+_STRUCTURAL_KEYWORDS = {"type", "properties", "items", "required", "title", "description", "$schema", "$id"}
+
+
+class _CompiledSchema:
+    """ A JSON Schema checked once against its meta-schema, together with everything validate_schema needs per call."""
+
+    def __init__(self, json_schema):
+        self.json_schema = json_schema
+        self.complete = bool(json_schema) and "type" in json_schema and "properties" in json_schema
+        if self.complete:
+            self.keys = frozenset(json_schema["properties"].keys())
+            self.structural = _is_structural(json_schema)
+        self.last_shape = None
+        self._validator = None
+
+    def validate(self, json_instance):
+        if self._validator is None:
+            validator_class = jsonschema.validators.validator_for(self.json_schema)
+            validator_class.check_schema(self.json_schema)
+            self._validator = validator_class(self.json_schema)
+        self._validator.validate(json_instance)
+
+
+def _is_structural(json_schema):
+    """ True if the schema only constrains the shape of an instance (types and nesting), not its values."""
+    if not isinstance(json_schema, dict) or not set(json_schema.keys()) <= _STRUCTURAL_KEYWORDS:
+        return False
+    if "properties" in json_schema and not all(_is_structural(s) for s in json_schema["properties"].values()):
+        return False
+    return "items" not in json_schema or _is_structural(json_schema["items"])
+
+
+def _shape(json_instance):
+    """ A fingerprint of an instance which is equal for two instances iff they have the same keys, nesting and types."""
+    if isinstance(json_instance, dict):
+        return tuple((key, _shape(value)) for key, value in json_instance.items())
+    if isinstance(json_instance, list):
+        return (list, tuple(_shape(value) for value in json_instance))
+    return type(json_instance)
+
+
+def _compile_schema(json_schema):
+    # Keyed by identity; the entry keeps a reference to the schema so that its id cannot be reused.
+    # A schema mutated in place after it was first used needs clear_validator_cache().
+    compiled = _validator_cache.get(id(json_schema))
+    if compiled is None or compiled.json_schema is not json_schema:
+        if len(_validator_cache) >= _VALIDATOR_CACHE_SIZE:
+            del _validator_cache[next(iter(_validator_cache))]
+        compiled = _CompiledSchema(json_schema)
+        _validator_cache[id(json_schema)] = compiled
+    return compiled
+
+
+def clear_validator_cache():
+    _validator_cache.clear()
 
 
 def validate_schema(json_instance, json_schema):
     try:
         incomplete_warning_message = "No complete JSON Schema provided for validation"
-        if json_schema and "type" in json_schema and "properties" in json_schema:
-            json_instance_keys = sorted(json_instance.keys())
-            json_schema_keys = sorted(json_schema["properties"].keys())
-            if json_instance_keys == json_schema_keys:
-                jsonschema.validate(json_instance, json_schema)
+        compiled = _compile_schema(json_schema)
+        if compiled.complete:
+            if compiled.keys == json_instance.keys():
+                if compiled.structural:
+                    # Fingerprint fast path: a purely structural schema accepts every instance
+                    # with the same shape as one it already accepted.
+                    shape = _shape(json_instance)
+                    if shape != compiled.last_shape:
+                        compiled.validate(json_instance)
+                        compiled.last_shape = shape
+                else:
+                    compiled.validate(json_instance)
                 logging.info("JSON object validated by JSON Schema")
             else:
                 logging.error(incomplete_warning_message + " Keys misaligned")
@@ -54,4 +122,3 @@ def validate_schema(json_instance, json_schema):
     except jsonschema.exceptions.SchemaError as error:
         logging.error(f"SchemaError in validating JSON object with JSON Schema: {error}")
         raise
-
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+
+from UPISAS.async_transport import AsyncHTTPTransport
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.strategy import PREFETCHED_ENDPOINTS, SCHEMA_CACHE_DIR, Strategy, _load_cached_schemas, _store_cached_schemas
+
+
+class AsyncStrategy(Strategy):
+    """
+    A Strategy whose monitor, execute and get_* methods are coroutines running on an async HTTP client.
+    analyze() and plan() stay synchronous; run_loop() drives the whole MAPE-K loop, and
+    run_loops() lets a single event loop drive many exemplars at once.
+    """
+
+    def _default_transport(self):
+        create_transport = getattr(self.exemplar, "create_transport", None)
+        transport = create_transport(asynchronous=True) if create_transport is not None else None
+        return transport if transport is not None else AsyncHTTPTransport()
+
+    async def ping(self):
+        ping_res = await self._perform_get_request(self.exemplar.base_endpoint)
+        logging.info(f"ping result: {ping_res}")
+
+    async def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=False):
+        with self._measure("monitor"):
+            fresh_data = await self._perform_get_request(endpoint_suffix)
+            if with_validation:
+                if(not self.knowledge.monitor_schema): await self.get_monitor_schema()
+            return self._update_monitored_data(fresh_data, with_validation, verbose)
+
+    async def monitor_batch(self, endpoint_suffix="monitor_batch", with_validation=True, verbose=False):
+        with self._measure("monitor"):
+            url = f"{self.exemplar.base_endpoint}/{endpoint_suffix}?since={self.monitor_cursor}"
+            with self._http_call("GET", endpoint_suffix):
+                response = await self.transport.get(url)
+            batch = self._check_get_response(response)
+            if with_validation:
+                if(not self.knowledge.monitor_schema): await self.get_monitor_schema()
+            return self._update_monitored_batch(batch, with_validation, verbose)
+
+    async def execute(self, adaptation=None, endpoint_suffix="execute", with_validation=True, force=False):
+        with self._measure("execute"):
+            if(not adaptation): adaptation= self.knowledge.plan_data
+            if with_validation:
+                if(not self.knowledge.execute_schema): await self.get_execute_schema()
+                self._validate(adaptation, self.knowledge.execute_schema, "execute")
+            if self.coalesce_window and not force:
+                return self._coalesce(adaptation, endpoint_suffix)
+            if not force and self._is_applied(adaptation):
+                return True
+            return await self._put_adaptation(adaptation, endpoint_suffix)
+
+    async def flush_executions(self):
+        adaptation, endpoint_suffix = self._take_pending_adaptation()
+        if adaptation is not None:
+            await self._put_adaptation(adaptation, endpoint_suffix)
+
+    async def _put_adaptation(self, adaptation, endpoint_suffix):
+        url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
+        with self._http_call("PUT", endpoint_suffix):
+            response = await self.transport.put(url, json=adaptation)
+        return self._check_execute_response(response, adaptation)
+
+    def _schedule_flush(self, delay):
+        return asyncio.get_running_loop().call_later(delay, self._start_background_flush)
+
+    def _start_background_flush(self):
+        # The event loop only keeps a weak reference to its tasks.
+        self._flush_task = asyncio.ensure_future(self._flush_in_background())
+
+    async def _flush_in_background(self):
+        try:
+            await self.flush_executions()
+        except Exception as e:
+            logging.error(f"could not execute the coalesced adaptation: {e!r}")
+
+    async def get_adaptation_options(self, endpoint_suffix: "API Endpoint" = "adaptation_options", with_validation=True):
+        adaptation_options, modified = await self._perform_conditional_get_request(endpoint_suffix)
+        if not modified and adaptation_options is self.knowledge.adaptation_options:
+            return
+        if with_validation:
+            if(not self.knowledge.adaptation_options_schema): await self.get_adaptation_options_schema()
+        self._update_adaptation_options(adaptation_options, with_validation)
+
+    async def get_monitor_schema(self, endpoint_suffix = "monitor_schema"):
+        self._update_schema("monitor_schema", *await self._perform_conditional_get_request(endpoint_suffix))
+
+    async def get_execute_schema(self, endpoint_suffix = "execute_schema"):
+        self._update_schema("execute_schema", *await self._perform_conditional_get_request(endpoint_suffix))
+
+    async def get_adaptation_options_schema(self, endpoint_suffix: "API Endpoint" = "adaptation_options_schema"):
+        self._update_schema("adaptation_options_schema",
+                            *await self._perform_conditional_get_request(endpoint_suffix))
+
+    async def prefetch_schemas(self, with_validation=True, cache_dir=SCHEMA_CACHE_DIR):
+        cache_path = self._schema_cache_path(cache_dir)
+        documents = _load_cached_schemas(cache_path)
+        if documents is None:
+            responses = await asyncio.gather(*[self._perform_conditional_get_request(e) for e in PREFETCHED_ENDPOINTS])
+            documents = {endpoint: document for endpoint, (document, _) in zip(PREFETCHED_ENDPOINTS, responses)}
+            _store_cached_schemas(cache_path, documents)
+        self._update_prefetched(documents, with_validation)
+
+    async def _perform_get_request(self, endpoint_suffix: "API Endpoint"):
+        url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
+        with self._http_call("GET", endpoint_suffix):
+            response = await self.transport.get(url)
+        return self._check_get_response(response)
+
+    async def _perform_conditional_get_request(self, endpoint_suffix: "API Endpoint"):
+        url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
+        headers = self._conditional_headers(endpoint_suffix)
+        with self._http_call("GET", endpoint_suffix):
+            response = await (self.transport.get(url, headers=headers) if headers else self.transport.get(url))
+        return self._check_conditional_get_response(endpoint_suffix, response)
+
+    async def run_loop(self, period: "Seconds between the start of two ticks",
+                       budget: "Seconds to run for, forever if None" = None,
+                       with_validation=True):
+        '''Runs monitor -> analyze -> plan -> execute every period seconds until the budget is spent'''
+        loop = asyncio.get_running_loop()
+        deadline = None if budget is None else loop.time() + budget
+        while deadline is None or loop.time() < deadline:
+            tick_start = loop.time()
+            try:
+                await self.monitor(with_validation=with_validation)
+                if self.analyze():
+                    if self.plan():
+                        await self.execute(with_validation=with_validation)
+            except ServerNotReachable as e:
+                # One unreachable exemplar skips its ticks without stopping the loops of the others.
+                logging.warning(f"tick of {self.exemplar.base_endpoint} failed: {e!r}")
+                self.metrics.increment("failed_ticks")
+            await asyncio.sleep(max(0.0, period - (loop.time() - tick_start)))
+
+    async def close(self):
+        try:
+            await self.flush_executions()
+        finally:
+            self.loop_logger.close()
+            await self.transport.close()
+            if self.knowledge_log is not None:
+                self.knowledge_log.close()
+
+
+async def run_loops(strategies, period, budget=None, with_validation=True):
+    '''
+    Drives the MAPE-K loops of several AsyncStrategy instances concurrently on the current event loop. A loop
+    failing stops alone, the strategies being closed once every loop is done. Returns the error that stopped the
+    loop of each strategy, None for those which ran their whole budget.
+    '''
+    try:
+        results = await asyncio.gather(*[strategy.run_loop(period, budget, with_validation) for strategy in strategies],
+                                       return_exceptions=True)
+        for strategy, result in zip(strategies, results):
+            if isinstance(result, BaseException):
+                logging.error(f"loop of {strategy.exemplar.base_endpoint} stopped: {result!r}")
+                strategy.metrics.increment("failed_loops")
+    finally:
+        await asyncio.gather(*[strategy.close() for strategy in strategies])
+    return [result if isinstance(result, BaseException) else None for result in results]
@@ -0,0 +1,55 @@
+import asyncio
+import time
+import logging
+from collections import deque
+
+import aiohttp
+
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.transport import LatencyRecord, Response
+
+
+class AsyncHTTPTransport:
+    """
+    The asyncio counterpart of HTTPTransport, used by an AsyncStrategy.
+    Many transports can share one event loop, each keeping its own pool of keep-alive connections.
+    """
+
+    def __init__(self, pool_size: "Max number of pooled connections per host" = 4,
+                 connect_timeout: "Seconds to wait for a connection to be established" = 3.05,
+                 read_timeout: "Seconds to wait for the server to send a response" = 30,
+                 latency_history: "Number of latency records to keep" = 1000):
+        '''Create an instance of the AsyncHTTPTransport class'''
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.latencies = deque(maxlen=latency_history)
+        self.session = None
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def put(self, url, json=None, **kwargs):
+        return await self.request("PUT", url, json=json, **kwargs)
+
+    async def request(self, method, url, **kwargs):
+        if self.session is None or self.session.closed:
+            # A ClientSession is bound to the event loop it is created in, hence the lazy creation.
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_size)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        logging.info(f"{method} request to {url}")
+        start = time.perf_counter()
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                content = await response.read()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            self.latencies.append(LatencyRecord(method, url, None, time.perf_counter() - start))
+            logging.error(e)
+            logging.error("Please check that the server is reachable and retry.")
+            raise ServerNotReachable
+        self.latencies.append(LatencyRecord(method, url, response.status, time.perf_counter() - start))
+        # A copy of the headers, looked up case-insensitively like the headers of requests.
+        return Response(response.status, content, response.headers.copy())
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
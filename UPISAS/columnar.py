@@ -0,0 +1,348 @@
+import os
+import re
+import json
+import glob
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from UPISAS.knowledge import Knowledge
+
+# Promotion order of column dtypes: a column only ever moves to the right.
+_DTYPE_ORDER = [np.dtype(np.bool_), np.dtype(np.int64), np.dtype(np.float64), np.dtype(object)]
+_MISSING = {np.dtype(np.float64): np.nan, np.dtype(object): None}
+
+
+def _dtype_of(value):
+    if value is None:
+        return np.dtype(np.float64)
+    if isinstance(value, (bool, np.bool_)):
+        return np.dtype(np.bool_)
+    if isinstance(value, (int, np.integer)):
+        return np.dtype(np.int64)
+    if isinstance(value, (float, np.floating)):
+        return np.dtype(np.float64)
+    return np.dtype(object)
+
+
+def _promote(a, b):
+    return _DTYPE_ORDER[max(_DTYPE_ORDER.index(a), _DTYPE_ORDER.index(b))]
+
+
+class Column:
+    """
+    The history of one scalar metric, kept in a growable typed NumPy array.
+    Indexing and iteration behave like the list it replaces, and values gives a zero-copy array view.
+    Columns sharing a time index (another Column of timestamps) support last/since/window queries.
+    """
+
+    def __init__(self, dtype, capacity=64, index=None):
+        '''Create an instance of the Column class'''
+        self._data = np.empty(capacity, dtype=dtype)
+        self._length = 0
+        # Number of values which are not held in self._data, always 0 for an in-memory Column.
+        self._offset = 0
+        self.index = index
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def values(self):
+        return self._data[:self._length]
+
+    def append(self, value):
+        dtype = _promote(self.dtype, _dtype_of(value))
+        if dtype != self.dtype:
+            self.astype(dtype)
+        stored = self._length - self._offset
+        if stored == len(self._data):
+            grown = np.empty(2 * len(self._data), dtype=self.dtype)
+            grown[:stored] = self._data[:stored]
+            self._data = grown
+        self._data[stored] = _MISSING.get(self.dtype, value) if value is None else value
+        self._length += 1
+
+    def append_missing(self, count=1):
+        '''Pads the column with NaN (or None for object columns), e.g. for samples in which the metric was absent'''
+        if self.dtype not in _MISSING:
+            self.astype(np.dtype(np.float64))
+        for _ in range(count):
+            self.append(None)
+
+    def astype(self, dtype):
+        self._data = self._data.astype(dtype)
+
+    def last(self, n):
+        '''A view of the last n values'''
+        return self._range(max(0, self._length - n), self._length)
+
+    def since(self, t):
+        '''A view of the values with a timestamp of at least t'''
+        return self._range(self.index._search(t, "left"), self._length)
+
+    def window(self, t0, t1):
+        '''A view of the values with a timestamp in [t0, t1]'''
+        return self._range(self.index._search(t0, "left"), self.index._search(t1, "right"))
+
+    def _range(self, start, stop):
+        return self.values[start:stop]
+
+    def _search(self, t, side):
+        return int(np.searchsorted(self.values, t, side=side))
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def __repr__(self):
+        return f"Column({self.values!r})"
+
+
+class SpillingColumn(Column):
+    """
+    A Column which keeps at most 2 * hot_window values in memory and spills the older ones to an append-only
+    file, read back through a memory map. Columns of objects cannot be memory-mapped and stay in memory.
+    """
+
+    def __init__(self, dtype, path_stem, hot_window=4096, index=None):
+        '''Create an instance of the SpillingColumn class'''
+        super().__init__(dtype, capacity=2 * hot_window, index=index)
+        self.path_stem = path_stem
+        self.hot_window = hot_window
+        self._map = None
+
+    @property
+    def path(self):
+        return f"{self.path_stem}.{self.dtype.name}.col"
+
+    @property
+    def hot_values(self):
+        return self._data[:self._length - self._offset]
+
+    @property
+    def values(self):
+        if not self._offset:
+            return self.hot_values
+        return np.concatenate([self._spilled_values(), self.hot_values])
+
+    def append(self, value):
+        if self._length - self._offset == len(self._data) and self.dtype != object:
+            self.spill(self.hot_window)
+        super().append(value)
+
+    def spill(self, count=None):
+        '''Moves the oldest count in-memory values (all of them if None) to the column file'''
+        stored = self._length - self._offset
+        count = stored if count is None else min(count, stored)
+        if self.dtype == object or not count:
+            return
+        with open(self.path, "ab") as f:
+            f.write(self._data[:count].tobytes())
+        self._data[:stored - count] = self._data[count:stored]
+        self._offset += count
+
+    def astype(self, dtype):
+        if not self._offset or dtype == self.dtype:
+            super().astype(dtype)
+            return
+        spilled = np.array(self._spilled_values(), dtype=dtype)
+        self._map = None
+        os.remove(self.path)
+        hot = self.hot_values.astype(dtype)
+        if dtype == object:
+            self._data = np.concatenate([spilled, hot, np.empty(len(self._data), dtype=dtype)])
+            self._offset = 0
+            return
+        self._data = np.empty(len(self._data), dtype=dtype)
+        self._data[:len(hot)] = hot
+        with open(self.path, "ab") as f:
+            f.write(spilled.tobytes())
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_map"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Values spilled after this state was saved (e.g. in a snapshot) are dropped from the file.
+        if self._offset and os.path.getsize(self.path) > self._offset * self.dtype.itemsize:
+            os.truncate(self.path, self._offset * self.dtype.itemsize)
+
+    def _spilled_values(self):
+        if self._map is None or len(self._map) != self._offset:
+            self._map = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(self._offset,))
+        return self._map
+
+    def _range(self, start, stop):
+        stop = max(start, stop)
+        if start >= self._offset:
+            return self._data[start - self._offset:stop - self._offset]
+        if stop <= self._offset:
+            return self._spilled_values()[start:stop]
+        return np.concatenate([self._spilled_values()[start:], self._data[:stop - self._offset]])
+
+    def _search(self, t, side):
+        if self._offset:
+            boundary = self._spilled_values()[-1]
+            if t < boundary or (side == "left" and t == boundary):
+                return int(np.searchsorted(self._spilled_values(), t, side=side))
+        return self._offset + int(np.searchsorted(self.hot_values, t, side=side))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and index.step in (None, 1):
+            start, stop, _ = index.indices(self._length)
+            return self._range(start, stop)
+        if isinstance(index, (int, np.integer)):
+            position = index + self._length if index < 0 else index
+            if not 0 <= position < self._length:
+                raise IndexError("column index out of range")
+            if position >= self._offset:
+                return self._data[position - self._offset]
+            return self._spilled_values()[position]
+        return self.values[index]
+
+
+def load_spilled_history(spill_dir):
+    """
+    Memory-maps the full history written by a ColumnarKnowledge with a spill_dir, for post-run analysis.
+    Returns the array of sample times and a dict of arrays per flattened metric. Call flush() on the knowledge first.
+    """
+    with open(os.path.join(spill_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    def load(stem):
+        paths = glob.glob(os.path.join(spill_dir, glob.escape(stem)) + ".*.col")
+        if not paths or not os.path.getsize(paths[0]):
+            return np.empty(0)
+        return np.memmap(paths[0], dtype=paths[0].rsplit(".", 2)[1], mode="r")
+
+    return load(manifest["times"]), {key: load(stem) for key, stem in manifest["columns"].items()}
+
+
+def flatten_record(record, separator=".", record_id_keys=(), prefix=""):
+    """
+    Flattens a nested monitored sample into a dict of scalar values with dotted keys.
+    Lists of records are keyed by the first of record_id_keys they contain, or by their position otherwise;
+    e.g. {"utilization": [{"server": "s1", "utilization_value": 0.3}]} becomes {"utilization.s1.utilization_value": 0.3}.
+    """
+    flat = {}
+    if isinstance(record, dict):
+        for key, value in record.items():
+            flat.update(flatten_record(value, separator, record_id_keys, f"{prefix}{separator}{key}" if prefix else str(key)))
+    elif isinstance(record, (list, tuple)):
+        for index, value in enumerate(record):
+            name = index
+            if isinstance(value, dict):
+                id_key = next((k for k in record_id_keys if k in value), None)
+                if id_key is not None:
+                    name = value[id_key]
+                    value = {k: v for k, v in value.items() if k != id_key}
+            flat.update(flatten_record(value, separator, record_id_keys, f"{prefix}{separator}{name}"))
+    else:
+        flat[prefix] = record
+    return flat
+
+
+@dataclass
+class ColumnarKnowledge(Knowledge):
+    """
+    A Knowledge whose monitored_data maps flattened metric names to typed NumPy columns.
+    All columns have one entry per monitored sample, metrics missing from a sample being stored as NaN,
+    so that analysis over the whole history is array math.
+    With a spill_dir, only the last hot_window to 2 * hot_window samples of each metric are kept in memory,
+    older ones being appended to memory-mapped column files in that directory.
+    """
+
+    separator: str = "."
+    record_id_keys: tuple = ("id", "name", "server_id", "server")
+    spill_dir: str = None
+    hot_window: int = 4096
+
+    def __post_init__(self):
+        if self.max_samples is not None or self.max_age is not None:
+            raise ValueError("ColumnarKnowledge does not support a retention policy")
+        self.sample_count = 0
+        self._file_stems = {}
+        if self.spill_dir is not None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        self.times = None
+        self.times = self._new_column(np.dtype(np.float64), "__time__")
+        # The time column is its own index, for since/window queries on the times themselves.
+        self.times.index = self.times
+
+    def _new_column(self, dtype, key):
+        if self.spill_dir is None:
+            return Column(dtype, index=self.times)
+        stem = f"{len(self._file_stems):05d}_{re.sub(r'[^A-Za-z0-9_.-]', '_', key)}"
+        self._file_stems[key] = stem
+        self._write_manifest()
+        return SpillingColumn(dtype, os.path.join(self.spill_dir, stem), self.hot_window, index=self.times)
+
+    def _write_manifest(self):
+        manifest = {"times": self._file_stems["__time__"],
+                    "columns": {key: stem for key, stem in self._file_stems.items() if key != "__time__"}}
+        with open(os.path.join(self.spill_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+    def flush(self):
+        '''Spills every in-memory sample to the column files, so that load_spilled_history sees the whole run'''
+        if self.spill_dir is None:
+            return
+        for column in [self.times] + list(self.monitored_data.values()):
+            column.spill()
+
+    def add_sample(self, sample, timestamp=None):
+        data = self.monitored_data
+        flat = flatten_record(sample, self.separator, self.record_id_keys)
+        self.times.append(time.monotonic() if timestamp is None else float(timestamp))
+        for key, value in flat.items():
+            if key not in data:
+                data[key] = self._new_column(_dtype_of(value), key)
+                if self.sample_count:
+                    data[key].append_missing(self.sample_count)
+            data[key].append(value)
+            self._update_stats(key, value)
+        if len(flat) < len(data):
+            for key, column in data.items():
+                if len(column) == self.sample_count:
+                    column.append_missing()
+        self.sample_count += 1
+
+    def add_samples(self, samples, timestamps):
+        '''Appends a batch of monitored samples, in order, flattening each like add_sample'''
+        for sample, timestamp in zip(samples, timestamps):
+            self.add_sample(sample, timestamp)
+
+    def array(self, key):
+        '''Returns a view of the history of a flattened metric (a copy once part of it was spilled to disk)'''
+        return self.monitored_data[key].values
+
+    def columns(self, prefix):
+        '''Returns the views of all the metrics whose flattened name starts with prefix'''
+        start = prefix + self.separator
+        return {key[len(start):]: column.values for key, column in self.monitored_data.items() if key.startswith(start)}
+
+    def matrix(self, prefix, field=None):
+        '''
+        Returns a (samples x records) float array of a list-of-records metric, e.g. matrix("utilization", "utilization_value").
+        Records that are absent from a sample are NaN.
+        '''
+        suffix = "" if field is None else self.separator + field
+        names = [name for name in self.columns(prefix) if name.endswith(suffix)
+                 and self.separator not in name[:len(name) - len(suffix)]]
+        if not names:
+            return np.empty((self.sample_count, 0))
+        start = prefix + self.separator
+        return np.column_stack([self.monitored_data[start + name].values.astype(np.float64) for name in names])
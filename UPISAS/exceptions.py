@@ -16,3 +16,7 @@ class EndpointNotReachable(UPISASException):
 
 class IncompleteJSONSchema(UPISASException):
     pass
+
+
+class CircuitOpen(ServerNotReachable):
+    pass
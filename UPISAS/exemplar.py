@@ -1,7 +1,7 @@
 import docker
 from abc import ABC, abstractmethod
 from rich.progress import Progress
-from UPISAS import show_progress
+from UPISAS import show_progress, tracing
 import logging
 from docker.errors import DockerException
 from UPISAS.exceptions import DockerImageNotFoundOnDockerHub
@@ -15,11 +15,23 @@ class Exemplar(ABC):
     """
     _container_name = ""
     def __init__(self, base_endpoint: "string with the URL of the exemplar's HTTP server", \
-                 docker_kwargs,
+                 docker_kwargs: "Arguments of the docker container, None if the exemplar is not run in docker" = None,
                  auto_start: "Whether to immediately start the container after creation" =False,
                  ):
         '''Create an instance of the Exemplar class'''
         self.base_endpoint = base_endpoint
+        self.exemplar_container = self._create_container(docker_kwargs)
+        if auto_start:
+            self.start_container()
+
+    def _create_container(self, docker_kwargs):
+        '''
+        Creates the container whose lifecycle is managed by this class, pulling its image if needed.
+        Exemplars not run in docker override it to return an object with the same start/stop/pause/unpause/
+        remove/reload methods and status attribute, or leave the container to None if it is managed elsewhere.
+        '''
+        if docker_kwargs is None:
+            return None
         image_name = docker_kwargs["image"]
         image_owner = image_name.split("/")[0]
         try:
@@ -39,13 +51,20 @@ class Exemplar(ABC):
                     logging.error(f"image '{image_name}' not found on DockerHub, exiting!")
                     raise DockerImageNotFoundOnDockerHub
             docker_kwargs["detach"] = True
-            self.exemplar_container = docker_client.containers.create(**docker_kwargs)
+            return docker_client.containers.create(**docker_kwargs)
         except DockerException as e:
             # TODO: Properly catch various errors. Currently, a lot of errors might be caught here.
             # Please check the logs if that happens.
             raise e
-        if auto_start:
-            self.start_container()
+
+    def create_transport(self, asynchronous: "Whether the transport is for an AsyncStrategy" = False):
+        '''The transport through which a Strategy reaches this exemplar when it is not given one, HTTP if None'''
+        return None
+
+    def image_digest(self):
+        '''The id of the image the container was created from, which identifies the schemas it serves; None if unknown'''
+        attrs = getattr(self.exemplar_container, "attrs", None)
+        return attrs.get("Image") if attrs else None
 
     @abstractmethod
     def start_run(self):
@@ -59,7 +78,8 @@ class Exemplar(ABC):
                 logging.warning("container already running...")
             else:
                 logging.info("starting container...")
-                self.exemplar_container.start()
+                with tracing.span("start_container", "container", self.base_endpoint):
+                    self.exemplar_container.start()
             return True
         except docker.errors.NotFound as e:
             logging.error(e)
@@ -75,7 +95,8 @@ class Exemplar(ABC):
                     self.exemplar_container = None
             else:
                 logging.info("stopping container...")
-                self.exemplar_container.stop()
+                with tracing.span("stop_container", "container", self.base_endpoint):
+                    self.exemplar_container.stop()
                 if remove:
                     self.exemplar_container.remove()
                     self.exemplar_container = None
@@ -90,7 +111,8 @@ class Exemplar(ABC):
             container_status = self.get_container_status()
             if container_status == "running":
                 logging.info("pausing container...")
-                self.exemplar_container.pause()
+                with tracing.span("pause_container", "container", self.base_endpoint):
+                    self.exemplar_container.pause()
                 return True
             elif container_status == "paused":
                 logging.warning("container already paused...")
@@ -108,7 +130,8 @@ class Exemplar(ABC):
             container_status = self.get_container_status()
             if container_status == "paused":
                 logging.info("unpausing container...")
-                self.exemplar_container.unpause()
+                with tracing.span("unpause_container", "container", self.base_endpoint):
+                    self.exemplar_container.unpause()
                 return True
             elif container_status == "running":
                 logging.warning("container already running (why unpause it?)...")
@@ -122,6 +145,7 @@ class Exemplar(ABC):
 
     def get_container_status(self):
         if self.exemplar_container:
-            self.exemplar_container.reload()
+            with tracing.span("reload", "container", self.base_endpoint):
+                self.exemplar_container.reload()
             return self.exemplar_container.status
         return "removed"
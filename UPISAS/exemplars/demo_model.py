@@ -0,0 +1,50 @@
+import random
+
+GET_ENDPOINTS = ("monitor", "adaptation_options", "monitor_schema", "execute_schema", "adaptation_options_schema")
+
+
+def model_payloads(model):
+    '''Functions returning the body of every GET endpoint of openapi.yaml (plus the "alive" root) for a model'''
+    payloads = {"": lambda: "alive", "monitor": model.monitor}
+    for endpoint in GET_ENDPOINTS[1:]:
+        payloads[endpoint] = lambda endpoint=endpoint: getattr(model, endpoint)
+    return payloads
+
+
+def demo_function(x, y):
+    '''f(x,y) of demo-managed-system/app.js, with a global minimum of 0.0198944 at (0.51681, 1.00861)'''
+    return 0.4 + -1 * (0.3 * (1 - x) * x + y * (2 - y) * 0.3 + x * y / 100)
+
+
+class DemoModel:
+    """
+    A Python model of the demo managed system (demo-managed-system/app.js): it monitors f(x,y), optionally
+    scaled by a random factor, at the (x, y) configuration last executed. Exemplars that do not run a container
+    (StubExemplar, InProcessExemplar) serve any object with the same attributes and methods.
+    """
+
+    monitor_schema = {"type": "object", "properties": {"f": {"type": "number"}}}
+    execute_schema = {"type": "object", "properties": {"x": {"type": "number"}, "y": {"type": "number"}}}
+    adaptation_options = {"x": {"start": -4.0, "stop": 6.0, "type": "continuous"},
+                          "y": {"start": -10.0, "stop": 10.0, "type": "continuous"}}
+    adaptation_options_schema = {"type": "object", "properties": {
+        name: {"type": "object", "properties": {"start": {"type": "number"}, "stop": {"type": "number"},
+                                                "type": {"type": "string"}}}
+        for name in ("x", "y")}}
+
+    def __init__(self, enable_random: "Whether f is scaled by a uniform random factor, as in app.js" = True,
+                 seed: "Seed of the random factor" = None):
+        '''Create an instance of the DemoModel class'''
+        self.enable_random = enable_random
+        self.random = random.Random(seed)
+        self.x = 0.0
+        self.y = 0.0
+
+    def monitor(self):
+        rnd = self.random.random() if self.enable_random else 1
+        return {"f": rnd * demo_function(self.x, self.y)}
+
+    def execute(self, adaptation):
+        # Like app.js, a missing or zero value leaves the current one unchanged.
+        self.x = adaptation.get("x") or self.x
+        self.y = adaptation.get("y") or self.y
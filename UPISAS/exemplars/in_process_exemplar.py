@@ -0,0 +1,56 @@
+import itertools
+
+from UPISAS.exemplar import Exemplar
+from UPISAS.exemplars.demo_model import DemoModel
+from UPISAS.in_process_transport import AsyncInProcessTransport, InProcessTransport
+
+_ids = itertools.count()
+
+
+class _ModelContainer:
+    """ The lifecycle of an in-process model: requests are only served while it is running."""
+
+    def __init__(self):
+        self.status = "created"
+
+    def start(self):
+        self.status = "running"
+
+    def stop(self):
+        self.status = "exited"
+
+    def pause(self):
+        self.status = "paused"
+
+    def unpause(self):
+        self.status = "running"
+
+    def remove(self):
+        self.status = "removed"
+
+    def reload(self):
+        pass
+
+
+class InProcessExemplar(Exemplar):
+    """
+    An exemplar whose managed system is a Python model (by default a DemoModel) living in the strategy's process.
+    A Strategy given this exemplar and no transport calls the model directly through an InProcessTransport,
+    skipping HTTP and serialization altogether.
+    """
+
+    def __init__(self, auto_start: "Whether to immediately start the model after creation" = False,
+                 model: "Model of the managed system, a DemoModel if None" = None):
+        '''Create an instance of the InProcessExemplar class'''
+        self.model = model if model is not None else DemoModel()
+        super().__init__(f"inprocess://{type(self.model).__name__}-{next(_ids)}", None, auto_start)
+
+    def _create_container(self, docker_kwargs):
+        return _ModelContainer()
+
+    def create_transport(self, asynchronous=False):
+        return AsyncInProcessTransport(self) if asynchronous else InProcessTransport(self)
+
+    def start_run(self, *args):
+        '''The model is run by the requests of the strategy'''
+        pass
@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import deque
+
+
+class MonitorHistory:
+    """
+    The samples monitored by a model, numbered by a cursor, as served by /monitor_batch: a client passes the
+    cursor of the last batch it got to receive every sample monitored since. The oldest samples are dropped
+    beyond capacity, and a batch reports how many samples the client missed because of it.
+    """
+
+    def __init__(self, capacity: "Max number of samples kept" = 1000):
+        '''Create an instance of the MonitorHistory class'''
+        self.samples = deque(maxlen=capacity)
+        self.cursor = 0
+        self._lock = threading.Lock()
+        self._appended = threading.Condition(self._lock)
+
+    def append(self, sample):
+        with self._appended:
+            self.samples.append({"time": time.time(), "data": sample})
+            self.cursor += 1
+            self._appended.notify_all()
+
+    def since(self, cursor: "Cursor returned with the last batch, 0 for every sample kept"):
+        '''The /monitor_batch payload of the samples monitored since the cursor'''
+        with self._lock:
+            first = self.cursor - len(self.samples)
+            if cursor > self.cursor:
+                # The cursor was given by an earlier run of the managed system.
+                cursor = 0
+            start = max(cursor, first)
+            return {"cursor": self.cursor, "time": time.time(), "dropped": start - cursor,
+                    "samples": list(self.samples)[start - first:]}
+
+    def notify(self):
+        '''Wakes the threads waiting for a sample up, e.g. for a server to close its streams'''
+        with self._appended:
+            self._appended.notify_all()
+
+    def wait(self, cursor, timeout: "Max seconds to wait, forever if None" = None):
+        '''Waits for a sample to be monitored after the cursor, or for notify(), and returns the samples since it'''
+        with self._appended:
+            # Not wait_for, so that notify() wakes the waiters up even without a new sample.
+            if self.cursor <= cursor:
+                self._appended.wait(timeout)
+        return self.since(cursor)
@@ -0,0 +1,88 @@
+import json
+import logging
+import time
+
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.exemplars.demo_model import GET_ENDPOINTS
+from UPISAS.exemplars.in_process_exemplar import InProcessExemplar
+from UPISAS.recording import read_trace
+
+
+class ReplayModel:
+    """
+    Serves the responses of a trace recorded by a RecordingTransport back in the recorded order, as a model for
+    InProcessExemplar or StubExemplar. Once the recorded monitor samples are exhausted the exemplar becomes
+    unreachable; every other endpoint keeps serving its last recorded response. Requests are answered as fast as
+    possible, or at the recorded pace (scaled by speed). The adaptations it receives are kept in executed, to be
+    compared with the recorded ones in recorded_executions.
+    """
+
+    def __init__(self, path: "Trace written by a RecordingTransport",
+                 speed: "Replay speed relative to the recording, as fast as possible if None" = None):
+        '''Create an instance of the ReplayModel class'''
+        self.speed = speed
+        self.responses = {endpoint: [] for endpoint in GET_ENDPOINTS}
+        self.recorded_executions = []
+        self.executed = []
+        for record in read_trace(path):
+            if record.status_code >= 300:
+                # Errors, and revalidations answered with 304 Not Modified, have no document to replay.
+                continue
+            if record.method == "PUT":
+                self.recorded_executions.append(json.loads(record.request) if record.request else None)
+            elif record.endpoint in self.responses:
+                self.responses[record.endpoint].append((record.time, json.loads(record.response)))
+        self._served = {endpoint: 0 for endpoint in GET_ENDPOINTS}
+        self._start = None
+
+    def _next(self, endpoint):
+        responses = self.responses[endpoint]
+        served = self._served[endpoint]
+        if served >= len(responses):
+            if endpoint == "monitor" or not responses:
+                logging.error(f"no more recorded responses of /{endpoint} to replay")
+                raise ServerNotReachable
+            served = len(responses) - 1
+        self._served[endpoint] = served + 1
+        recorded_at, payload = responses[served]
+        if self.speed is not None:
+            if self._start is None:
+                self._start = time.monotonic() - recorded_at / self.speed
+            time.sleep(max(0.0, self._start + recorded_at / self.speed - time.monotonic()))
+        return payload
+
+    def monitor(self):
+        return self._next("monitor")
+
+    def execute(self, adaptation):
+        self.executed.append(adaptation)
+
+    @property
+    def adaptation_options(self):
+        return self._next("adaptation_options")
+
+    @property
+    def monitor_schema(self):
+        return self._next("monitor_schema")
+
+    @property
+    def execute_schema(self):
+        return self._next("execute_schema")
+
+    @property
+    def adaptation_options_schema(self):
+        return self._next("adaptation_options_schema")
+
+
+class ReplayExemplar(InProcessExemplar):
+    """
+    An exemplar replaying a recorded trace in process, so that a strategy can be rerun deterministically,
+    without containers and without the randomness of the recorded exemplar.
+    To replay over HTTP instead, e.g. to benchmark the client stack, serve a ReplayModel from a StubExemplar.
+    """
+
+    def __init__(self, path: "Trace written by a RecordingTransport",
+                 speed: "Replay speed relative to the recording, as fast as possible if None" = None,
+                 auto_start=False):
+        '''Create an instance of the ReplayExemplar class'''
+        super().__init__(auto_start, ReplayModel(path, speed))
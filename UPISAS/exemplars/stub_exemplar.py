@@ -0,0 +1,232 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from UPISAS.exemplar import Exemplar
+from UPISAS.exemplars.demo_model import DemoModel, model_payloads
+from UPISAS.exemplars.monitor_history import MonitorHistory
+
+# Seconds between two comments sent on an idle /monitor_stream, to keep the connection and its client alive.
+_STREAM_HEARTBEAT = 1.0
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.stub.handle(self, "GET")
+
+    def do_PUT(self):
+        self.server.stub.handle(self, "PUT")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubServer:
+    """
+    The threaded HTTP server of a StubExemplar, with the lifecycle methods and status of a docker container
+    so that the Exemplar base class manages it like one: requests hang while it is paused, as they would on a
+    paused container.
+    """
+
+    def __init__(self, stub, host, port):
+        self.stub = stub
+        self.host = host
+        self.port = port
+        self.status = "created"
+        self._server = None
+        self._thread = None
+        self._unpaused = threading.Event()
+        self._unpaused.set()
+        self._bind()
+
+    def _bind(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self.stub
+        self.port = self._server.server_port
+
+    def start(self):
+        if self._server is None:
+            self._bind()
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), name="upisas-stub-exemplar",
+                                        daemon=True)
+        self._thread.start()
+        self.status = "running"
+
+    def stop(self):
+        self._unpaused.set()
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+        self.status = "exited"
+        # Open streams end as soon as they see the server stopped.
+        self.stub.history.notify()
+
+    def pause(self):
+        self._unpaused.clear()
+        self.status = "paused"
+
+    def unpause(self):
+        self._unpaused.set()
+        self.status = "running"
+
+    def remove(self):
+        if self._server is not None:
+            self.stop()
+        self.status = "removed"
+
+    def reload(self):
+        pass
+
+    def wait_unpaused(self):
+        self._unpaused.wait()
+
+
+class StubExemplar(Exemplar):
+    """
+    A pure-Python exemplar serving the endpoints of openapi.yaml from a threaded HTTP server instead of a docker
+    container, for testing and benchmarking strategies without a container runtime. The payloads come from a model
+    (by default a DemoModel, i.e. the demo managed system), and can be overridden per endpoint. Latency and errors
+    can be injected, globally or per endpoint. /monitor_batch serves the samples taken every sample_period seconds,
+    or a single fresh sample per request if sample_period is None, and /monitor_stream pushes the samples taken
+    every sample_period seconds as Server-Sent Events.
+    """
+
+    def __init__(self, auto_start: "Whether to immediately start the server after creation" = False,
+                 model: "Model of the managed system, a DemoModel if None" = None,
+                 payloads: "Functions returning the body of a GET endpoint, by endpoint, overriding the model" = None,
+                 latency: "Seconds added to every response, or a dict of seconds by endpoint" = 0.0,
+                 error_rate: "Probability that a request fails, or a dict of probabilities by endpoint" = 0.0,
+                 error_status: "HTTP status of the injected errors" = 500,
+                 host="127.0.0.1",
+                 port: "Port to listen on, a free one if 0" = 0,
+                 seed: "Seed of the error injection" = None,
+                 sample_period: "Seconds between two samples of the model kept for /monitor_batch" = None,
+                 history_size: "Max number of samples kept for /monitor_batch" = 1000):
+        '''Create an instance of the StubExemplar class'''
+        self.model = model if model is not None else DemoModel()
+        self.payloads = model_payloads(self.model)
+        self.payloads.update(payloads or {})
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.history = MonitorHistory(history_size)
+        self.sample_period = sample_period
+        self._server = _StubServer(self, host, port)
+        super().__init__(f"http://{host}:{self._server.port}", None, auto_start)
+        if sample_period is not None:
+            threading.Thread(target=self._sample, name="upisas-stub-sampler", daemon=True).start()
+
+    def _create_container(self, docker_kwargs):
+        return self._server
+
+    def start_run(self, *args):
+        '''The stub serves its model as soon as it is started'''
+        pass
+
+    def _sample(self):
+        while self._server.status != "removed":
+            time.sleep(self.sample_period)
+            if self._server.status == "running":
+                self._take_sample()
+
+    def _take_sample(self):
+        with self._lock:
+            sample = self.payloads["monitor"]()
+        self.history.append(sample)
+
+    def handle(self, handler, method):
+        endpoint, _, query = handler.path.partition("?")
+        endpoint = endpoint.strip("/")
+        self.requests[(method, endpoint)] += 1
+        # The body is always read, so that the connection can be kept alive whatever the response.
+        body = handler.rfile.read(int(handler.headers.get("Content-Length", 0)))
+        self._server.wait_unpaused()
+        latency = _for_endpoint(self.latency, endpoint)
+        if latency:
+            time.sleep(latency)
+        if self._random.random() < _for_endpoint(self.error_rate, endpoint):
+            return _respond(handler, self.error_status, b"injected error", "text/plain")
+        if method == "GET" and endpoint == "monitor_stream":
+            return self._stream(handler)
+        if method == "GET" and endpoint == "monitor_batch":
+            if self.sample_period is None:
+                self._take_sample()
+            since = int(parse_qs(query).get("since", ["0"])[0])
+            body = json.dumps(self.history.since(since)).encode()
+            return _respond(handler, 200, body, "application/json", {"Cache-Control": "no-store"})
+        if method == "GET" and endpoint in self.payloads:
+            with self._lock:
+                payload = self.payloads[endpoint]()
+            if isinstance(payload, str):
+                return _respond(handler, 200, payload.encode(), "text/plain")
+            body = json.dumps(payload).encode()
+            # Like the demo managed system, every document has an ETag and may be revalidated with If-None-Match.
+            headers = {"ETag": f'"{hashlib.sha1(body).hexdigest()}"',
+                       "Cache-Control": "no-store" if endpoint == "monitor" else "no-cache"}
+            if handler.headers.get("If-None-Match") == headers["ETag"]:
+                return _respond(handler, 304, b"", None, headers)
+            return _respond(handler, 200, body, "application/json", headers)
+        if method == "PUT" and endpoint == "execute":
+            adaptation = json.loads(body or b"{}")
+            with self._lock:
+                self.model.execute(adaptation)
+            return _respond(handler, 200, b"ok", "text/plain")
+        return _respond(handler, 404, b"not found", "text/plain")
+
+    def _stream(self, handler):
+        try:
+            cursor = int(handler.headers["Last-Event-ID"]) + 1
+        except (TypeError, ValueError):
+            cursor = self.history.cursor
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Cache-Control", "no-store")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.close_connection = True
+        try:
+            while self._server.status in ("running", "paused"):
+                batch = self.history.wait(cursor, _STREAM_HEARTBEAT)
+                self._server.wait_unpaused()
+                events = [b": keep-alive\n\n"] if not batch["samples"] else []
+                first = batch["cursor"] - len(batch["samples"])
+                for event_id, sample in enumerate(batch["samples"], first):
+                    events.append(f"id: {event_id}\ndata: {json.dumps(sample)}\n\n".encode())
+                handler.wfile.write(b"".join(events))
+                handler.wfile.flush()
+                cursor = batch["cursor"]
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def _for_endpoint(value, endpoint):
+    if isinstance(value, dict):
+        return value.get(endpoint, 0)
+    return value
+
+
+def _respond(handler, status, body, content_type, headers=None):
+    handler.send_response(status)
+    if content_type is not None:
+        handler.send_header("Content-Type", content_type)
+    for name, value in (headers or {}).items():
+        handler.send_header(name, value)
+    if status != 304:
+        handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
@@ -0,0 +1,173 @@
+import itertools
+
+import numpy as np
+
+BASIC_SERVICE_TIME = 0.04452713
+
+
+class SWIMSimulator:
+    """
+    A NumPy surrogate of SWIM simulating many independent scenarios at once: each has its own servers
+    (booting for boot_delay seconds after being added), dimmer and arrival rate, and is served by a
+    processor-sharing queue with a backlog when overloaded. Every step() advances all scenarios by one
+    evaluation period, after which monitor_arrays() holds the same fields as SWIM's /monitor, one value per scenario.
+
+    It is also a model for InProcessExemplar and StubExemplar: monitor() steps and returns the /monitor
+    payload of the first scenario, and execute() applies an adaptation to every scenario.
+    """
+
+    execute_schema = {"type": "object", "properties": {"server_number": {"type": "integer"},
+                                                       "dimmer_factor": {"type": "number"}}}
+    adaptation_options_schema = {"type": "object", "properties": {
+        name: {"type": "object", "properties": {"start": {"type": "number"}, "stop": {"type": "number"},
+                                                "type": {"type": "string"}}}
+        for name in ("server_number", "dimmer_factor")}}
+    monitor_schema = {"type": "object", "properties": {
+        "dimmer_factor": {"type": "number"},
+        "servers": {"type": "integer"},
+        "active_servers": {"type": "integer"},
+        "max_servers": {"type": "integer"},
+        "utilization": {"type": "array", "items": {"type": "object",
+                                                   "properties": {"utilization_value": {"type": "number"}}}},
+        "basic_rt": {"type": "number"},
+        "opt_rt": {"type": "number"},
+        "basic_throughput": {"type": "number"},
+        "opt_throughput": {"type": "number"},
+        "arrival_rate": {"type": "number"}}}
+
+    def __init__(self, scenarios: "Number of scenarios simulated in parallel" = 1,
+                 arrival_rate: "Requests per second: a number, an array of one rate per step (optionally per scenario), "
+                               "or a function of the step returning one rate per scenario, a noisy daily cycle if None" = None,
+                 max_servers=3,
+                 initial_servers=1,
+                 initial_dimmer=1.0,
+                 boot_delay: "Seconds before an added server serves requests" = 120.0,
+                 period: "Seconds of one evaluation period" = 60.0,
+                 basic_service_time: "Mean seconds to serve a request without optional content" = BASIC_SERVICE_TIME,
+                 opt_service_time: "Mean seconds to serve a request with optional content" = 1.5 * BASIC_SERVICE_TIME,
+                 seed: "Seed of the default arrival rates" = None):
+        '''Create an instance of the SWIMSimulator class'''
+        self.scenarios = scenarios
+        self.max_servers = max_servers
+        self.boot_delay = boot_delay
+        self.period = period
+        self.basic_service_time = basic_service_time
+        self.opt_service_time = opt_service_time
+        self.adaptation_options = {"server_number": {"start": 1, "stop": max_servers, "type": "discrete"},
+                                   "dimmer_factor": {"start": 0.0, "stop": 1.0, "type": "continuous"}}
+        self._arrival_rate = arrival_rate if arrival_rate is not None else \
+            daily_arrival_rates(scenarios, period, np.random.default_rng(seed))
+        self.time_step = 0
+        self.servers = np.full(scenarios, initial_servers, dtype=np.int64)
+        self.active_servers = self.servers.copy()
+        self.dimmer = np.full(scenarios, float(initial_dimmer))
+        self.boot_remaining = np.zeros(scenarios)
+        self.backlog = np.zeros(scenarios)
+        self.observation = None
+
+    def arrival_rates(self, step):
+        rate = self._arrival_rate
+        if callable(rate):
+            rate = rate(step)
+        elif np.ndim(rate) >= 1:
+            rate = np.asarray(rate)[..., step % np.shape(rate)[-1]]
+        return np.broadcast_to(np.asarray(rate, dtype=np.float64), (self.scenarios,))
+
+    def step(self):
+        '''Simulates one evaluation period of every scenario, and returns its monitored fields'''
+        booted = self.boot_remaining > 0
+        self.boot_remaining = np.maximum(0.0, self.boot_remaining - self.period)
+        self.active_servers = np.where(booted & (self.boot_remaining == 0), self.servers, self.active_servers)
+
+        arrival_rate = self.arrival_rates(self.time_step)
+        service_time = (1 - self.dimmer) * self.basic_service_time + self.dimmer * self.opt_service_time
+        capacity = self.active_servers / service_time
+        served = np.minimum(arrival_rate + self.backlog / self.period, capacity)
+        self.backlog = np.maximum(0.0, self.backlog + (arrival_rate - served) * self.period)
+        utilization = np.minimum(served / np.maximum(capacity, 1e-12), 0.99)
+        queueing = self.backlog / np.maximum(capacity, 1e-12)
+        self.observation = {
+            "dimmer_factor": self.dimmer.copy(),
+            "servers": self.servers.copy(),
+            "active_servers": self.active_servers.copy(),
+            "max_servers": np.full(self.scenarios, self.max_servers),
+            "utilization": utilization,
+            "basic_rt": self.basic_service_time / (1 - utilization) + queueing,
+            "opt_rt": self.opt_service_time / (1 - utilization) + queueing,
+            "basic_throughput": served * (1 - self.dimmer),
+            "opt_throughput": served * self.dimmer,
+            "arrival_rate": arrival_rate,
+        }
+        self.time_step += 1
+        return self.observation
+
+    def monitor_arrays(self):
+        '''The monitored fields of the last period, one array element per scenario'''
+        return self.observation if self.observation is not None else self.step()
+
+    def execute_arrays(self, server_number, dimmer_factor, where: "Mask of the scenarios to adapt, all if None" = None):
+        target = np.clip(np.broadcast_to(server_number, (self.scenarios,)), 1, self.max_servers).astype(np.int64)
+        dimmer = np.clip(np.broadcast_to(dimmer_factor, (self.scenarios,)), 0.0, 1.0)
+        if where is not None:
+            target = np.where(where, target, self.servers)
+            dimmer = np.where(where, dimmer, self.dimmer)
+        added = target > self.servers
+        self.boot_remaining = np.where(added, self.boot_delay, self.boot_remaining)
+        self.active_servers = np.minimum(self.active_servers, target)
+        self.boot_remaining = np.where(self.active_servers == target, 0.0, self.boot_remaining)
+        self.servers = target
+        self.dimmer = dimmer
+
+    def monitor(self, scenario=0):
+        '''Steps every scenario and returns the /monitor payload of one of them'''
+        observation = self.step()
+        sample = {key: values[scenario].item() for key, values in observation.items() if key != "utilization"}
+        sample["utilization"] = [{"utilization_value": observation["utilization"][scenario].item()}
+                                 for _ in range(int(observation["active_servers"][scenario]))]
+        return sample
+
+    def execute(self, adaptation):
+        self.execute_arrays(adaptation.get("server_number", self.servers),
+                            adaptation.get("dimmer_factor", self.dimmer))
+
+
+def daily_arrival_rates(scenarios, period, rng, mean=40.0, amplitude=0.5, noise=0.1):
+    '''One day of arrival rates per scenario: a sinusoidal daily cycle with a random phase and multiplicative noise'''
+    steps = max(1, int(round(86400 / period)))
+    phase = rng.uniform(0, 2 * np.pi, size=(scenarios, 1))
+    cycle = 1 + amplitude * np.sin(2 * np.pi * np.arange(steps) / steps + phase)
+    return mean * cycle * rng.lognormal(0.0, noise, size=(scenarios, steps))
+
+
+def sweep(rt_thresholds, dimmer_margins,
+          steps: "Evaluation periods simulated" = 1440,
+          repetitions: "Scenarios simulated per pair of thresholds" = 1,
+          **simulator_kwargs):
+    '''
+    Evaluates ReactiveAdaptationManager for every pair of RT_THRESHOLD and DIMMER_MARGIN at once, in a single
+    SWIMSimulator with one scenario per pair and repetition, and returns one array per result, one element per scenario.
+    '''
+    from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager, reactive_plan
+    from UPISAS.swim_utility import UTILITY_KEYS, utility
+
+    grid = np.array(list(itertools.product(rt_thresholds, dimmer_margins)), dtype=np.float64)
+    rt_threshold = np.repeat(grid[:, 0], repetitions)
+    dimmer_margin = np.repeat(grid[:, 1], repetitions)
+    simulator = SWIMSimulator(scenarios=len(rt_threshold), **simulator_kwargs)
+    totals = {key: np.zeros(simulator.scenarios) for key in ("basic_rt", "servers", "dimmer_factor", "utility")}
+    violations = np.zeros(simulator.scenarios)
+    adaptations = np.zeros(simulator.scenarios)
+    for _ in range(steps):
+        observation = simulator.step()
+        observation["utility"] = utility(*(observation[key] for key in UTILITY_KEYS), rt_threshold=rt_threshold,
+                                         max_service_rate=ReactiveAdaptationManager.MAX_SERVICE_RATE)
+        for key, total in totals.items():
+            total += observation[key]
+        violations += observation["basic_rt"] > rt_threshold
+        server_number, dimmer_factor, execute = reactive_plan(observation, rt_threshold, dimmer_margin)
+        simulator.execute_arrays(server_number, dimmer_factor, where=execute)
+        adaptations += execute
+    results = {"rt_threshold": rt_threshold, "dimmer_margin": dimmer_margin,
+               "rt_violations": violations / steps, "adaptations": adaptations}
+    results.update({f"mean_{key}": total / steps for key, total in totals.items()})
+    return results
@@ -11,10 +11,14 @@ from typing import Dict, List, Any, Optional
 from pathlib import Path
 from os.path import dirname, realpath
 import time
-import statistics
+import json
+import numpy
 
 from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager
 from UPISAS.exemplars.swim import SWIM
+from UPISAS.shared_knowledge import publish_knowledge, SharedKnowledge
+from UPISAS import tracing
+from UPISAS.swim_utility import history_utility, OnlineUtility
 
 
 
@@ -37,8 +41,12 @@ class RunnerConfig:
     This can be essential to accommodate for cooldown periods on some systems."""
     time_between_runs_in_ms:    int             = 1000
 
+    """Whether to write a Chrome trace of the strategy and exemplar operations (trace.json) in every run directory."""
+    trace:                      bool            = False
+
     exemplar = None
     strategy = None
+    utility = None
     # Dynamic configurations can be one-time satisfied here before the program takes the config as-is
     # e.g. Setting some variable based on some criteria
     def __init__(self):
@@ -80,6 +88,8 @@ class RunnerConfig:
     def before_run(self) -> None:
         """Perform any activity required before starting a run.
         No context is available here as the run is not yet active (BEFORE RUN)"""
+        if self.trace:
+            tracing.enable()
         self.exemplar = SWIM(auto_start=True)
         self.strategy = ReactiveAdaptationManager(self.exemplar)
         time.sleep(3)
@@ -90,6 +100,7 @@ class RunnerConfig:
         For example, starting the target system to measure.
         Activities after starting the run should also be performed here."""
         self.strategy.RT_THRESHOLD = float(context.run_variation['rt_threshold'])
+        self.utility = OnlineUtility(self.strategy.RT_THRESHOLD, self.strategy.MAX_SERVICE_RATE)
 
         self.exemplar.start_run()
         time.sleep(3)
@@ -102,15 +113,15 @@ class RunnerConfig:
     def interact(self, context: RunnerContext) -> None:
         """Perform any interaction with the running target system here, or block here until the target finishes."""
         time_slept = 0
-        self.strategy.get_monitor_schema()
-        self.strategy.get_adaptation_options_schema()
-        self.strategy.get_execute_schema()
+        self.strategy.prefetch_schemas()
 
         
 
         while time_slept < 10:
             
             self.strategy.monitor(verbose=True)
+            self.utility.update_from(self.strategy.knowledge)
+            output.console_log(f"utility: {self.utility.last:.2f} (total {self.utility.total:.2f})")
             if self.strategy.analyze():
                 if self.strategy.plan():
                     self.strategy.execute()
@@ -129,6 +140,7 @@ class RunnerConfig:
     def stop_run(self, context: RunnerContext) -> None:
         """Perform any activity here required for stopping the run.
         Activities after stopping the run should also be performed here."""
+        self.strategy.close()
         self.exemplar.stop_container()
         output.console_log("Config.stop_run() called!")
 
@@ -139,43 +151,31 @@ class RunnerConfig:
 
         output.console_log("Config.populate_run_data() called!")
 
-        basicRevenue = 1
-        optRevenue = 1.5
-        serverCost = 10
-        
-        precision = 1e-5
-        mon_data = self.strategy.knowledge.monitored_data
-        utilities = []
-        print("MON DATA")
-        print(mon_data)
-        for i in range(len(mon_data["max_servers"])):
-
-            maxServers = int(mon_data["max_servers"][i])
-            arrivalRateMean = mon_data["arrival_rate"][i]
-            dimmer = mon_data["dimmer_factor"][i]
-            maxThroughput = maxServers * self.strategy.MAX_SERVICE_RATE
-            avgServers = mon_data["servers"][i]
-            avgResponseTime = (mon_data["basic_rt"][i] * mon_data["basic_throughput"][i] + mon_data["opt_rt"][i] * mon_data["opt_throughput"][i]) / (mon_data["basic_throughput"][i] + mon_data["opt_throughput"][i])
-
-            Ur = (arrivalRateMean * ((1 - dimmer) * basicRevenue + dimmer * optRevenue))
-            Uc = serverCost * (maxServers - avgServers)
-            UrOpt = arrivalRateMean * optRevenue
-            utility = 0
-
-            if(avgResponseTime <= self.strategy.RT_THRESHOLD and Ur >= UrOpt - precision):
-                utility = Ur + Uc
-            else:                
-                if(avgResponseTime <= self.strategy.RT_THRESHOLD):
-                    utility = Ur
-                else:
-                    utility = min(0.0, arrivalRateMean - maxThroughput) * optRevenue
-            utilities.append(utility)
-        
-        return {"utility" : utilities}
+        utilities = history_utility(self.strategy.knowledge.monitored_data, self.strategy.RT_THRESHOLD,
+                                    self.strategy.MAX_SERVICE_RATE)
+        numpy.savetxt(context.run_dir / "utility.csv", utilities, header="utility", comments="")
+
+        self.strategy.metrics.export(context.run_dir)
+        tracer = tracing.disable()
+        if tracer is not None:
+            tracer.flush(context.run_dir / "trace.json")
+
+        # Runs execute in a subprocess: hand the monitored history over to after_experiment through shared memory.
+        with open(context.run_dir / "knowledge_shm.json", "w") as f:
+            json.dump(publish_knowledge(self.strategy.knowledge), f)
+
+        return {"utility" : float(utilities.sum())}
 
     def after_experiment(self) -> None:
         """Perform any activity required after stopping the experiment here
         Invoked only once during the lifetime of the program."""
+        for manifest_path in sorted(self.experiment_path.glob("*/knowledge_shm.json")):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            with SharedKnowledge(manifest) as shared:
+                if "basic_rt" in shared.columns:
+                    output.console_log(f"{manifest_path.parent.name}: {len(shared.columns['basic_rt'])} samples, "
+                                       f"mean basic_rt {shared.columns['basic_rt'].mean():.3f}")
         output.console_log("Config.after_experiment() called!")
 
     # ================================ DO NOT ALTER BELOW THIS LINE ================================
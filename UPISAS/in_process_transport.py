@@ -0,0 +1,63 @@
+import json
+
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.exemplars.demo_model import model_payloads
+from UPISAS.transport import Response, Transport
+
+
+class _DirectResponse(Response):
+    """ A response carrying the payload object itself, which is only serialized if its content is read."""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.headers = {}
+        self.payload = payload
+
+    @property
+    def content(self):
+        return json.dumps(self.payload).encode()
+
+    def json(self):
+        return self.payload
+
+
+class InProcessTransport(Transport):
+    """
+    A transport calling the model of an InProcessExemplar directly: no socket, no HTTP and no JSON
+    serialization, so that a strategy can be evaluated against the model at simulation speed.
+    """
+
+    def __init__(self, exemplar):
+        '''Create an instance of the InProcessTransport class'''
+        self.exemplar = exemplar
+        self.payloads = model_payloads(exemplar.model)
+        self._prefix = exemplar.base_endpoint + "/"
+
+    def request(self, method, url, json=None, **kwargs):
+        if self.exemplar.exemplar_container is None or self.exemplar.exemplar_container.status != "running":
+            raise ServerNotReachable
+        endpoint = url[len(self._prefix):] if url.startswith(self._prefix) else ""
+        if method == "GET" and endpoint in self.payloads:
+            return _DirectResponse(200, self.payloads[endpoint]())
+        if method == "PUT" and endpoint == "execute":
+            self.exemplar.model.execute(json)
+            return _DirectResponse(200, "ok")
+        return _DirectResponse(404, None)
+
+
+class AsyncInProcessTransport(InProcessTransport):
+    """
+    The InProcessTransport of an AsyncStrategy.
+    """
+
+    async def get(self, url, **kwargs):
+        return InProcessTransport.request(self, "GET", url, **kwargs)
+
+    async def put(self, url, json=None, **kwargs):
+        return InProcessTransport.request(self, "PUT", url, json=json, **kwargs)
+
+    async def request(self, method, url, **kwargs):
+        return InProcessTransport.request(self, method, url, **kwargs)
+
+    async def close(self):
+        pass
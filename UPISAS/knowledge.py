@@ -1,4 +1,190 @@
-from dataclasses import dataclass
+import time
+from numbers import Real
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from UPISAS.running_stats import RunningStats
+
+
+class _TimeIndexed:
+    """
+    Time-windowed queries for a sequence whose values were appended with non-decreasing timestamps.
+    Lookups are binary searches on the time index, and results are views valid until the next append.
+    """
+
+    def last(self, n):
+        '''The last n values'''
+        return SeriesView(self, max(0, len(self) - n), len(self))
+
+    def since(self, t):
+        '''The values with a timestamp of at least t'''
+        return SeriesView(self, self._bisect(t), len(self))
+
+    def window(self, t0, t1):
+        '''The values with a timestamp in [t0, t1]'''
+        return SeriesView(self, self._bisect(t0), self._bisect(t1, right=True))
+
+    def _bisect(self, t, right=False):
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._time_at(middle) < t or (right and self._time_at(middle) == t):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+class SeriesView(Sequence):
+    """
+    A zero-copy view on a contiguous range of a time-indexed sequence. Its times attribute is the matching view on the timestamps.
+    """
+
+    def __init__(self, source, start, stop, of_times=False):
+        self._source = source
+        self._start = start
+        self._stop = max(start, stop)
+        self._of_times = of_times
+
+    @property
+    def times(self):
+        return SeriesView(self._source, self._start, self._stop, of_times=True)
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SeriesView index out of range")
+        if self._of_times:
+            return self._source._time_at(self._start + index)
+        return self._source[self._start + index]
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"SeriesView({list(self)!r})"
+
+
+class Series(_TimeIndexed, list):
+    """
+    The unbounded history of a monitored key: a list of values, plus the time at which each was monitored.
+    """
+
+    def __init__(self, values=(), times=None):
+        super().__init__(values)
+        self.times = list(times) if times is not None else [time.monotonic()] * len(self)
+
+    def append(self, value, timestamp=None):
+        super().append(value)
+        self.times.append(time.monotonic() if timestamp is None else timestamp)
+
+    def append_many(self, values, timestamps):
+        # Not an override of list.extend, which unpickling calls before times is restored.
+        super().extend(values)
+        self.times.extend(timestamps)
+
+    def _time_at(self, index):
+        return self.times[index]
+
+
+class RingBuffer(_TimeIndexed, Sequence):
+    """
+    A fixed-capacity sequence which drops its oldest values once full, or once they are older than max_age seconds.
+    Supports the list operations strategies use on monitored data: indexing (data[key][-1]), slicing, len and iteration.
+    """
+
+    _INITIAL_SIZE = 64
+
+    def __init__(self, capacity: "Max number of values kept, unbounded if None" = None,
+                 max_age: "Max age in seconds of the values kept, unbounded if None" = None):
+        '''Create an instance of the RingBuffer class'''
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.max_age = max_age
+        size = capacity if capacity is not None else self._INITIAL_SIZE
+        self._values = [None] * size
+        self._times = [0.0] * size
+        self._start = 0
+        self._length = 0
+
+    def append(self, value, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self.max_age is not None:
+            self.expire(timestamp)
+        size = len(self._values)
+        if self._length == size:
+            if self.capacity is None:
+                self._grow()
+                size = len(self._values)
+            else:
+                self._start = (self._start + 1) % size
+                self._length -= 1
+        end = (self._start + self._length) % size
+        self._values[end] = value
+        self._times[end] = timestamp
+        self._length += 1
+
+    def append_many(self, values, timestamps):
+        for value, timestamp in zip(values, timestamps):
+            self.append(value, timestamp)
+
+    def expire(self, now=None):
+        '''Drops the values older than max_age seconds'''
+        if self.max_age is None:
+            return
+        oldest_allowed = (time.monotonic() if now is None else now) - self.max_age
+        size = len(self._values)
+        while self._length and self._times[self._start] < oldest_allowed:
+            self._values[self._start] = None
+            self._start = (self._start + 1) % size
+            self._length -= 1
+
+    def _grow(self):
+        self._values = self._ordered(self._values) + [None] * len(self._values)
+        self._times = self._ordered(self._times) + [0.0] * len(self._times)
+        self._start = 0
+
+    def _ordered(self, ring):
+        end = self._start + self._length
+        if end <= len(ring):
+            return ring[self._start:end]
+        return ring[self._start:] + ring[:end - len(ring)]
+
+    def _time_at(self, index):
+        return self._times[(self._start + index) % len(self._times)]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("RingBuffer index out of range")
+        return self._values[(self._start + index) % len(self._values)]
+
+    def __iter__(self):
+        return iter(self._ordered(self._values))
+
+    def __eq__(self, other):
+        if isinstance(other, (RingBuffer, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"RingBuffer({list(self)!r}, capacity={self.capacity}, max_age={self.max_age})"
 
 
 @dataclass
@@ -12,3 +198,69 @@ class Knowledge:
     monitor_schema: dict
     execute_schema: dict
     adaptation_options_schema: dict
+
+    # Retention policy for monitored_data. When either is set, every monitored key is kept in a RingBuffer
+    # instead of an unbounded Series. Set them before the first sample is added.
+    max_samples: int = None
+    max_age: float = None
+
+    # The last adaptation the managed system accepted through execute().
+    last_adaptation: dict = field(default_factory=dict)
+
+    # Running statistics of every numeric monitored key, over the whole run regardless of the retention policy.
+    monitored_stats: dict = field(default_factory=dict)
+    ewma_alpha: float = 0.1
+    quantiles: tuple = (0.5, 0.9, 0.99)
+
+    @classmethod
+    def empty(cls, **kwargs):
+        '''Creates a Knowledge with nothing monitored, analyzed or planned yet'''
+        return cls(dict(), dict(), dict(), dict(), dict(), dict(), dict(), **kwargs)
+
+    def add_sample(self, sample, timestamp=None):
+        '''Appends every value of a monitored sample to the history of its key, stamped with a monotonic time'''
+        if timestamp is None:
+            timestamp = time.monotonic()
+        data = self.monitored_data
+        for key in list(sample.keys()):
+            if key not in data:
+                data[key] = self._new_series()
+            data[key].append(sample[key], timestamp)
+            self._update_stats(key, sample[key])
+
+    def add_samples(self, samples, timestamps):
+        '''Appends a batch of monitored samples, in order, extending the history of every key once'''
+        data = self.monitored_data
+        keys = dict.fromkeys(key for sample in samples for key in sample)
+        for key in keys:
+            if key not in data:
+                data[key] = self._new_series()
+            present = [(sample[key], timestamp) for sample, timestamp in zip(samples, timestamps) if key in sample]
+            values = [value for value, _ in present]
+            data[key].append_many(values, [timestamp for _, timestamp in present])
+            for value in values:
+                self._update_stats(key, value)
+
+    def last(self, key, n):
+        '''The last n monitored values of key'''
+        return self.monitored_data[key].last(n)
+
+    def since(self, key, t):
+        '''The values of key monitored at or after the monotonic time t'''
+        return self.monitored_data[key].since(t)
+
+    def window(self, key, t0, t1):
+        '''The values of key monitored between the monotonic times t0 and t1, both included'''
+        return self.monitored_data[key].window(t0, t1)
+
+    def _update_stats(self, key, value):
+        if isinstance(value, bool) or not isinstance(value, Real):
+            return
+        if key not in self.monitored_stats:
+            self.monitored_stats[key] = RunningStats(self.ewma_alpha, self.quantiles)
+        self.monitored_stats[key].add(value)
+
+    def _new_series(self):
+        if self.max_samples is None and self.max_age is None:
+            return Series()
+        return RingBuffer(self.max_samples, self.max_age)
@@ -0,0 +1,117 @@
+import logging
+import queue
+import sys
+import time
+import weakref
+from logging.handlers import QueueHandler, QueueListener
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """ A QueueHandler leaving the formatting of records to the listener thread instead of the caller."""
+
+    def prepare(self, record):
+        return record
+
+
+class LoopLogger:
+    """
+    Low-overhead diagnostics for the MAPE-K loop. Only what is new is logged (the fresh sample, the analysis
+    and plan outputs, the executed adaptation), plus a summary of the monitored statistics every summary_period
+    seconds instead of the whole history. Records go through a queue to a background listener, so the loop never
+    formats them or blocks on I/O, and beyond max_rate records per second they are dropped and counted.
+    """
+
+    def __init__(self, name="UPISAS.loop",
+                 handlers: "Handlers writing the records, a stdout StreamHandler if None" = None,
+                 summary_period: "Seconds between two summaries of the monitored data, None to disable" = 10.0,
+                 max_rate: "Max records per second, unlimited if None" = None):
+        '''Create an instance of the LoopLogger class'''
+        # Not registered with logging.getLogger: every LoopLogger has its own handlers and nothing propagates to root.
+        self.logger = logging.Logger(name, logging.INFO)
+        self.handlers = handlers if handlers is not None else [_default_handler()]
+        self.summary_period = summary_period
+        self.max_rate = max_rate
+        self.suppressed = 0
+        self._tokens = max_rate
+        self._refilled_at = time.monotonic()
+        self._summarized_at = time.monotonic()
+        self._listener = None
+        self._finalizer = None
+
+    def sample(self, sample, knowledge=None):
+        self._log("Monitor", "got fresh_data: %s", sample)
+        if knowledge is not None and self.summary_period is not None and \
+                time.monotonic() - self._summarized_at >= self.summary_period:
+            self.summary(knowledge)
+
+    def analysis(self, analysis_data):
+        self._log("Analysis", "%s", dict(analysis_data))
+
+    def plan(self, plan_data):
+        self._log("Plan", "%s", dict(plan_data))
+
+    def execute(self, adaptation):
+        self._log("Execute", "posted configuration: %s", dict(adaptation))
+
+    def summary(self, knowledge):
+        '''Logs the sample count and running statistics of every monitored key, whatever the rate limit'''
+        self._summarized_at = time.monotonic()
+        stats = {key: (s.count, s.mean, s.min, s.max, s.last) for key, s in knowledge.monitored_stats.items()}
+        others = {key: len(series) for key, series in knowledge.monitored_data.items() if key not in stats}
+        self._emit("Knowledge", "%s", (_SummaryMessage(stats, others, self.suppressed),))
+        self.suppressed = 0
+
+    def close(self):
+        '''Writes the pending records and stops the background listener'''
+        if self._listener is not None:
+            self._finalizer()
+            self.logger.removeHandler(self._queue_handler)
+            self._listener = None
+
+    def _log(self, phase, message, *args):
+        if self.max_rate is not None:
+            now = time.monotonic()
+            self._tokens = min(self.max_rate, self._tokens + (now - self._refilled_at) * self.max_rate)
+            self._refilled_at = now
+            if self._tokens < 1:
+                self.suppressed += 1
+                return
+            self._tokens -= 1
+        self._emit(phase, message, args)
+
+    def _emit(self, phase, message, args):
+        if self._listener is None:
+            self._start()
+        self.logger.info(message, *args, extra={"phase": phase})
+
+    def _start(self):
+        records = queue.SimpleQueue()
+        self._queue_handler = _DeferredQueueHandler(records)
+        self.logger.addHandler(self._queue_handler)
+        self._listener = QueueListener(records, *self.handlers, respect_handler_level=True)
+        self._listener.start()
+        # Also stops the listener thread when the logger is garbage collected or, at the latest, at exit.
+        self._finalizer = weakref.finalize(self, self._listener.stop)
+
+
+class _SummaryMessage:
+    """ Formats a summary lazily, in the listener thread."""
+
+    def __init__(self, stats, others, suppressed):
+        self.stats = stats
+        self.others = others
+        self.suppressed = suppressed
+
+    def __str__(self):
+        parts = [f"{key}: n={count} mean={mean:.4g} min={low:.4g} max={high:.4g} last={last:.4g}"
+                 for key, (count, mean, low, high, last) in self.stats.items()]
+        parts += [f"{key}: n={count}" for key, count in self.others.items()]
+        if self.suppressed:
+            parts.append(f"{self.suppressed} records suppressed by the rate limit")
+        return "; ".join(parts)
+
+
+def _default_handler():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("[%(phase)s]\t%(message)s"))
+    return handler
@@ -0,0 +1,127 @@
+import csv
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+
+
+class Histogram:
+    """
+    An HDR-style log-linear histogram: values are counted in buckets whose width grows with their magnitude,
+    so that any recorded value is known within a relative error of 2^-(significant_bits - 1), in O(1) time
+    and in memory that only grows with the number of distinct magnitudes seen.
+    """
+
+    PERCENTILES = (50, 90, 99, 99.9)
+
+    def __init__(self, unit: "Resolution of the recorded values, e.g. 1e-6 for seconds recorded in microseconds" = 1e-6,
+                 significant_bits: "Bits kept of every recorded value" = 8):
+        '''Create an instance of the Histogram class'''
+        self.unit = unit
+        self._bits = significant_bits
+        self._counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.nan
+        self.max = math.nan
+
+    def record(self, value):
+        ticks = max(0, int(value / self.unit))
+        index = self._index(ticks)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.count == 1:
+            self.min = self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+
+    def _index(self, ticks):
+        if ticks < (1 << self._bits):
+            return ticks
+        shift = ticks.bit_length() - self._bits
+        return (shift << (self._bits - 1)) + (ticks >> shift)
+
+    def _bounds(self, index):
+        if index < (1 << self._bits):
+            return index, index
+        shift = (index >> (self._bits - 1)) - 1
+        mantissa = index - (shift << (self._bits - 1))
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, p):
+        if not self.count:
+            return math.nan
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                low, high = self._bounds(index)
+                return min(self.max, max(self.min, (low + high) / 2 * self.unit))
+        return self.max
+
+    def snapshot(self):
+        snapshot = {"count": self.count, "min": self.min, "mean": self.mean, "max": self.max}
+        for p in self.PERCENTILES:
+            snapshot[f"p{p:g}"] = self.percentile(p)
+        return snapshot
+
+
+class Metrics:
+    """
+    Latency histograms (in seconds) and counters of a Strategy: one histogram per MAPE-K phase,
+    per HTTP call and per validation, and counters of validations, failures and skipped executions.
+    """
+
+    def __init__(self):
+        '''Create an instance of the Metrics class'''
+        self.histograms = {}
+        self.counters = {}
+
+    def record(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(seconds)
+
+    def increment(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def time(self, name):
+        '''Records how long the body of the with statement takes, whether or not it raises'''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        return {"histograms": {name: h.snapshot() for name, h in self.histograms.items()},
+                "counters": dict(self.counters)}
+
+    def reset(self):
+        self.histograms = {}
+        self.counters = {}
+
+    def export(self, directory, name="metrics"):
+        '''Writes the snapshot to <name>.json, and the histograms to <name>.csv, in directory (e.g. the run directory)'''
+        snapshot = self.snapshot()
+        with open(os.path.join(directory, name + ".json"), "w") as f:
+            json.dump(snapshot, f, indent=2)
+        with open(os.path.join(directory, name + ".csv"), "w", newline="") as f:
+            columns = ["count", "min", "mean", "max"] + [f"p{p:g}" for p in Histogram.PERCENTILES]
+            writer = csv.writer(f)
+            writer.writerow(["name"] + columns)
+            for histogram_name, histogram in snapshot["histograms"].items():
+                writer.writerow([histogram_name] + [histogram[column] for column in columns])
+            for counter_name, value in snapshot["counters"].items():
+                writer.writerow([counter_name, value] + [""] * (len(columns) - 1))
@@ -0,0 +1,141 @@
+import http.client
+import json
+import logging
+import queue
+import socket
+import time
+from urllib.parse import urlsplit
+
+from UPISAS.exceptions import EndpointNotReachable
+from UPISAS.pipeline import MonitorFailure, SampleLoop
+
+
+class StreamingLoop(SampleLoop):
+    """
+    Runs the MAPE-K loop of a Strategy on the samples its exemplar pushes on /monitor_stream (Server-Sent Events)
+    instead of polling it. A reader thread decodes the events into a queue, and the calling thread stores, analyzes,
+    plans and executes as soon as samples arrive, so the reaction time is bounded by the event latency rather than
+    a poll period, and an idle exemplar costs no request. When the stream drops, the reader reconnects with an
+    exponential backoff and resumes after the last event it received (Last-Event-ID), so no sample is lost.
+    """
+
+    producer_name = "upisas-monitor-stream"
+
+    def __init__(self, strategy,
+                 endpoint_suffix="monitor_stream",
+                 with_validation=True,
+                 reconnect_delay: "Seconds before reconnecting, until the server sets its own retry delay" = 1.0,
+                 max_reconnect_delay: "Max seconds between two reconnections to a failing exemplar" = 30.0,
+                 connect_timeout: "Seconds to wait for a connection to be established" = 3.05,
+                 read_timeout: "Seconds without any event or heartbeat after which the stream is reopened" = 60):
+        '''Create an instance of the StreamingLoop class'''
+        # Unbounded, so that the samples arriving during a slow analysis are stored rather than dropped.
+        super().__init__(strategy, queue.Queue(), with_validation=with_validation)
+        self.endpoint_suffix = endpoint_suffix
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.last_event_id = None
+        self.events = 0
+        self.reconnects = 0
+        self._socket = None
+
+    def _interrupt_producer(self):
+        stream_socket = self._socket
+        if stream_socket is not None:
+            try:
+                # Unblocks the reader thread waiting for the next event.
+                stream_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _produce(self):
+        delay = self.reconnect_delay
+        while not self._stop_event.is_set():
+            events = self.events
+            try:
+                self._stream()
+            except EndpointNotReachable as e:
+                self.samples.put(MonitorFailure(e))
+                return
+            except (OSError, http.client.HTTPException) as e:
+                if self._stop_event.is_set():
+                    return
+                logging.warning(f"monitor stream of {self.strategy.exemplar.base_endpoint} interrupted: {e!r}")
+            except Exception as e:
+                # Queued rather than lost with the thread, which would leave run() waiting for samples.
+                self.samples.put(MonitorFailure(e))
+                return
+            if self.events > events:
+                delay = self.reconnect_delay
+            if self._stop_event.wait(delay):
+                return
+            delay = min(2 * delay, self.max_reconnect_delay)
+            self.reconnects += 1
+            self.strategy.metrics.increment("stream_reconnects")
+
+    def _stream(self):
+        url = urlsplit(self.strategy.exemplar.base_endpoint)
+        connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(url.hostname, url.port, timeout=self.connect_timeout)
+        headers = {"Accept": "text/event-stream", "Cache-Control": "no-cache"}
+        if self.last_event_id is not None:
+            headers["Last-Event-ID"] = self.last_event_id
+        try:
+            connection.connect()
+            connection.sock.settimeout(self.read_timeout)
+            # The response takes the socket over from the connection, hence the reference kept for stop().
+            self._socket = connection.sock
+            if self._stop_event.is_set():
+                return
+            connection.request("GET", f"{url.path.rstrip('/')}/{self.endpoint_suffix}", headers=headers)
+            response = connection.getresponse()
+            if response.status == 404:
+                logging.error("Please check that the endpoint you are trying to reach actually exists.")
+                raise EndpointNotReachable
+            if response.status != 200:
+                raise http.client.HTTPException(f"/{self.endpoint_suffix} answered {response.status}")
+            self._read_events(response)
+        finally:
+            self._socket = None
+            connection.close()
+
+    def _read_events(self, response):
+        event_id, data = self.last_event_id, []
+        for line in iter(response.readline, b""):
+            try:
+                line = line.decode().rstrip("\r\n")
+            except UnicodeDecodeError as e:
+                self._skip_malformed(e)
+                continue
+            if not line:
+                if data:
+                    self.last_event_id = event_id
+                    self._dispatch("\n".join(data))
+                data = []
+                continue
+            if line.startswith(":"):
+                continue
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "data":
+                data.append(value)
+            elif field == "id":
+                event_id = value
+            elif field == "retry" and value.isdigit():
+                self.reconnect_delay = int(value) / 1000
+
+    def _dispatch(self, data):
+        try:
+            sample = json.loads(data)["data"]
+        except (ValueError, KeyError, TypeError) as e:
+            self._skip_malformed(e)
+            return
+        self.events += 1
+        # Samples are stamped when they arrive, the event latency being what the loop reacts to.
+        self.samples.put((time.monotonic(), sample))
+
+    def _skip_malformed(self, error):
+        logging.warning(f"skipping a malformed event of {self.strategy.exemplar.base_endpoint}: {error!r}")
+        self.strategy.metrics.increment("malformed_events")
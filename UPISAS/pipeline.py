@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+import queue
+import threading
+import time
+import logging
+
+
+class MonitorFailure:
+    """ The error a producer thread met, queued to be raised in the thread running the loop."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class SampleLoop(ABC):
+    """
+    The MAPE-K loop of a Strategy fed by a producer thread, which queues (monitored at, sample) pairs or a
+    MonitorFailure. The calling thread stores the queued samples, so that the Knowledge is only ever written from it,
+    and analyzes, plans and executes on the newest one. Subclasses implement the producer in _produce().
+    """
+
+    producer_name = "upisas-monitor-producer"
+
+    def __init__(self, strategy, samples, max_staleness=None, latest_only=True, with_validation=True):
+        '''Create an instance of the SampleLoop class'''
+        self.strategy = strategy
+        self.samples = samples
+        self.max_staleness = max_staleness
+        self.latest_only = latest_only
+        self.with_validation = with_validation
+        self.ticks = 0
+        self.stale_samples = 0
+        self.coalesced_samples = 0
+        self._stop_event = threading.Event()
+        self._producer = None
+        self._unconsumed = []
+
+    def run(self, budget: "Seconds to run for, forever if None" = None):
+        '''Runs the loop in the calling thread until the budget is spent or stop() is called'''
+        if self.with_validation and not self.strategy.knowledge.monitor_schema:
+            self.strategy.get_monitor_schema()
+        deadline = None if budget is None else time.monotonic() + budget
+        self._stop_event.clear()
+        self._producer = threading.Thread(target=self._produce, name=self.producer_name, daemon=True)
+        self._producer.start()
+        try:
+            while not self._stop_event.is_set() and (deadline is None or time.monotonic() < deadline):
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    samples = [self.samples.get(timeout=timeout)]
+                except queue.Empty:
+                    break
+                if self.latest_only:
+                    samples.extend(self._drain())
+                # None is put by stop() to wake the loop up.
+                samples = [sample for sample in samples if sample is not None]
+                if not samples:
+                    continue
+                self.coalesced_samples += len(samples) - 1
+                for sample in samples:
+                    self._ingest(sample)
+                self._tick(samples[-1])
+        finally:
+            self.stop()
+            # The samples fetched after the last tick are stored, though not analyzed.
+            pending, self._unconsumed = self._unconsumed + self._drain(), []
+            for sample in pending:
+                if sample is not None and not isinstance(sample, MonitorFailure):
+                    self._ingest(sample)
+            self.strategy.flush_executions()
+
+    def stop(self):
+        '''Stops the producer thread; run() stores the samples it queued but does not analyze them'''
+        self._stop_event.set()
+        self._interrupt_producer()
+        if self._producer is not None and self._producer is not threading.current_thread():
+            self._producer.join()
+        try:
+            self.samples.put_nowait(None)
+        except queue.Full:
+            # A full queue wakes run() up as well.
+            pass
+
+    @abstractmethod
+    def _produce(self):
+        """ Queues the samples until the loop is stopped."""
+        pass
+
+    def _interrupt_producer(self):
+        '''Unblocks the producer thread so that it sees it was stopped'''
+        pass
+
+    def _drain(self):
+        drained = []
+        while True:
+            try:
+                drained.append(self.samples.get_nowait())
+            except queue.Empty:
+                return drained
+
+    def _ingest(self, sample):
+        if isinstance(sample, MonitorFailure):
+            raise sample.error
+        self.strategy._update_monitored_data(sample[1], self.with_validation, timestamp=sample[0])
+
+    def _tick(self, sample):
+        monitored_at = sample[0]
+        if self.max_staleness is not None and time.monotonic() - monitored_at > self.max_staleness:
+            self.stale_samples += 1
+            logging.warning(f"skipping analysis of a monitor sample older than {self.max_staleness}s")
+            return
+        self.ticks += 1
+        if self.strategy.analyze():
+            if self.strategy.plan():
+                self.strategy.execute(with_validation=self.with_validation)
+
+
+class PipelinedLoop(SampleLoop):
+    """
+    Runs the MAPE-K loop of a Strategy with monitoring overlapped with analysis and planning.
+    A producer thread keeps fetching monitor samples into a bounded queue while the calling thread
+    validates, stores, analyzes, plans and executes on them, so a tick no longer pays the network wait
+    and the compute time one after the other.
+    """
+
+    producer_name = "upisas-monitor-prefetch"
+
+    def __init__(self, strategy,
+                 period: "Minimum seconds between two monitor requests" = 0.0,
+                 queue_size: "Number of fetched samples that may wait for analysis" = 1,
+                 max_staleness: "Samples older than this many seconds are stored but not acted upon" = None,
+                 latest_only: "Store every waiting sample but only analyze the newest one" = True,
+                 endpoint_suffix="monitor",
+                 with_validation=True):
+        '''Create an instance of the PipelinedLoop class'''
+        super().__init__(strategy, queue.Queue(maxsize=queue_size), max_staleness, latest_only, with_validation)
+        self.period = period
+        self.endpoint_suffix = endpoint_suffix
+
+    def _produce(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                fresh_data = self.strategy._perform_get_request(self.endpoint_suffix)
+                item = (time.monotonic(), fresh_data)
+            except Exception as e:
+                item = MonitorFailure(e)
+            while not self._stop_event.is_set():
+                try:
+                    self.samples.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if isinstance(item, MonitorFailure):
+                return
+            self._stop_event.wait(max(0.0, self.period - (time.monotonic() - started)))
+
+    def _interrupt_producer(self):
+        # Makes room in the bounded queue for a producer blocked on putting its sample.
+        self._unconsumed.extend(self._drain())
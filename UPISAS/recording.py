@@ -0,0 +1,69 @@
+import json
+import struct
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from UPISAS.transport import Transport
+
+TraceRecord = namedtuple("TraceRecord", ["time", "method", "endpoint", "status_code", "request", "response"])
+
+_METHODS = ("GET", "PUT")
+# seconds since the start of the recording, method, status code, endpoint length, request length, response length
+_RECORD = struct.Struct("<dBHHII")
+_MAGIC = b"UPISAS-TRACE-1\n"
+
+
+class RecordingTransport(Transport):
+    """
+    Wraps the transport of a Strategy and appends every request it sends (endpoint and JSON body) and the
+    response it gets back, with the time since the recording started, to a compact binary trace.
+    The trace can be read with read_trace(), and served back to a strategy by a ReplayExemplar.
+    """
+
+    def __init__(self, transport: "The transport actually sending the requests", path: "File the trace is written to"):
+        '''Create an instance of the RecordingTransport class'''
+        self.transport = transport
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(_MAGIC)
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def request(self, method, url, **kwargs):
+        response = self.transport.request(method, url, **kwargs)
+        request = json.dumps(kwargs["json"]).encode() if kwargs.get("json") is not None else b""
+        endpoint = urlsplit(url).path.strip("/").encode()
+        content = response.content
+        with self._lock:
+            self._file.write(_RECORD.pack(time.monotonic() - self._start, _METHODS.index(method), response.status_code,
+                                          len(endpoint), len(request), len(content)) + endpoint + request + content)
+        return response
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.transport.close()
+
+
+def read_trace(path):
+    '''The records of a trace written by a RecordingTransport, in the order they were recorded'''
+    with open(path, "rb") as f:
+        content = f.read()
+    if not content.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a UPISAS trace")
+    records = []
+    position = len(_MAGIC)
+    while position + _RECORD.size <= len(content):
+        t, method, status_code, endpoint_length, request_length, response_length = _RECORD.unpack_from(content, position)
+        position += _RECORD.size
+        endpoint = content[position:position + endpoint_length].decode()
+        position += endpoint_length
+        request = content[position:position + request_length]
+        position += request_length
+        response = content[position:position + response_length]
+        position += response_length
+        records.append(TraceRecord(t, _METHODS[method], endpoint, status_code, request, response))
+    return records
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from UPISAS.exceptions import CircuitOpen, ServerNotReachable
+from UPISAS.transport import Transport
+
+
+class CircuitBreaker:
+    """
+    Fails the requests to an exemplar fast once it keeps failing: after failure_threshold consecutive failures the
+    circuit opens and requests raise CircuitOpen without being sent. After reset_timeout seconds a single request is
+    let through to probe the exemplar; the circuit closes if it succeeds, and opens again otherwise.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: "Consecutive failures after which the circuit opens" = 5,
+                 reset_timeout: "Seconds before an open circuit lets a probe request through" = 10.0):
+        '''Create an instance of the CircuitBreaker class'''
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        '''Raises CircuitOpen unless a request may be sent now'''
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                logging.info("circuit half-open, probing the exemplar")
+                return
+        # Open, or half-open with the probe still on its way.
+        raise CircuitOpen
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logging.info("circuit closed, the exemplar answers again")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.warning(f"circuit opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResilientTransport(Transport):
+    """
+    Wraps the transport of a Strategy to bound the time its requests can take when the exemplar is overloaded or
+    down. Every request gets the deadline of its endpoint: no attempt starts after it, and the connect and read
+    timeouts of the wrapped transport are lowered to the time left (they bound each socket operation, not the whole
+    attempt). GETs, being idempotent, are retried on connection failures and 5xx responses with a jittered
+    exponential backoff, and raise ServerNotReachable once the retries are spent. A CircuitBreaker (one per
+    transport, hence per exemplar) makes the requests fail fast while the exemplar keeps failing.
+    """
+
+    def __init__(self, transport: "The transport actually sending the requests",
+                 deadlines: "Seconds allowed to the requests of an endpoint, by endpoint" = None,
+                 default_deadline: "Seconds allowed to the requests of the other endpoints, unbounded if None" = 30.0,
+                 retries: "Max number of times a GET is retried" = 3,
+                 backoff: "Max seconds before the first retry, doubled at every retry" = 0.1,
+                 max_backoff: "Max seconds between two attempts" = 2.0,
+                 breaker: "Circuit breaker of the exemplar, a new one if None" = None,
+                 seed: "Seed of the backoff jitter" = None):
+        '''Create an instance of the ResilientTransport class'''
+        self.transport = transport
+        self.deadlines = deadlines or {}
+        self.default_deadline = default_deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.retried = 0
+        self._random = random.Random(seed)
+
+    def request(self, method, url, **kwargs):
+        deadline = self._deadline(url)
+        timeout = kwargs.get("timeout", getattr(self.transport, "timeout", None))
+        attempt = 0
+        while True:
+            self.breaker.before_request()
+            remaining = _remaining(deadline)
+            if remaining is not None:
+                if remaining == 0:
+                    logging.error(f"deadline of {url} exceeded")
+                    raise ServerNotReachable
+                kwargs["timeout"] = _capped(timeout, remaining)
+            try:
+                response = self.transport.request(method, url, **kwargs)
+            except CircuitOpen:
+                raise
+            except ServerNotReachable:
+                self.breaker.record_failure()
+                if not self._retry(method, attempt, deadline):
+                    raise
+            except BaseException:
+                # Any other error still ends the attempt, which may be the probe of a half-open circuit.
+                self.breaker.record_failure()
+                raise
+            else:
+                if not _failed(response):
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if not self._retry(method, attempt, deadline):
+                    return self._give_up(method, url, response)
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def close(self):
+        self.transport.close()
+
+    def _give_up(self, method, url, response):
+        if method != "GET":
+            # Left to the caller, who knows whether the request may have been applied.
+            return response
+        logging.error(f"{url} still answers {response.status_code}, giving up")
+        raise ServerNotReachable
+
+    def _deadline(self, url):
+        seconds = self.deadlines.get(urlsplit(url).path.strip("/"), self.default_deadline)
+        return None if seconds is None else time.monotonic() + seconds
+
+    def _retry(self, method, attempt, deadline):
+        if method != "GET" or attempt >= self.retries:
+            return False
+        remaining = _remaining(deadline)
+        if remaining is not None and remaining <= self._next_backoff_bound(attempt):
+            return False
+        self.retried += 1
+        return True
+
+    def _next_backoff_bound(self, attempt):
+        return min(self.max_backoff, self.backoff * 2 ** attempt)
+
+    def _backoff(self, attempt):
+        # Full jitter, so that the strategies of many exemplars failing together do not retry in lockstep.
+        return self._random.uniform(0, self._next_backoff_bound(attempt))
+
+
+class AsyncResilientTransport(ResilientTransport):
+    """
+    The ResilientTransport of an AsyncStrategy, wrapping an AsyncHTTPTransport. The deadlines are enforced on the
+    whole request, not on each socket operation.
+    """
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def put(self, url, json=None, **kwargs):
+        return await self.request("PUT", url, json=json, **kwargs)
+
+    async def request(self, method, url, **kwargs):
+        deadline = self._deadline(url)
+        attempt = 0
+        while True:
+            self.breaker.before_request()
+            try:
+                response = await asyncio.wait_for(self.transport.request(method, url, **kwargs), _remaining(deadline))
+            except CircuitOpen:
+                raise
+            except (ServerNotReachable, asyncio.TimeoutError) as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    logging.error(f"deadline of {url} exceeded")
+                self.breaker.record_failure()
+                if not self._retry(method, attempt, deadline):
+                    raise ServerNotReachable
+            except BaseException:
+                # Including the cancellation of the task, which would otherwise leave a half-open circuit for good.
+                self.breaker.record_failure()
+                raise
+            else:
+                if not _failed(response):
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if not self._retry(method, attempt, deadline):
+                    return self._give_up(method, url, response)
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    async def close(self):
+        await self.transport.close()
+
+
+def _remaining(deadline):
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _capped(timeout, remaining):
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+    return min(timeout, remaining)
+
+
+def _failed(response):
+    return response.status_code >= 500
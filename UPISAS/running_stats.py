@@ -0,0 +1,119 @@
+import math
+
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile in O(1) memory, using the P-square algorithm
+    (Jain and Chlamtac, "The P2 algorithm for dynamic calculation of quantiles and histograms without storing observations", 1985).
+    """
+
+    def __init__(self, p):
+        '''Create an instance of the P2Quantile class'''
+        self.p = p
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(x)
+            heights.sort()
+            return
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if heights[i] <= x < heights[i + 1])
+        for i in range(k + 1, 5):
+            self._positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        for i in range(1, 4):
+            d = self._desired[i] - self._positions[i]
+            if (d >= 1 and self._positions[i + 1] - self._positions[i] > 1) or \
+                    (d <= -1 and self._positions[i - 1] - self._positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, d)
+                heights[i] = height
+                self._positions[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self._heights, self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def _linear(self, i, d):
+        q, n = self._heights, self._positions
+        return q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+    @property
+    def value(self):
+        heights = self._heights
+        if not heights:
+            return math.nan
+        if len(heights) < 5:
+            # Too few observations for the markers: use the exact quantile of what was seen.
+            return heights[min(len(heights) - 1, int(round(self.p * (len(heights) - 1))))]
+        return heights[2]
+
+
+class RunningStats:
+    """
+    Aggregates of a monitored metric updated in O(1) per sample: count, mean, variance, min, max,
+    an exponentially weighted moving average and streaming quantile estimates.
+    """
+
+    def __init__(self, ewma_alpha: "Weight of the newest sample in the EWMA" = 0.1,
+                 quantiles: "Quantiles to estimate, between 0 and 1" = (0.5, 0.9, 0.99)):
+        '''Create an instance of the RunningStats class'''
+        self.ewma_alpha = ewma_alpha
+        self.count = 0
+        self.mean = math.nan
+        self.min = math.nan
+        self.max = math.nan
+        self.ewma = math.nan
+        self.last = math.nan
+        self._m2 = 0.0
+        self._quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, x):
+        x = float(x)
+        if math.isnan(x):
+            return
+        self.count += 1
+        self.last = x
+        if self.count == 1:
+            self.mean = self.min = self.max = self.ewma = x
+        else:
+            # Welford's online algorithm for the mean and the sum of squared deviations.
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (x - self.mean)
+            self.min = min(self.min, x)
+            self.max = max(self.max, x)
+            self.ewma += self.ewma_alpha * (x - self.ewma)
+        for estimator in self._quantiles.values():
+            estimator.add(x)
+
+    @property
+    def variance(self):
+        '''The sample variance, NaN with fewer than two samples'''
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def quantile(self, p):
+        return self._quantiles[p].value
+
+    def __repr__(self):
+        return f"RunningStats(count={self.count}, mean={self.mean}, std={self.std}, min={self.min}, max={self.max}, ewma={self.ewma})"
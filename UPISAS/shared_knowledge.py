@@ -0,0 +1,101 @@
+import os
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from UPISAS.columnar import Column
+
+
+def _series_arrays(series):
+    """
+    The values and times of a monitored key as NumPy arrays, plus an identity for the times which is
+    shared by keys with a common time index, or None if its values are not numeric scalars.
+    """
+    if isinstance(series, Column):
+        if series.dtype == object:
+            return None
+        return series.values, series.index.values, id(series.index)
+    try:
+        values = np.asarray(list(series))
+    except ValueError:
+        # Lists of different lengths, e.g. the per-server utilization of SWIM while servers are added.
+        return None
+    # Lists of the same length would make a 2-D array, of which the manifest only keeps the length.
+    if values.ndim != 1 or values.dtype.kind not in "biuf":
+        return None
+    times = np.fromiter(series.last(len(series)).times, dtype=np.float64, count=len(series))
+    return values, times, id(times)
+
+
+def publish_knowledge(knowledge, prefix: "Prefix of the segment names, random if None" = None):
+    """
+    Copies the numeric monitored history of a Knowledge into named shared-memory segments, one per column.
+    Returns a small, picklable manifest from which another process can attach to the columns without copying them
+    with SharedKnowledge. The segments outlive the publishing process; the attaching process is responsible for
+    unlinking them. Keys whose values are not numeric scalars (e.g. nested records of a list-backed Knowledge) are skipped.
+    """
+    prefix = prefix if prefix is not None else f"upisas_{uuid.uuid4().hex[:12]}"
+    manifest = {"columns": {}}
+    published = {}
+
+    def publish(array, identity):
+        # Columns of a ColumnarKnowledge share one array of times, which is published only once.
+        if identity in published:
+            return published[identity][1]
+        name = f"{prefix}_{len(published)}"
+        segment = shared_memory.SharedMemory(name=name, create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+        segment.close()
+        if os.name == "posix":
+            # Hand the ownership of the segment over to the attaching process.
+            resource_tracker.unregister(segment._name, "shared_memory")
+        spec = [name, array.dtype.str, len(array)]
+        published[identity] = (array, spec)
+        return spec
+
+    # Every key is converted before the first segment is created, so that no segment is left behind on an error.
+    arrays = {key: _series_arrays(series) for key, series in knowledge.monitored_data.items()}
+    for key, key_arrays in arrays.items():
+        if key_arrays is not None:
+            values, times, times_identity = key_arrays
+            manifest["columns"][key] = {"values": publish(values, id(values)), "times": publish(times, times_identity)}
+    return manifest
+
+
+class SharedKnowledge:
+    """
+    Zero-copy read access, from another process, to the Knowledge columns published with publish_knowledge.
+    The arrays in columns and times must not be used after close() or unlink().
+    """
+
+    def __init__(self, manifest):
+        '''Create an instance of the SharedKnowledge class'''
+        self._segments = {}
+        self.columns = {key: self._attach(entry["values"]) for key, entry in manifest["columns"].items()}
+        self.times = {key: self._attach(entry["times"]) for key, entry in manifest["columns"].items()}
+
+    def _attach(self, spec):
+        name, dtype, length = spec
+        if name not in self._segments:
+            self._segments[name] = shared_memory.SharedMemory(name=name)
+        return np.ndarray((length,), dtype=np.dtype(dtype), buffer=self._segments[name].buf)
+
+    def close(self):
+        '''Detaches from the segments, leaving them available to other processes'''
+        self.columns, self.times = {}, {}
+        for segment in self._segments.values():
+            segment.close()
+
+    def unlink(self):
+        '''Detaches from the segments and frees them'''
+        self.close()
+        for segment in self._segments.values():
+            segment.unlink()
+        self._segments = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.unlink()
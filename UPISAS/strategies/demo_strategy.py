@@ -4,10 +4,8 @@ from UPISAS.strategy import Strategy
 class DemoStrategy(Strategy):
 
     def analyze(self):
-        data = self.knowledge.monitored_data
-        print(data)
-        mean_f = sum(data["f"])/len(data["f"])
-        print("[Analysis]\tmean_f: " + str(mean_f))
+        mean_f = self.knowledge.monitored_stats["f"].mean
+        self.loop_logger.analysis({"mean_f": mean_f})
         if mean_f > 0:
             self.knowledge.analysis_data["mean_f"] = mean_f
             return True
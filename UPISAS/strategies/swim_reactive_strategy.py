@@ -10,8 +10,7 @@ class ReactiveAdaptationManager(Strategy):
 
     def analyze(self):
         data = self.knowledge.monitored_data
-        print(data)
-        self.knowledge.analysis_data["server_booting"] = data["servers"] > data["active_servers"]
+        self.knowledge.analysis_data["server_booting"] = data["servers"][-1] > data["active_servers"][-1]
         
         self.knowledge.analysis_data["spare_utilization"] = sum([server["utilization_value"] for server in data["utilization"][-1]])
         self.knowledge.analysis_data["rt_sufficient"] = False
@@ -55,4 +54,28 @@ class ReactiveAdaptationManager(Strategy):
                 self.knowledge.plan_data["server_number"] = self.knowledge.analysis_data["current_servers"]
                 return True
             
-        return False
\ No newline at end of file
+        return False
+
+def reactive_plan(monitored, rt_threshold, dimmer_margin):
+    '''
+    The analysis and plan of ReactiveAdaptationManager for many scenarios at once, on the arrays returned by
+    SWIMSimulator.monitor_arrays(). Returns the planned server number and dimmer factor of every scenario, and
+    the mask of the scenarios for which an adaptation is executed.
+    '''
+    servers, dimmer = monitored["servers"], monitored["dimmer_factor"]
+    server_booting = servers > monitored["active_servers"]
+    spare_utilization = monitored["utilization"] * monitored["active_servers"]
+    dimmer_at_min = dimmer < dimmer_margin
+    dimmer_at_max = dimmer > (1.0 - dimmer_margin)
+    server_room = servers < monitored["max_servers"]
+    rt_sufficient = monitored["basic_rt"] < rt_threshold
+    rt_insufficient = monitored["basic_rt"] > rt_threshold
+
+    raise_dimmer = rt_sufficient & (spare_utilization > 1) & ~dimmer_at_max
+    remove_server = rt_sufficient & (spare_utilization > 1) & dimmer_at_max & ~server_booting & (servers > 1)
+    add_server = rt_insufficient & ~server_booting & server_room
+    lower_dimmer = rt_insufficient & ~add_server & ~dimmer_at_min
+
+    server_number = servers + add_server - remove_server
+    dimmer_factor = dimmer + dimmer_margin * (raise_dimmer.astype(float) - lower_dimmer)
+    return server_number, dimmer_factor, raise_dimmer | remove_server | add_server | lower_dimmer
@@ -1,83 +1,390 @@
 from abc import ABC, abstractmethod
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+from contextlib import contextmanager
+import functools
+import json
+import os
 import pprint
 
 from UPISAS.exceptions import EndpointNotReachable, ServerNotReachable
 from UPISAS.knowledge import Knowledge
+from UPISAS.loop_logger import LoopLogger
+from UPISAS.metrics import Metrics
+from UPISAS.transport import HTTPTransport
+from UPISAS import tracing
 from UPISAS import validate_schema, get_response_for_get_request
 import logging
+import threading
+import time
 
 pp = pprint.PrettyPrinter(indent=4)
 
+CachedDocument = namedtuple("CachedDocument", ["document", "etag", "last_modified"])
+
+PREFETCHED_ENDPOINTS = ("monitor_schema", "execute_schema", "adaptation_options_schema", "adaptation_options")
+SCHEMA_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "upisas", "schemas")
+
+
+def _phase(name, method):
+    """ Wraps the analyze/plan method of a Strategy subclass so that the Strategy sees it run."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if "exemplar" not in self.__dict__ or "metrics" not in self.__dict__:
+            # A subclass that does not call Strategy.__init__ runs its phases uninstrumented.
+            return method(self, *args, **kwargs)
+        depth = self.__dict__.get("_phase_depth", 0)
+        self._phase_depth = depth + 1
+        start = time.perf_counter()
+        try:
+            with tracing.span(name, "phase", self.exemplar.base_endpoint):
+                result = method(self, *args, **kwargs)
+        finally:
+            self._phase_depth = depth
+        # Only the outermost call is reported, when an override calls super().analyze().
+        if depth == 0:
+            self._after_phase(name, result, time.perf_counter() - start)
+        return result
+    return wrapper
+
 
 class Strategy(ABC):
 
-    def __init__(self, exemplar):
+    def __init__(self, exemplar, transport=None, knowledge=None, knowledge_log=None, loop_logger=None, metrics=None,
+                 skip_unchanged: "Whether to skip executing an adaptation equal to the last one applied" = True,
+                 coalesce_window: "Milliseconds during which executed adaptations are merged into one request" = None):
         self.exemplar = exemplar
-        self.knowledge = Knowledge(dict(), dict(), dict(), dict(), dict(), dict(), dict())
+        self.skip_unchanged = skip_unchanged
+        self.coalesce_window = coalesce_window
+        self._pending_adaptation = None
+        self._pending_flush = None
+        self._pending_lock = threading.Lock()
+        self._http_cache = {}
+        # Cursor of the next sample to fetch from /monitor_batch.
+        self.monitor_cursor = 0
+        self._last_batch_timestamp = float("-inf")
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.transport = transport if transport is not None else self._default_transport()
+        self.knowledge = knowledge if knowledge is not None else Knowledge.empty()
+        self.loop_logger = loop_logger if loop_logger is not None else LoopLogger()
+        self.knowledge_log = knowledge_log
+        if knowledge_log is not None:
+            self.knowledge = knowledge_log.recover(self.knowledge)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in ("analyze", "plan"):
+            if name in cls.__dict__:
+                setattr(cls, name, _phase(name, cls.__dict__[name]))
+
+    def _default_transport(self):
+        create_transport = getattr(self.exemplar, "create_transport", None)
+        transport = create_transport() if create_transport is not None else None
+        return transport if transport is not None else HTTPTransport()
 
     def ping(self):
         ping_res = self._perform_get_request(self.exemplar.base_endpoint)
         logging.info(f"ping result: {ping_res}")
 
     def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=False):
-        fresh_data = self._perform_get_request(endpoint_suffix)
-        if(verbose): print("[Monitor]\tgot fresh_data: " + str(fresh_data))
-        if with_validation:
-            if(not self.knowledge.monitor_schema): self.get_monitor_schema()
-            validate_schema(fresh_data, self.knowledge.monitor_schema)
-        data = self.knowledge.monitored_data
-        for key in list(fresh_data.keys()):
-            if key not in data:
-                data[key] = []
-            data[key].append(fresh_data[key])
-        if(verbose): print("[Knowledge]\tdata monitored so far: " + str(self.knowledge.monitored_data))
-        return True
+        with self._measure("monitor"):
+            fresh_data = self._perform_get_request(endpoint_suffix)
+            if with_validation:
+                if(not self.knowledge.monitor_schema): self.get_monitor_schema()
+            return self._update_monitored_data(fresh_data, with_validation, verbose)
 
-    def execute(self, adaptation=None, endpoint_suffix="execute", with_validation=True):
-        if(not adaptation): adaptation= self.knowledge.plan_data
-        if with_validation:
-            if(not self.knowledge.execute_schema): self.get_execute_schema()
-            validate_schema(adaptation, self.knowledge.execute_schema)
+    def monitor_batch(self, endpoint_suffix="monitor_batch", with_validation=True, verbose=False):
+        '''
+        Fetches every sample the exemplar monitored since the last batch in one request, and appends them all
+        to the knowledge at once. Returns whether there was any new sample.
+        '''
+        with self._measure("monitor"):
+            url = f"{self.exemplar.base_endpoint}/{endpoint_suffix}?since={self.monitor_cursor}"
+            with self._http_call("GET", endpoint_suffix):
+                response = get_response_for_get_request(url, self.transport)
+            batch = self._check_get_response(response)
+            if with_validation:
+                if(not self.knowledge.monitor_schema): self.get_monitor_schema()
+            return self._update_monitored_batch(batch, with_validation, verbose)
+
+    def execute(self, adaptation=None, endpoint_suffix="execute", with_validation=True,
+                force: "Send the adaptation even if it is already applied" = False):
+        with self._measure("execute"):
+            if(not adaptation): adaptation= self.knowledge.plan_data
+            if with_validation:
+                if(not self.knowledge.execute_schema): self.get_execute_schema()
+                self._validate(adaptation, self.knowledge.execute_schema, "execute")
+            if self.coalesce_window and not force:
+                return self._coalesce(adaptation, endpoint_suffix)
+            if not force and self._is_applied(adaptation):
+                return True
+            return self._put_adaptation(adaptation, endpoint_suffix)
+
+    def flush_executions(self):
+        '''Executes the adaptation waiting for its coalescing window to end right away'''
+        adaptation, endpoint_suffix = self._take_pending_adaptation()
+        if adaptation is not None:
+            self._put_adaptation(adaptation, endpoint_suffix)
+
+    def close(self):
+        '''Executes the pending adaptation, then stops the loop logger and closes the transport and knowledge log'''
+        try:
+            self.flush_executions()
+        finally:
+            self.loop_logger.close()
+            self.transport.close()
+            if self.knowledge_log is not None:
+                self.knowledge_log.close()
+
+    def _put_adaptation(self, adaptation, endpoint_suffix):
         url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
-        response = requests.put(url, json=adaptation)
-        print("[Execute]\tposted configuration: " + str(adaptation))
-        if response.status_code == 404:
-            logging.error("Cannot execute adaptation on remote system, check that the execute endpoint exists.")
-            raise EndpointNotReachable
-        return True
+        with self._http_call("PUT", endpoint_suffix):
+            response = self.transport.put(url, json=adaptation)
+        return self._check_execute_response(response, adaptation)
+
+    def _schedule_flush(self, delay):
+        timer = threading.Timer(delay, self._flush_in_background)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _flush_in_background(self):
+        try:
+            self.flush_executions()
+        except Exception as e:
+            logging.error(f"could not execute the coalesced adaptation: {e!r}")
 
     def get_adaptation_options(self, endpoint_suffix: "API Endpoint" = "adaptation_options", with_validation=True):
-        self.knowledge.adaptation_options = self._perform_get_request(endpoint_suffix)
+        '''Refreshes the adaptation options; unchanged options (304 Not Modified) are neither sent nor revalidated'''
+        adaptation_options, modified = self._perform_conditional_get_request(endpoint_suffix)
+        if not modified and adaptation_options is self.knowledge.adaptation_options:
+            return
         if with_validation:
             if(not self.knowledge.adaptation_options_schema): self.get_adaptation_options_schema()
-            validate_schema(self.knowledge.adaptation_options, self.knowledge.adaptation_options_schema)
-        logging.info("adaptation_options set to: ")
-        pp.pprint(self.knowledge.adaptation_options)
+        self._update_adaptation_options(adaptation_options, with_validation)
 
     def get_monitor_schema(self, endpoint_suffix = "monitor_schema"):
-        self.knowledge.monitor_schema = self._perform_get_request(endpoint_suffix)
-        logging.info("monitor_schema set to: ")
-        pp.pprint(self.knowledge.monitor_schema)
+        self._update_schema("monitor_schema", *self._perform_conditional_get_request(endpoint_suffix))
 
     def get_execute_schema(self, endpoint_suffix = "execute_schema"):
-        self.knowledge.execute_schema = self._perform_get_request(endpoint_suffix)
-        logging.info("execute_schema set to: ")
-        pp.pprint(self.knowledge.execute_schema)
+        self._update_schema("execute_schema", *self._perform_conditional_get_request(endpoint_suffix))
 
     def get_adaptation_options_schema(self, endpoint_suffix: "API Endpoint" = "adaptation_options_schema"):
-        self.knowledge.adaptation_options_schema = self._perform_get_request(endpoint_suffix)
-        logging.info("adaptation_options_schema set to: ")
-        pp.pprint(self.knowledge.adaptation_options_schema)
+        self._update_schema("adaptation_options_schema", *self._perform_conditional_get_request(endpoint_suffix))
+
+    def prefetch_schemas(self, with_validation=True,
+                         cache_dir: "Directory of the schema cache, None to always fetch them" = SCHEMA_CACHE_DIR):
+        '''
+        Fetches the three schemas and the adaptation options concurrently. They are cached on disk under the digest
+        of the exemplar's docker image, so that later runs of the same image load them without any request.
+        '''
+        cache_path = self._schema_cache_path(cache_dir)
+        documents = _load_cached_schemas(cache_path)
+        if documents is None:
+            with ThreadPoolExecutor(max_workers=len(PREFETCHED_ENDPOINTS)) as pool:
+                responses = pool.map(self._perform_conditional_get_request, PREFETCHED_ENDPOINTS)
+                documents = {endpoint: document for endpoint, (document, _) in zip(PREFETCHED_ENDPOINTS, responses)}
+            _store_cached_schemas(cache_path, documents)
+        self._update_prefetched(documents, with_validation)
 
     def _perform_get_request(self, endpoint_suffix: "API Endpoint"):
         url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
-        response = get_response_for_get_request(url)
+        with self._http_call("GET", endpoint_suffix):
+            response = get_response_for_get_request(url, self.transport)
+        return self._check_get_response(response)
+
+    def _perform_conditional_get_request(self, endpoint_suffix: "API Endpoint"):
+        '''
+        A GET revalidating the document last returned by the endpoint with its ETag or Last-Modified header.
+        Returns the document and whether it was modified, the cached document if the server answered 304.
+        '''
+        url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
+        with self._http_call("GET", endpoint_suffix):
+            response = get_response_for_get_request(url, self.transport, self._conditional_headers(endpoint_suffix))
+        return self._check_conditional_get_response(endpoint_suffix, response)
+
+    # The methods below hold everything that happens around a request but not the request itself,
+    # so that transports with a different calling convention (e.g. AsyncStrategy) can share them.
+
+    def _update_monitored_data(self, fresh_data, with_validation=True, verbose=False, timestamp=None):
+        if with_validation:
+            self._validate(fresh_data, self.knowledge.monitor_schema, "monitor")
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.knowledge.add_sample(fresh_data, timestamp)
+        if self.knowledge_log is not None:
+            self.knowledge_log.log_monitor(fresh_data, timestamp)
+        if(verbose): self.loop_logger.sample(fresh_data, self.knowledge)
+        return True
+
+    def _update_monitored_batch(self, batch, with_validation=True, verbose=False):
+        samples = [entry["data"] for entry in batch["samples"]]
+        if with_validation:
+            for sample in samples:
+                self._validate(sample, self.knowledge.monitor_schema, "monitor")
+        # The samples are stamped on the local monotonic clock by their age on the exemplar's clock, never before
+        # the samples of the previous batch despite the jitter of the request latency.
+        now = time.monotonic()
+        timestamps = []
+        for entry in batch["samples"]:
+            self._last_batch_timestamp = max(self._last_batch_timestamp, now - (batch["time"] - entry["time"]))
+            timestamps.append(self._last_batch_timestamp)
+        self.knowledge.add_samples(samples, timestamps)
+        if self.knowledge_log is not None:
+            for sample, timestamp in zip(samples, timestamps):
+                self.knowledge_log.log_monitor(sample, timestamp)
+        if batch["dropped"]:
+            logging.warning(f"{batch['dropped']} samples were dropped by the exemplar before they could be fetched")
+            self.metrics.increment("dropped_samples", batch["dropped"])
+        self.monitor_cursor = batch["cursor"]
+        if verbose and samples: self.loop_logger.sample(samples[-1], self.knowledge)
+        return bool(samples)
+
+    def _update_adaptation_options(self, adaptation_options, with_validation=True):
+        self.knowledge.adaptation_options = adaptation_options
+        if with_validation:
+            self._validate(self.knowledge.adaptation_options, self.knowledge.adaptation_options_schema,
+                           "adaptation_options")
+        logging.info("adaptation_options set to: ")
+        pp.pprint(self.knowledge.adaptation_options)
+
+    def _schema_cache_path(self, cache_dir):
+        image_digest = getattr(self.exemplar, "image_digest", None)
+        digest = image_digest() if cache_dir is not None and image_digest is not None else None
+        if digest is None:
+            return None
+        return os.path.join(cache_dir, digest.replace(":", "_") + ".json")
+
+    def _update_prefetched(self, documents, with_validation=True):
+        for name in PREFETCHED_ENDPOINTS:
+            setattr(self.knowledge, name, documents[name])
+        if with_validation:
+            self._validate(self.knowledge.adaptation_options, self.knowledge.adaptation_options_schema,
+                           "adaptation_options")
+        logging.info(f"schemas and adaptation options of {', '.join(self.knowledge.adaptation_options)} set")
+
+    def _update_schema(self, schema_name, schema, modified=True):
+        if not modified and getattr(self.knowledge, schema_name) is schema:
+            return
+        setattr(self.knowledge, schema_name, schema)
+        logging.info(f"{schema_name} set to: ")
+        pp.pprint(schema)
+
+    def _check_get_response(self, response):
         if response.status_code == 404:
             logging.error("Please check that the endpoint you are trying to reach actually exists.")
             raise EndpointNotReachable
         return response.json()
 
+    def _conditional_headers(self, endpoint_suffix):
+        cached = self._http_cache.get(endpoint_suffix)
+        if cached is None:
+            return None
+        headers = {}
+        if cached.etag is not None:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified is not None:
+            headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def _check_conditional_get_response(self, endpoint_suffix, response):
+        cached = self._http_cache.get(endpoint_suffix)
+        if response.status_code == 304 and cached is not None:
+            self.metrics.increment("not_modified")
+            return cached.document, False
+        document = self._check_get_response(response)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is not None or last_modified is not None:
+            self._http_cache[endpoint_suffix] = CachedDocument(document, etag, last_modified)
+        return document, True
+
+    def _check_execute_response(self, response, adaptation):
+        self.loop_logger.execute(adaptation)
+        if response.status_code == 404:
+            logging.error("Cannot execute adaptation on remote system, check that the execute endpoint exists.")
+            raise EndpointNotReachable
+        if not 200 <= response.status_code < 300:
+            # Not recorded as applied, so that the same adaptation is sent again by the next execute().
+            logging.error(f"The remote system rejected the adaptation with status {response.status_code}.")
+            self.metrics.increment("failed_executions")
+            return False
+        self.knowledge.last_adaptation = dict(adaptation)
+        if self.knowledge_log is not None:
+            self.knowledge_log.log_execute(self.knowledge.last_adaptation)
+        return True
+
+    def _is_applied(self, adaptation):
+        if self.skip_unchanged and adaptation == self.knowledge.last_adaptation:
+            self.metrics.increment("redundant_executions")
+            return True
+        return False
+
+    def _coalesce(self, adaptation, endpoint_suffix):
+        '''Merges the adaptation into the one waiting for the end of the coalescing window, or opens a new window'''
+        with self._pending_lock:
+            if self._pending_adaptation is None:
+                self._pending_adaptation = (dict(adaptation), endpoint_suffix)
+                self._pending_flush = self._schedule_flush(self.coalesce_window / 1000)
+            else:
+                self._pending_adaptation[0].update(adaptation)
+                self.metrics.increment("coalesced_executions")
+        return True
+
+    def _take_pending_adaptation(self):
+        with self._pending_lock:
+            pending, self._pending_adaptation = self._pending_adaptation, None
+            if self._pending_flush is not None:
+                self._pending_flush.cancel()
+                self._pending_flush = None
+        if pending is None or self._is_applied(pending[0]):
+            return None, None
+        return pending
+
+    def _validate(self, json_instance, json_schema, name):
+        self.metrics.increment("validations")
+        start = time.perf_counter()
+        try:
+            validate_schema(json_instance, json_schema)
+        except Exception:
+            self.metrics.increment("validation_failures")
+            raise
+        finally:
+            self.metrics.record(f"validate {name}", time.perf_counter() - start)
+
+    @contextmanager
+    def _measure(self, phase):
+        with tracing.span(phase, "phase", self.exemplar.base_endpoint), self.metrics.time(phase):
+            yield
+
+    @contextmanager
+    def _http_call(self, method, endpoint_suffix):
+        '''Times the request in the body, counting the requests that do not get a response'''
+        start = time.perf_counter()
+        try:
+            with tracing.span(f"{method} {endpoint_suffix}", "http", self.exemplar.base_endpoint):
+                yield
+        except Exception:
+            self.metrics.increment("http_failures")
+            raise
+        finally:
+            self.metrics.record(f"{method} {endpoint_suffix}", time.perf_counter() - start)
+
+    def _after_phase(self, name, result, seconds=None):
+        metrics = self.__dict__.get("metrics")
+        if metrics is not None:
+            if seconds is not None:
+                metrics.record(name, seconds)
+            if not result:
+                # Nothing will be executed in this tick.
+                metrics.increment("skipped_executions")
+        knowledge_log = self.__dict__.get("knowledge_log")
+        if knowledge_log is not None:
+            if name == "analyze":
+                knowledge_log.log_analysis(self.knowledge.analysis_data)
+            elif name == "plan":
+                knowledge_log.log_plan(self.knowledge.plan_data)
+
     @abstractmethod
     def analyze(self):
         """ ... """
@@ -88,3 +395,22 @@ class Strategy(ABC):
         """ ... """
         pass
 
+
+def _load_cached_schemas(cache_path):
+    if cache_path is None or not os.path.exists(cache_path):
+        return None
+    with open(cache_path) as f:
+        documents = json.load(f)
+    logging.info(f"schemas loaded from {cache_path}")
+    return documents
+
+
+def _store_cached_schemas(cache_path, documents):
+    if cache_path is None:
+        return
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Runs of the same image may store their schemas concurrently.
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(documents, f)
+    os.replace(tmp_path, cache_path)
@@ -0,0 +1,71 @@
+import numpy as np
+
+BASIC_REVENUE = 1
+OPT_REVENUE = 1.5
+SERVER_COST = 10
+PRECISION = 1e-5
+
+UTILITY_KEYS = ("max_servers", "arrival_rate", "dimmer_factor", "servers",
+                "basic_rt", "basic_throughput", "opt_rt", "opt_throughput")
+
+
+def utility(max_servers, arrival_rate, dimmer_factor, servers, basic_rt, basic_throughput, opt_rt, opt_throughput,
+            rt_threshold: "Response time above which the revenue is lost" = 0.75,
+            max_service_rate: "Requests per second served by one server" = 1 / 0.04452713):
+    '''
+    The SWIM utility of one or many monitored samples: the revenue of the served requests plus the cost saved
+    by unused servers while the average response time meets rt_threshold, and a penalty proportional to the
+    requests that cannot be served otherwise. Every argument may be a number or an array (one element per sample).
+    A sample without throughput is given the response time of its basic requests.
+    '''
+    arrival_rate = np.asarray(arrival_rate, dtype=np.float64)
+    dimmer_factor = np.asarray(dimmer_factor, dtype=np.float64)
+    basic_rt = np.asarray(basic_rt, dtype=np.float64)
+    throughput = np.add(basic_throughput, opt_throughput, dtype=np.float64)
+    weighted_rt = np.multiply(basic_rt, basic_throughput) + np.multiply(opt_rt, opt_throughput)
+    avg_response_time = np.divide(weighted_rt, throughput, out=basic_rt.copy(), where=throughput != 0)
+    max_servers = np.floor(np.asarray(max_servers, dtype=np.float64))
+
+    ur = arrival_rate * ((1 - dimmer_factor) * BASIC_REVENUE + dimmer_factor * OPT_REVENUE)
+    uc = SERVER_COST * (max_servers - np.asarray(servers, dtype=np.float64))
+    ur_opt = arrival_rate * OPT_REVENUE
+    rt_met = avg_response_time <= rt_threshold
+    overload_penalty = np.minimum(0.0, arrival_rate - max_servers * max_service_rate) * OPT_REVENUE
+    return np.where(rt_met & (ur >= ur_opt - PRECISION), ur + uc, np.where(rt_met, ur, overload_penalty))
+
+
+def history_utility(monitored_data: "Monitored data of a Knowledge, or any mapping of the keys to sequences",
+                    rt_threshold=0.75, max_service_rate=1 / 0.04452713):
+    '''The utility of every sample of a monitored history, computed at once'''
+    return utility(*(np.asarray(monitored_data[key], dtype=np.float64) for key in UTILITY_KEYS),
+                   rt_threshold=rt_threshold, max_service_rate=max_service_rate)
+
+
+class OnlineUtility:
+    """
+    The utility of every new monitored sample and its running total, updated in O(1) per tick, so that
+    a strategy can use the utility as a live objective during a run.
+    """
+
+    def __init__(self, rt_threshold=0.75, max_service_rate=1 / 0.04452713):
+        '''Create an instance of the OnlineUtility class'''
+        self.rt_threshold = rt_threshold
+        self.max_service_rate = max_service_rate
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+
+    def update(self, sample: "A monitored sample of SWIM"):
+        self.last = float(utility(*(sample[key] for key in UTILITY_KEYS),
+                                  rt_threshold=self.rt_threshold, max_service_rate=self.max_service_rate))
+        self.count += 1
+        self.total += self.last
+        return self.last
+
+    def update_from(self, knowledge):
+        '''Updates with the last sample monitored into a Knowledge'''
+        return self.update({key: knowledge.monitored_data[key][-1] for key in UTILITY_KEYS})
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
@@ -0,0 +1,78 @@
+"""Test doubles shared by the test cases of the strategies and transports."""
+import json
+import time
+
+from UPISAS.async_strategy import AsyncStrategy
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.strategy import Strategy
+from UPISAS.transport import Response, Transport
+
+
+class FakeExemplar:
+    """An exemplar that is only an endpoint, for strategies talking through an in-memory transport."""
+    base_endpoint = "http://exemplar"
+
+
+class ConstantStrategy(Strategy):
+    """Analyzes and plans nothing, both returning outcome."""
+    outcome = True
+
+    def analyze(self):
+        return self.outcome
+
+    def plan(self):
+        return self.outcome
+
+
+class AsyncConstantStrategy(AsyncStrategy):
+    """Analyzes and plans nothing, both returning outcome."""
+    outcome = True
+
+    def analyze(self):
+        return self.outcome
+
+    def plan(self):
+        return self.outcome
+
+
+class RecordingTransport(Transport):
+    """Accepts and keeps every executed adaptation."""
+
+    def __init__(self):
+        self.executed = []
+        self.closed = False
+
+    def request(self, method, url, json=None, **kwargs):
+        self.executed.append(dict(json))
+        return Response(200, b'"ok"')
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncRecordingTransport(RecordingTransport):
+
+    async def put(self, url, json=None, **kwargs):
+        return self.request("PUT", url, json=json)
+
+    async def close(self):
+        self.closed = True
+
+
+class CounterTransport(Transport):
+    """Serves an increasing counter under key on /monitor, after delay seconds, and accepts every adaptation."""
+
+    def __init__(self, key, delay=0.0, fail_after: "Number of samples served before raising ServerNotReachable" = None):
+        self.key = key
+        self.delay = delay
+        self.fail_after = fail_after
+        self.monitored = 0
+
+    def request(self, method, url, **kwargs):
+        time.sleep(self.delay)
+        if method == "PUT":
+            return Response(200, b'"ok"')
+        if self.fail_after is not None and self.monitored >= self.fail_after:
+            raise ServerNotReachable
+        self.monitored += 1
+        return Response(200, json.dumps({self.key: self.monitored}).encode())
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from UPISAS.async_strategy import AsyncStrategy, run_loops
+from UPISAS.exceptions import EndpointNotReachable, ServerNotReachable
+
+RESPONSES = {
+    "/monitor": {"f": 1.5},
+    "/monitor_schema": {"type": "object", "properties": {"f": {"type": "number"}}},
+    "/execute_schema": {"type": "object", "properties": {"x": {"type": "number"}, "y": {"type": "number"}}},
+}
+
+
+class _DemoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path in RESPONSES:
+            self._reply(200, RESPONSES[self.path])
+        else:
+            self._reply(404, {})
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.executed += 1
+        self._reply(200, "ok")
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _AsyncDemoStrategy(AsyncStrategy):
+
+    def analyze(self):
+        return True
+
+    def plan(self):
+        self.knowledge.plan_data = {"x": len(self.knowledge.monitored_data["f"]), "y": 5}
+        return True
+
+
+class _Exemplar:
+    def __init__(self, base_endpoint):
+        self.base_endpoint = base_endpoint
+
+
+class TestAsyncStrategy(unittest.TestCase):
+    """
+    Test cases for the AsyncStrategy class, using a local HTTP server.
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _DemoHandler)
+        self.server.executed = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.exemplar = _Exemplar(f"http://127.0.0.1:{self.server.server_address[1]}")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_monitor_successfully(self):
+        async def scenario(strategy):
+            successful = await strategy.monitor()
+            await strategy.close()
+            return successful
+        strategy = _AsyncDemoStrategy(self.exemplar)
+        self.assertTrue(asyncio.run(scenario(strategy)))
+        self.assertEqual(strategy.knowledge.monitored_data["f"], [1.5])
+
+    def test_adaptation_options_endpoint_not_reachable(self):
+        async def scenario(strategy):
+            try:
+                await strategy.get_adaptation_options(with_validation=False)
+            finally:
+                await strategy.close()
+        with self.assertRaises(EndpointNotReachable):
+            asyncio.run(scenario(_AsyncDemoStrategy(self.exemplar)))
+
+    def test_server_not_reachable(self):
+        async def scenario(strategy):
+            try:
+                await strategy.monitor(with_validation=False)
+            finally:
+                await strategy.close()
+        with self.assertRaises(ServerNotReachable):
+            asyncio.run(scenario(_AsyncDemoStrategy(_Exemplar("http://127.0.0.1:1"))))
+
+    def test_run_loops_drives_several_strategies(self):
+        strategies = [_AsyncDemoStrategy(self.exemplar) for _ in range(3)]
+        asyncio.run(run_loops(strategies, period=0.05, budget=0.2))
+        for strategy in strategies:
+            self.assertGreaterEqual(len(strategy.knowledge.monitored_data["f"]), 2)
+        self.assertGreaterEqual(self.server.executed, 6)
+
+    def test_run_loops_isolates_failing_loops(self):
+        good = _AsyncDemoStrategy(self.exemplar)
+        missing = _AsyncDemoStrategy(_Exemplar(self.exemplar.base_endpoint + "/missing"))
+        errors = asyncio.run(run_loops([good, missing], period=0.05, budget=0.3))
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], EndpointNotReachable)
+        self.assertGreaterEqual(len(good.knowledge.monitored_data["f"]), 3)
+        self.assertEqual(missing.metrics.counters["failed_loops"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+from UPISAS.exemplars.demo_model import DemoModel
+from UPISAS.exemplars.stub_exemplar import StubExemplar
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.transport import HTTPTransport
+from UPISAS.tests.upisas.helpers import AsyncConstantStrategy
+
+
+class TestConditionalGet(unittest.TestCase):
+    """
+    Test cases for the revalidation of the schemas and adaptation options with ETags.
+    """
+
+    def setUp(self):
+        self.exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False))
+        self.strategy = DemoStrategy(self.exemplar)
+
+    def tearDown(self):
+        self.strategy.transport.close()
+        self.exemplar.stop_container()
+
+    def test_stub_answers_304(self):
+        url = self.exemplar.base_endpoint + "/adaptation_options"
+        transport = HTTPTransport()
+        response = transport.get(url)
+        etag = response.headers["ETag"]
+        self.assertEqual(transport.get(url, headers={"If-None-Match": etag}).status_code, 304)
+        self.assertEqual(transport.get(url, headers={"If-None-Match": '"other"'}).status_code, 200)
+        transport.close()
+
+    def test_unchanged_options_are_not_revalidated(self):
+        self.strategy.get_adaptation_options()
+        options = self.strategy.knowledge.adaptation_options
+        validations = self.strategy.metrics.counters["validations"]
+        for _ in range(5):
+            self.strategy.get_adaptation_options()
+        self.assertIs(self.strategy.knowledge.adaptation_options, options)
+        self.assertEqual(self.strategy.metrics.counters["validations"], validations)
+        self.assertEqual(self.strategy.metrics.counters["not_modified"], 5)
+        self.assertEqual(self.exemplar.requests[("GET", "adaptation_options")], 6)
+
+    def test_changed_options_are_updated(self):
+        self.strategy.get_adaptation_options()
+        self.exemplar.model.adaptation_options = {"x": {"start": 0.0, "stop": 1.0, "type": "continuous"},
+                                                  "y": {"start": 0.0, "stop": 1.0, "type": "continuous"}}
+        self.strategy.get_adaptation_options()
+        self.assertEqual(self.strategy.knowledge.adaptation_options["x"]["stop"], 1.0)
+        self.assertNotIn("not_modified", self.strategy.metrics.counters)
+
+    def test_schemas_are_revalidated(self):
+        self.strategy.get_monitor_schema()
+        schema = self.strategy.knowledge.monitor_schema
+        self.strategy.get_monitor_schema()
+        self.assertIs(self.strategy.knowledge.monitor_schema, schema)
+        self.assertEqual(self.strategy.metrics.counters["not_modified"], 1)
+
+    def test_prefetched_options_are_revalidated(self):
+        self.strategy.prefetch_schemas(cache_dir=None)
+        self.strategy.get_adaptation_options()
+        self.assertEqual(self.strategy.metrics.counters["not_modified"], 1)
+
+    def test_async(self):
+        strategy = AsyncConstantStrategy(self.exemplar)
+
+        async def refresh():
+            await strategy.get_adaptation_options()
+            await strategy.get_adaptation_options()
+            await strategy.close()
+
+        asyncio.run(refresh())
+        self.assertEqual(strategy.knowledge.adaptation_options, DemoModel.adaptation_options)
+        self.assertEqual(strategy.metrics.counters["not_modified"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
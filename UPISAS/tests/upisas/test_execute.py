@@ -0,0 +1,93 @@
+import asyncio
+import time
+import unittest
+
+from UPISAS.exemplars.demo_model import DemoModel
+from UPISAS.exemplars.stub_exemplar import StubExemplar
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.tests.upisas.helpers import (AsyncConstantStrategy, AsyncRecordingTransport, ConstantStrategy,
+                                         FakeExemplar, RecordingTransport)
+
+
+class TestExecute(unittest.TestCase):
+    """
+    Test cases for skipping and coalescing executed adaptations.
+    """
+
+    def setUp(self):
+        self.transport = RecordingTransport()
+
+    def test_unchanged_adaptations_are_skipped(self):
+        strategy = ConstantStrategy(FakeExemplar(), self.transport)
+        for adaptation in ({"x": 1}, {"x": 1}, {"x": 2}, {"x": 2}, {"x": 1}):
+            self.assertTrue(strategy.execute(adaptation, with_validation=False))
+        self.assertEqual(self.transport.executed, [{"x": 1}, {"x": 2}, {"x": 1}])
+        self.assertEqual(strategy.metrics.counters["redundant_executions"], 2)
+        strategy.execute({"x": 1}, with_validation=False, force=True)
+        self.assertEqual(len(self.transport.executed), 4)
+
+    def test_skipping_can_be_disabled(self):
+        strategy = ConstantStrategy(FakeExemplar(), self.transport, skip_unchanged=False)
+        strategy.execute({"x": 1}, with_validation=False)
+        strategy.execute({"x": 1}, with_validation=False)
+        self.assertEqual(len(self.transport.executed), 2)
+
+    def test_plan_data_mutated_in_place(self):
+        strategy = ConstantStrategy(FakeExemplar(), self.transport)
+        strategy.knowledge.plan_data = {"x": 1}
+        strategy.execute(with_validation=False)
+        strategy.knowledge.plan_data["x"] = 2
+        strategy.execute(with_validation=False)
+        self.assertEqual(self.transport.executed, [{"x": 1}, {"x": 2}])
+
+    def test_coalescing_window(self):
+        strategy = ConstantStrategy(FakeExemplar(), self.transport, coalesce_window=100)
+        strategy.execute({"x": 1, "y": 1}, with_validation=False)
+        strategy.execute({"x": 2}, with_validation=False)
+        self.assertEqual(self.transport.executed, [])
+        time.sleep(0.3)
+        self.assertEqual(self.transport.executed, [{"x": 2, "y": 1}])
+        self.assertEqual(strategy.knowledge.last_adaptation, {"x": 2, "y": 1})
+        self.assertEqual(strategy.metrics.counters["coalesced_executions"], 1)
+        # A window whose merged adaptation is already applied sends nothing.
+        strategy.execute({"x": 2, "y": 1}, with_validation=False)
+        strategy.flush_executions()
+        self.assertEqual(len(self.transport.executed), 1)
+
+    def test_failed_executions_are_sent_again(self):
+        exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False), error_rate={"execute": 1.0})
+        strategy = DemoStrategy(exemplar)
+        self.assertFalse(strategy.execute({"x": 1, "y": 2}, with_validation=False))
+        self.assertEqual(strategy.knowledge.last_adaptation, {})
+        self.assertEqual(strategy.metrics.counters["failed_executions"], 1)
+        exemplar.error_rate = 0.0
+        self.assertTrue(strategy.execute({"x": 1, "y": 2}, with_validation=False))
+        self.assertEqual(exemplar.requests[("PUT", "execute")], 2)
+        self.assertEqual((exemplar.model.x, exemplar.model.y), (1, 2))
+        strategy.transport.close()
+        exemplar.stop_container()
+
+    def test_flush_executions(self):
+        strategy = ConstantStrategy(FakeExemplar(), self.transport, coalesce_window=10000)
+        strategy.execute({"x": 1}, with_validation=False)
+        strategy.flush_executions()
+        self.assertEqual(self.transport.executed, [{"x": 1}])
+        strategy.flush_executions()
+        self.assertEqual(len(self.transport.executed), 1)
+
+    def test_async_coalescing_window(self):
+        transport = AsyncRecordingTransport()
+        strategy = AsyncConstantStrategy(FakeExemplar(), transport, coalesce_window=50)
+
+        async def scenario():
+            await strategy.execute({"x": 1}, with_validation=False)
+            await strategy.execute({"x": 2}, with_validation=False)
+            await asyncio.sleep(0.2)
+            await strategy.execute({"x": 3}, with_validation=False)
+            await strategy.close()
+        asyncio.run(scenario())
+        self.assertEqual(transport.executed, [{"x": 2}, {"x": 3}])
+
+
+if __name__ == '__main__':
+    unittest.main()
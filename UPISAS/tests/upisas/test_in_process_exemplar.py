@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+
+from UPISAS.async_strategy import AsyncStrategy
+from UPISAS.exceptions import EndpointNotReachable, ServerNotReachable
+from UPISAS.exemplars.demo_model import DemoModel, demo_function
+from UPISAS.exemplars.in_process_exemplar import InProcessExemplar
+from UPISAS.in_process_transport import AsyncInProcessTransport, InProcessTransport
+from UPISAS.loop_logger import LoopLogger
+from UPISAS.strategies.demo_strategy import DemoStrategy
+
+
+class _AsyncDemoStrategy(AsyncStrategy):
+
+    def analyze(self):
+        return True
+
+    def plan(self):
+        self.knowledge.plan_data = {"x": 2, "y": 5}
+        return True
+
+
+class TestInProcessExemplar(unittest.TestCase):
+    """
+    Test cases for the InProcessExemplar, whose model is called without HTTP.
+    """
+
+    def setUp(self):
+        self.exemplar = InProcessExemplar(auto_start=True, model=DemoModel(enable_random=False))
+        self.strategy = DemoStrategy(self.exemplar, loop_logger=LoopLogger(handlers=[], max_rate=0))
+
+    def _run(self, ticks):
+        for _ in range(ticks):
+            self.strategy.monitor()
+            if self.strategy.analyze():
+                if self.strategy.plan():
+                    self.strategy.execute()
+
+    def test_strategy_uses_the_in_process_transport(self):
+        self.assertIsInstance(self.strategy.transport, InProcessTransport)
+
+    def test_loop(self):
+        self.strategy.get_adaptation_options()
+        self._run(1000)
+        self.assertEqual(self.strategy.knowledge.monitored_data["f"][:2], [demo_function(0, 0), demo_function(2, 5)])
+        self.assertEqual(len(self.strategy.knowledge.monitored_data["f"]), 1000)
+        self.assertEqual((self.exemplar.model.x, self.exemplar.model.y), (2, 5))
+
+    def test_lifecycle(self):
+        self.exemplar.pause_container()
+        with self.assertRaises(ServerNotReachable):
+            self.strategy.monitor()
+        self.exemplar.unpause_container()
+        self.assertTrue(self.strategy.monitor())
+        self.exemplar.stop_container()
+        with self.assertRaises(ServerNotReachable):
+            self.strategy.monitor()
+
+    def test_unknown_endpoint(self):
+        with self.assertRaises(EndpointNotReachable):
+            self.strategy._perform_get_request("unknown")
+
+    def test_async_strategy(self):
+        strategy = _AsyncDemoStrategy(self.exemplar, loop_logger=LoopLogger(handlers=[], max_rate=0))
+        self.assertIsInstance(strategy.transport, AsyncInProcessTransport)
+
+        async def scenario():
+            await strategy.monitor()
+            strategy.plan()
+            await strategy.execute()
+            await strategy.monitor()
+        asyncio.run(scenario())
+        self.assertEqual(strategy.knowledge.monitored_data["f"], [demo_function(0, 0), demo_function(2, 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from UPISAS.columnar import ColumnarKnowledge, flatten_record, load_spilled_history
+from UPISAS.knowledge import Knowledge, RingBuffer
+from UPISAS.running_stats import RunningStats
+
+
+class TestRingBuffer(unittest.TestCase):
+    """
+    Test cases for the RingBuffer class.
+    """
+
+    def test_keeps_last_values_once_full(self):
+        buffer = RingBuffer(capacity=3)
+        for value in range(5):
+            buffer.append(value)
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer, [2, 3, 4])
+        self.assertEqual(buffer[-1], 4)
+        self.assertEqual(buffer[0], 2)
+        self.assertEqual(buffer[-2:], [3, 4])
+        self.assertEqual(sum(buffer), 9)
+
+    def test_index_out_of_range(self):
+        buffer = RingBuffer(capacity=2)
+        buffer.append(1)
+        with self.assertRaises(IndexError):
+            buffer[1]
+
+    def test_drops_values_older_than_max_age(self):
+        buffer = RingBuffer(max_age=10)
+        for t in range(100):
+            buffer.append(t, timestamp=float(t))
+        self.assertEqual(buffer, list(range(89, 100)))
+
+    def test_capacity_and_max_age_combined(self):
+        buffer = RingBuffer(capacity=5, max_age=2)
+        for t in range(4):
+            buffer.append(t, timestamp=float(t))
+        self.assertEqual(buffer, [1, 2, 3])
+        for t in range(4, 20):
+            buffer.append(t, timestamp=4.0)
+        self.assertEqual(buffer, list(range(15, 20)))
+
+
+class TestKnowledge(unittest.TestCase):
+    """
+    Test cases for the retention policy of the Knowledge class.
+    """
+
+    def test_unbounded_by_default(self):
+        knowledge = Knowledge.empty()
+        for i in range(10):
+            knowledge.add_sample({"f": i})
+        self.assertEqual(knowledge.monitored_data, {"f": list(range(10))})
+
+    def test_max_samples(self):
+        knowledge = Knowledge.empty(max_samples=4)
+        for i in range(10):
+            knowledge.add_sample({"f": i, "servers": [{"utilization_value": i}]})
+        self.assertEqual(knowledge.monitored_data["f"], [6, 7, 8, 9])
+        self.assertEqual(knowledge.monitored_data["servers"][-1], [{"utilization_value": 9}])
+
+    def test_running_stats_cover_the_whole_run(self):
+        knowledge = Knowledge.empty(max_samples=4)
+        for i in range(1, 11):
+            knowledge.add_sample({"f": i, "label": "x", "on": True})
+        stats = knowledge.monitored_stats["f"]
+        self.assertEqual((stats.count, stats.mean, stats.min, stats.max), (10, 5.5, 1, 10))
+        self.assertNotIn("label", knowledge.monitored_stats)
+        self.assertNotIn("on", knowledge.monitored_stats)
+
+
+class TestWindowedQueries(unittest.TestCase):
+    """
+    Test cases for the timestamped, windowed queries on monitored data, for every backend.
+    """
+
+    def _check_backend(self, knowledge):
+        for t in range(100):
+            knowledge.add_sample({"f": t}, timestamp=float(t))
+        self.assertEqual(list(knowledge.last("f", 3)), [97, 98, 99])
+        self.assertEqual(list(knowledge.since("f", 95.5)), [96, 97, 98, 99])
+        self.assertEqual(list(knowledge.window("f", 90, 92)), [90, 91, 92])
+        self.assertEqual(list(knowledge.window("f", 200, 300)), [])
+        self.assertEqual(len(knowledge.last("f", 0)), 0)
+
+    def test_series(self):
+        self._check_backend(Knowledge.empty())
+
+    def test_ring_buffer(self):
+        knowledge = Knowledge.empty(max_samples=50)
+        self._check_backend(knowledge)
+        self.assertEqual(list(knowledge.since("f", 0)), list(range(50, 100)))
+
+    def test_columnar(self):
+        knowledge = ColumnarKnowledge.empty()
+        self._check_backend(knowledge)
+        self.assertIs(knowledge.window("f", 90, 95).base, knowledge.array("f").base)
+
+    def test_columnar_times(self):
+        knowledge = ColumnarKnowledge.empty()
+        self._check_backend(knowledge)
+        self.assertEqual(list(knowledge.times.since(97.5)), [98.0, 99.0])
+        self.assertEqual(list(knowledge.times.window(2, 4)), [2.0, 3.0, 4.0])
+
+    def test_view_times(self):
+        knowledge = Knowledge.empty()
+        for t in range(10):
+            knowledge.add_sample({"f": t * t}, timestamp=t / 10)
+        view = knowledge.window("f", 0.2, 0.4)
+        self.assertEqual(list(view), [4, 9, 16])
+        self.assertEqual(list(view.times), [0.2, 0.3, 0.4])
+
+
+class TestRunningStats(unittest.TestCase):
+    """
+    Test cases for the RunningStats class, against NumPy on the full history.
+    """
+
+    def setUp(self):
+        self.samples = np.random.default_rng(42).lognormal(size=20000)
+        self.stats = RunningStats(ewma_alpha=0.2, quantiles=(0.5, 0.9, 0.99))
+        for x in self.samples:
+            self.stats.add(x)
+
+    def test_moments(self):
+        self.assertEqual(self.stats.count, len(self.samples))
+        self.assertAlmostEqual(self.stats.mean, self.samples.mean())
+        self.assertAlmostEqual(self.stats.variance, self.samples.var(ddof=1))
+        self.assertEqual((self.stats.min, self.stats.max), (self.samples.min(), self.samples.max()))
+
+    def test_ewma(self):
+        ewma = self.samples[0]
+        for x in self.samples[1:]:
+            ewma += 0.2 * (x - ewma)
+        self.assertAlmostEqual(self.stats.ewma, ewma)
+
+    def test_quantiles(self):
+        for p in (0.5, 0.9, 0.99):
+            exact = np.quantile(self.samples, p)
+            self.assertAlmostEqual(self.stats.quantile(p), exact, delta=0.05 * exact)
+
+    def test_few_samples(self):
+        stats = RunningStats()
+        for x in (3, 1, 2):
+            stats.add(x)
+        self.assertEqual(stats.quantile(0.5), 2)
+
+
+class TestColumnarKnowledge(unittest.TestCase):
+    """
+    Test cases for the ColumnarKnowledge class.
+    """
+
+    def test_flatten_record(self):
+        sample = {"servers": 2, "utilization": [{"server": "s1", "utilization_value": 0.25},
+                                                {"server": "s2", "utilization_value": 0.5}], "rt": [0.1, 0.2]}
+        self.assertEqual(flatten_record(sample, ".", ("server",)), {
+            "servers": 2, "utilization.s1.utilization_value": 0.25, "utilization.s2.utilization_value": 0.5,
+            "rt.0": 0.1, "rt.1": 0.2})
+
+    def test_columns_are_typed_arrays(self):
+        knowledge = ColumnarKnowledge.empty()
+        for i in range(100):
+            knowledge.add_sample({"servers": i, "basic_rt": i / 10, "booting": i % 2 == 0})
+        self.assertEqual(knowledge.array("servers").dtype, np.int64)
+        self.assertEqual(knowledge.array("basic_rt").dtype, np.float64)
+        self.assertEqual(knowledge.array("booting").dtype, np.bool_)
+        self.assertEqual(knowledge.monitored_data["servers"][-1], 99)
+        self.assertAlmostEqual(knowledge.array("basic_rt").mean(), 4.95)
+
+    def test_dtype_promotion_and_missing_values(self):
+        knowledge = ColumnarKnowledge.empty()
+        knowledge.add_sample({"a": 1})
+        knowledge.add_sample({"a": 2.5, "b": 1})
+        knowledge.add_sample({"b": 2})
+        np.testing.assert_array_equal(knowledge.array("a"), [1.0, 2.5, np.nan])
+        np.testing.assert_array_equal(knowledge.array("b"), [np.nan, 1.0, 2.0])
+
+    def test_matrix_of_nested_records(self):
+        knowledge = ColumnarKnowledge.empty()
+        knowledge.add_sample({"utilization": [{"utilization_value": 0.5}]})
+        knowledge.add_sample({"utilization": [{"utilization_value": 0.25}, {"utilization_value": 0.75}]})
+        matrix = knowledge.matrix("utilization", "utilization_value")
+        self.assertEqual(matrix.shape, (2, 2))
+        np.testing.assert_array_equal(np.nansum(matrix, axis=1), [0.5, 1.0])
+
+
+class TestSpillingColumnarKnowledge(unittest.TestCase):
+    """
+    Test cases for the spill-to-disk mode of the ColumnarKnowledge class.
+    """
+
+    def setUp(self):
+        self.spill_dir = tempfile.TemporaryDirectory()
+        self.knowledge = ColumnarKnowledge.empty(spill_dir=self.spill_dir.name, hot_window=16)
+
+    def tearDown(self):
+        self.spill_dir.cleanup()
+
+    def test_time_queries_span_spilled_and_hot_times(self):
+        for t in range(100):
+            self.knowledge.add_sample({"f": t}, timestamp=float(t))
+        self.assertEqual(list(self.knowledge.times.window(2, 4)), [2.0, 3.0, 4.0])
+        self.assertEqual(list(self.knowledge.times.since(90)), [float(t) for t in range(90, 100)])
+
+    def test_memory_stays_flat_and_reads_see_the_whole_history(self):
+        for t in range(1000):
+            self.knowledge.add_sample({"servers": t, "utilization": [{"utilization_value": t / 2}]}, timestamp=float(t))
+        column = self.knowledge.monitored_data["servers"]
+        self.assertLessEqual(len(column.hot_values), 32)
+        self.assertEqual(len(column), 1000)
+        self.assertEqual((column[0], column[500], column[-1]), (0, 500, 999))
+        np.testing.assert_array_equal(self.knowledge.array("servers"), np.arange(1000))
+        np.testing.assert_array_equal(self.knowledge.window("servers", 10, 12), [10, 11, 12])
+        np.testing.assert_array_equal(self.knowledge.since("servers", 995), [995, 996, 997, 998, 999])
+        np.testing.assert_array_equal(self.knowledge.last("utilization.0.utilization_value", 2), [499, 499.5])
+
+    def test_dtype_promotion_after_spill(self):
+        for t in range(100):
+            self.knowledge.add_sample({"a": t}, timestamp=float(t))
+        self.knowledge.add_sample({"a": 0.5}, timestamp=100.0)
+        self.knowledge.add_sample({"a": "text"}, timestamp=101.0)
+        column = self.knowledge.monitored_data["a"]
+        self.assertEqual(column.dtype, object)
+        self.assertEqual((column[3], column[100], column[-1]), (3.0, 0.5, "text"))
+
+    def test_load_spilled_history(self):
+        for t in range(100):
+            self.knowledge.add_sample({"f": t * 2}, timestamp=float(t))
+        self.knowledge.flush()
+        times, columns = load_spilled_history(self.spill_dir.name)
+        np.testing.assert_array_equal(times, np.arange(100))
+        np.testing.assert_array_equal(columns["f"], np.arange(100) * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import gc
+import logging
+import unittest
+
+from UPISAS.knowledge import Knowledge
+from UPISAS.loop_logger import LoopLogger
+from UPISAS.tests.upisas.helpers import ConstantStrategy, FakeExemplar, RecordingTransport
+
+
+class _ListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(f"[{record.phase}] {record.getMessage()}")
+
+
+class TestLoopLogger(unittest.TestCase):
+    """
+    Test cases for the LoopLogger class.
+    """
+
+    def setUp(self):
+        self.handler = _ListHandler()
+        self.knowledge = Knowledge.empty()
+
+    def _monitor(self, loop_logger, samples):
+        for i in range(samples):
+            sample = {"f": float(i)}
+            self.knowledge.add_sample(sample)
+            loop_logger.sample(sample, self.knowledge)
+        loop_logger.close()
+
+    def test_only_new_samples_are_logged(self):
+        self._monitor(LoopLogger(handlers=[self.handler], summary_period=None), 50)
+        self.assertEqual(len(self.handler.messages), 50)
+        self.assertEqual(self.handler.messages[-1], "[Monitor] got fresh_data: {'f': 49.0}")
+
+    def test_periodic_summary(self):
+        self._monitor(LoopLogger(handlers=[self.handler], summary_period=0), 3)
+        summaries = [m for m in self.handler.messages if m.startswith("[Knowledge]")]
+        self.assertEqual(len(summaries), 3)
+        self.assertEqual(summaries[-1], "[Knowledge] f: n=3 mean=1 min=0 max=2 last=2")
+
+    def test_rate_limit(self):
+        loop_logger = LoopLogger(handlers=[self.handler], summary_period=None, max_rate=10)
+        self._monitor(loop_logger, 100)
+        self.assertLessEqual(len(self.handler.messages), 11)
+        self.assertGreaterEqual(loop_logger.suppressed, 89)
+        loop_logger.summary(self.knowledge)
+        loop_logger.close()
+        self.assertTrue(self.handler.messages[-1].endswith("records suppressed by the rate limit"))
+
+    def test_records_are_not_propagated_to_root(self):
+        loop_logger = LoopLogger(handlers=[self.handler])
+        with self.assertNoLogs(level=logging.INFO):
+            loop_logger.execute({"x": 1})
+            loop_logger.close()
+        self.assertEqual(self.handler.messages, ["[Execute] posted configuration: {'x': 1}"])
+
+    def test_discarded_logger_stops_its_listener(self):
+        loop_logger = LoopLogger(handlers=[self.handler])
+        loop_logger.plan({"x": 1})
+        listener_thread = loop_logger._listener._thread
+        del loop_logger
+        gc.collect()
+        listener_thread.join(timeout=5)
+        self.assertFalse(listener_thread.is_alive())
+        self.assertEqual(self.handler.messages, ["[Plan] {'x': 1}"])
+
+    def test_closing_the_strategy_stops_its_listener(self):
+        transport = RecordingTransport()
+        strategy = ConstantStrategy(FakeExemplar(), transport, loop_logger=LoopLogger(handlers=[self.handler]))
+        strategy.loop_logger.plan({"x": 1})
+        listener_thread = strategy.loop_logger._listener._thread
+        strategy.close()
+        self.assertFalse(listener_thread.is_alive())
+        self.assertTrue(transport.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.metrics import Histogram, Metrics
+from UPISAS.strategy import Strategy
+from UPISAS.transport import Response, Transport
+from UPISAS.tests.upisas.helpers import FakeExemplar
+
+
+class _Transport(Transport):
+    """Serves a fixed monitor sample and schema, and fails every request once failing is set."""
+
+    MONITOR_SCHEMA = {"type": "object", "properties": {"f": {"type": "number"}}, "required": ["f"]}
+
+    def __init__(self):
+        self.failing = False
+
+    def request(self, method, url, **kwargs):
+        if self.failing:
+            raise ServerNotReachable
+        if method == "PUT":
+            return Response(200, b'"ok"')
+        if url.endswith("monitor_schema"):
+            return Response(200, json.dumps(self.MONITOR_SCHEMA).encode())
+        return Response(200, b'{"f": 1.5}')
+
+
+class _AlternatingStrategy(Strategy):
+    """Plans an adaptation on every other tick."""
+
+    def analyze(self):
+        return True
+
+    def plan(self):
+        self.knowledge.plan_data = {"x": len(self.knowledge.monitored_data["f"])}
+        return len(self.knowledge.monitored_data["f"]) % 2 == 0
+
+
+class _UninitializedStrategy(Strategy):
+    """Like the strategies that do not call Strategy.__init__."""
+
+    def __init__(self):
+        self.analysis_data = {}
+
+    def analyze(self, state=None):
+        self.analysis_data["state"] = state
+        return True
+
+    def plan(self):
+        return False
+
+
+class TestHistogram(unittest.TestCase):
+    """
+    Test cases for the HDR-style Histogram.
+    """
+
+    def test_percentiles_within_relative_error(self):
+        histogram = Histogram()
+        values = [i * 1e-4 for i in range(1, 10001)]
+        for value in values:
+            histogram.record(value)
+        self.assertEqual(histogram.count, 10000)
+        self.assertEqual(histogram.min, values[0])
+        self.assertEqual(histogram.max, values[-1])
+        for p in (50, 90, 99, 99.9):
+            self.assertAlmostEqual(histogram.percentile(p), p / 100, delta=p / 100 * 2 ** -7)
+
+    def test_empty(self):
+        snapshot = Histogram().snapshot()
+        self.assertEqual(snapshot["count"], 0)
+        self.assertNotEqual(snapshot["p50"], snapshot["p50"])
+
+
+class TestStrategyMetrics(unittest.TestCase):
+    """
+    Test cases for the per-phase and per-request metrics of a Strategy.
+    """
+
+    def setUp(self):
+        self.transport = _Transport()
+        self.strategy = _AlternatingStrategy(FakeExemplar(), self.transport)
+
+    def _run(self, ticks):
+        for _ in range(ticks):
+            self.strategy.monitor()
+            if self.strategy.analyze():
+                if self.strategy.plan():
+                    self.strategy.execute(with_validation=False)
+
+    def test_phases_and_requests_are_timed(self):
+        self._run(4)
+        histograms = self.strategy.metrics.snapshot()["histograms"]
+        self.assertEqual(histograms["monitor"]["count"], 4)
+        self.assertEqual(histograms["GET monitor"]["count"], 4)
+        self.assertEqual(histograms["GET monitor_schema"]["count"], 1)
+        self.assertEqual(histograms["validate monitor"]["count"], 4)
+        self.assertEqual(histograms["analyze"]["count"], 4)
+        self.assertEqual(histograms["plan"]["count"], 4)
+        self.assertEqual(histograms["execute"]["count"], 2)
+        self.assertEqual(histograms["PUT execute"]["count"], 2)
+        self.assertLessEqual(histograms["GET monitor"]["max"], histograms["monitor"]["max"])
+
+    def test_counters(self):
+        self._run(4)
+        self.assertEqual(self.strategy.metrics.counters, {"validations": 4, "skipped_executions": 2})
+        self.transport.failing = True
+        with self.assertRaises(ServerNotReachable):
+            self.strategy.monitor()
+        self.assertEqual(self.strategy.metrics.counters["http_failures"], 1)
+
+    def test_validation_failures(self):
+        self._run(1)
+        with self.assertRaises(Exception):
+            self.strategy._update_monitored_data({"f": "not a number"})
+        self.assertEqual(self.strategy.metrics.counters["validation_failures"], 1)
+
+    def test_export(self):
+        self._run(2)
+        with tempfile.TemporaryDirectory() as directory:
+            self.strategy.metrics.export(directory)
+            with open(os.path.join(directory, "metrics.json")) as f:
+                exported = json.load(f)
+            with open(os.path.join(directory, "metrics.csv")) as f:
+                rows = {row["name"]: row for row in csv.DictReader(f)}
+        self.assertEqual(exported["histograms"]["monitor"]["count"], 2)
+        self.assertEqual(rows["monitor"]["count"], "2")
+        self.assertEqual(rows["validations"]["count"], "2")
+
+    def test_strategy_without_init_is_not_instrumented(self):
+        strategy = _UninitializedStrategy()
+        self.assertTrue(strategy.analyze(1))
+        self.assertFalse(strategy.plan())
+        self.assertEqual(strategy.analysis_data, {"state": 1})
+        strategy._after_phase("plan", False)
+
+    def test_shared_metrics(self):
+        metrics = Metrics()
+        strategies = [_AlternatingStrategy(FakeExemplar(), _Transport(), metrics=metrics) for _ in range(2)]
+        for strategy in strategies:
+            strategy.monitor()
+        self.assertEqual(metrics.histograms["monitor"].count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
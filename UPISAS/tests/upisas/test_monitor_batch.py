@@ -0,0 +1,132 @@
+import asyncio
+import time
+import unittest
+
+from UPISAS.exemplars.demo_model import DemoModel, demo_function
+from UPISAS.exemplars.monitor_history import MonitorHistory
+from UPISAS.exemplars.stub_exemplar import StubExemplar
+from UPISAS.exemplars.swim_simulator import SWIMSimulator
+from UPISAS.columnar import Column, ColumnarKnowledge
+from UPISAS.knowledge import Knowledge, RingBuffer
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.tests.upisas.helpers import AsyncConstantStrategy
+
+
+class TestMonitorHistory(unittest.TestCase):
+    """
+    Test cases for the samples served by /monitor_batch.
+    """
+
+    def test_since(self):
+        history = MonitorHistory(capacity=3)
+        for f in range(5):
+            history.append({"f": f})
+        batch = history.since(3)
+        self.assertEqual((batch["cursor"], batch["dropped"]), (5, 0))
+        self.assertEqual([sample["data"]["f"] for sample in batch["samples"]], [3, 4])
+        self.assertEqual(history.since(5)["samples"], [])
+
+    def test_dropped(self):
+        history = MonitorHistory(capacity=3)
+        for f in range(5):
+            history.append({"f": f})
+        batch = history.since(0)
+        self.assertEqual(batch["dropped"], 2)
+        self.assertEqual([sample["data"]["f"] for sample in batch["samples"]], [2, 3, 4])
+
+    def test_cursor_of_an_earlier_run(self):
+        history = MonitorHistory()
+        history.append({"f": 0})
+        batch = history.since(10)
+        self.assertEqual((batch["cursor"], len(batch["samples"])), (1, 1))
+
+
+class TestMonitorBatch(unittest.TestCase):
+    """
+    Test cases for Strategy.monitor_batch and the bulk append of samples to the Knowledge.
+    """
+
+    def setUp(self):
+        self.exemplar = None
+
+    def tearDown(self):
+        if self.exemplar is not None:
+            self.exemplar.stop_container()
+
+    def test_add_samples(self):
+        knowledge = Knowledge.empty()
+        knowledge.add_samples([{"f": 1.0}, {"f": 2.0, "g": "a"}, {"f": 3.0}], [1.0, 2.0, 3.0])
+        self.assertEqual(knowledge.monitored_data["f"], [1.0, 2.0, 3.0])
+        self.assertEqual(knowledge.monitored_data["g"], ["a"])
+        self.assertEqual(knowledge.since("f", 2.0), [2.0, 3.0])
+        self.assertEqual(knowledge.monitored_stats["f"].count, 3)
+
+    def test_add_samples_to_ring_buffers(self):
+        knowledge = Knowledge.empty(max_samples=2)
+        knowledge.add_samples([{"f": 1.0}, {"f": 2.0}, {"f": 3.0}], [1.0, 2.0, 3.0])
+        self.assertIsInstance(knowledge.monitored_data["f"], RingBuffer)
+        self.assertEqual(knowledge.monitored_data["f"], [2.0, 3.0])
+
+    def test_one_sample_per_request_without_sampling(self):
+        self.exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False))
+        strategy = DemoStrategy(self.exemplar)
+        for _ in range(3):
+            self.assertTrue(strategy.monitor_batch())
+        self.assertEqual(strategy.monitor_cursor, 3)
+        self.assertEqual(strategy.knowledge.monitored_data["f"], [demo_function(0, 0)] * 3)
+        strategy.transport.close()
+
+    def test_samples_between_requests_are_kept(self):
+        self.exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False), sample_period=0.005)
+        strategy = DemoStrategy(self.exemplar)
+        time.sleep(0.1)
+        self.assertTrue(strategy.monitor_batch())
+        time.sleep(0.05)
+        strategy.monitor_batch()
+        monitored = strategy.knowledge.monitored_data["f"]
+        self.assertGreater(len(monitored), 2)
+        self.assertEqual(len(monitored), strategy.monitor_cursor)
+        self.assertEqual(self.exemplar.requests[("GET", "monitor_batch")], 2)
+        self.assertEqual(monitored.times, sorted(monitored.times))
+        self.assertLessEqual(monitored.times[-1], time.monotonic())
+        strategy.transport.close()
+
+    def test_columnar_knowledge(self):
+        self.exemplar = StubExemplar(auto_start=True, model=SWIMSimulator(seed=0))
+        strategy = DemoStrategy(self.exemplar, knowledge=ColumnarKnowledge.empty())
+        for _ in range(3):
+            strategy.monitor_batch()
+        knowledge = strategy.knowledge
+        self.assertEqual(knowledge.sample_count, 3)
+        self.assertEqual(len(knowledge.times), 3)
+        self.assertEqual(len(knowledge.array("basic_rt")), 3)
+        self.assertEqual(knowledge.matrix("utilization", "utilization_value").shape, (3, 1))
+        self.assertTrue(all(isinstance(column, Column) for column in knowledge.monitored_data.values()))
+        strategy.transport.close()
+
+    def test_dropped_samples_are_counted(self):
+        self.exemplar = StubExemplar(auto_start=True, history_size=2)
+        for _ in range(5):
+            self.exemplar.history.append({"f": 0.0})
+        strategy = DemoStrategy(self.exemplar)
+        strategy.monitor_batch()
+        self.assertEqual(strategy.metrics.counters["dropped_samples"], 4)
+        self.assertEqual(len(strategy.knowledge.monitored_data["f"]), 2)
+        strategy.transport.close()
+
+    def test_async(self):
+        self.exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False))
+        strategy = AsyncConstantStrategy(self.exemplar)
+
+        async def monitor():
+            await strategy.monitor_batch()
+            await strategy.monitor_batch()
+            await strategy.close()
+
+        asyncio.run(monitor())
+        self.assertEqual(len(strategy.knowledge.monitored_data["f"]), 2)
+        self.assertEqual(strategy.monitor_cursor, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
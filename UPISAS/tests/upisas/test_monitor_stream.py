@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from UPISAS.exceptions import EndpointNotReachable
+from UPISAS.exemplars.demo_model import DemoModel
+from UPISAS.exemplars.stub_exemplar import StubExemplar
+from UPISAS.monitor_stream import StreamingLoop
+from UPISAS.strategy import Strategy
+
+
+class _CountingStrategy(Strategy):
+
+    def __init__(self, exemplar):
+        super().__init__(exemplar)
+        self.analyzed = 0
+
+    def analyze(self):
+        self.analyzed += 1
+        return False
+
+    def plan(self):
+        return False
+
+
+class _MalformedStreamHandler(BaseHTTPRequestHandler):
+    """Sends malformed events, then a sample, then closes the stream."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.write(b'id: 0\ndata: not json\n\nid: 1\ndata: \xff\n\nid: 2\ndata: {"data": {"f": 1.0}}\n\n')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Exemplar:
+
+    def __init__(self, base_endpoint):
+        self.base_endpoint = base_endpoint
+
+
+class TestStreamingLoop(unittest.TestCase):
+    """
+    Test cases for the StreamingLoop, which runs the MAPE-K loop on the samples pushed on /monitor_stream.
+    """
+
+    def setUp(self):
+        self.exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False), sample_period=0.01)
+        self.strategy = _CountingStrategy(self.exemplar)
+
+    def tearDown(self):
+        self.strategy.transport.close()
+        self.exemplar.stop_container()
+
+    def test_loop_wakes_on_samples(self):
+        loop = StreamingLoop(self.strategy)
+        loop.run(budget=0.3)
+        monitored = self.strategy.knowledge.monitored_data["f"]
+        self.assertGreater(loop.ticks, 1)
+        self.assertEqual(self.strategy.analyzed, loop.ticks)
+        self.assertEqual(len(monitored), loop.events)
+        self.assertEqual(self.exemplar.requests[("GET", "monitor_stream")], 1)
+        self.assertEqual(self.exemplar.requests[("GET", "monitor")], 0)
+
+    def test_resume_from_last_event_id(self):
+        loop = StreamingLoop(self.strategy)
+        # Resuming after the event before the first sample replays every sample monitored so far.
+        loop.last_event_id = "-1"
+        loop.run(budget=0.2)
+        time.sleep(0.1)
+        loop.run(budget=0.2)
+        monitored = self.strategy.knowledge.monitored_data["f"]
+        self.assertEqual(len(monitored), int(loop.last_event_id) + 1)
+        self.assertEqual(self.exemplar.requests[("GET", "monitor_stream")], 2)
+
+    def test_reconnect(self):
+        loop = StreamingLoop(self.strategy, reconnect_delay=0.05)
+        loop.last_event_id = "-1"
+        runner = threading.Thread(target=loop.run, kwargs={"budget": 3})
+        runner.start()
+        time.sleep(0.3)
+        self.exemplar.stop_container(remove=False)
+        time.sleep(0.2)
+        self.exemplar.start_container()
+        time.sleep(0.5)
+        loop.stop()
+        runner.join()
+        self.assertGreaterEqual(loop.reconnects, 1)
+        self.assertEqual(self.strategy.metrics.counters["stream_reconnects"], loop.reconnects)
+        self.assertGreaterEqual(self.exemplar.requests[("GET", "monitor_stream")], 2)
+        self.assertEqual(len(self.strategy.knowledge.monitored_data["f"]), int(loop.last_event_id) + 1)
+
+    def test_missing_endpoint(self):
+        loop = StreamingLoop(self.strategy, endpoint_suffix="missing_stream")
+        with self.assertRaises(EndpointNotReachable):
+            loop.run(budget=5)
+
+    def test_malformed_events_are_skipped(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _MalformedStreamHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        strategy = _CountingStrategy(_Exemplar(f"http://127.0.0.1:{server.server_address[1]}"))
+        loop = StreamingLoop(strategy, with_validation=False, reconnect_delay=0.05)
+        try:
+            loop.run(budget=0.5)
+        finally:
+            server.shutdown()
+            server.server_close()
+            strategy.close()
+        self.assertGreaterEqual(strategy.metrics.counters["malformed_events"], 1)
+        self.assertGreaterEqual(loop.reconnects, 1)
+        self.assertEqual(set(strategy.knowledge.monitored_data["f"]), {1.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.pipeline import PipelinedLoop
+from UPISAS.strategy import Strategy
+from UPISAS.tests.upisas.helpers import CounterTransport, FakeExemplar
+
+
+class _SlowStrategy(Strategy):
+    """Spends about as long in analyze() as the transport spends in a request."""
+
+    def __init__(self, exemplar, transport, analysis_time):
+        super().__init__(exemplar, transport)
+        self.analysis_time = analysis_time
+        self.analyzed = []
+
+    def analyze(self):
+        time.sleep(self.analysis_time)
+        self.analyzed.append(self.knowledge.monitored_data["n"][-1])
+        return True
+
+    def plan(self):
+        self.knowledge.plan_data = {"n": self.analyzed[-1]}
+        return True
+
+
+class TestPipelinedLoop(unittest.TestCase):
+    """
+    Test cases for the PipelinedLoop class, using an in-memory transport.
+    """
+
+    def test_monitoring_overlaps_analysis(self):
+        transport = CounterTransport("n", delay=0.02)
+        strategy = _SlowStrategy(FakeExemplar(), transport, analysis_time=0.02)
+        PipelinedLoop(strategy, with_validation=False).run(budget=0.5)
+        # Sequentially a tick would take ~0.06s (GET + analyze + PUT); pipelined the GET is hidden.
+        self.assertGreater(len(strategy.analyzed), 0.5 / 0.06)
+        self.assertEqual(strategy.knowledge.monitored_data["n"], list(range(1, len(strategy.knowledge.monitored_data["n"]) + 1)))
+
+    def test_latest_only_analyzes_newest_sample_and_stores_all(self):
+        transport = CounterTransport("n", delay=0.001)
+        strategy = _SlowStrategy(FakeExemplar(), transport, analysis_time=0.05)
+        loop = PipelinedLoop(strategy, queue_size=8, with_validation=False)
+        loop.run(budget=0.3)
+        self.assertGreater(loop.coalesced_samples, 0)
+        self.assertLess(len(strategy.analyzed), len(strategy.knowledge.monitored_data["n"]))
+
+    def test_stale_samples_are_not_acted_upon(self):
+        transport = CounterTransport("n", delay=0.0)
+        strategy = _SlowStrategy(FakeExemplar(), transport, analysis_time=0.05)
+        loop = PipelinedLoop(strategy, queue_size=4, max_staleness=0.01, latest_only=False, with_validation=False)
+        loop.run(budget=0.3)
+        self.assertGreater(loop.stale_samples, 0)
+
+    def test_monitor_failure_is_raised_in_caller(self):
+        transport = CounterTransport("n", delay=0.0, fail_after=3)
+        strategy = _SlowStrategy(FakeExemplar(), transport, analysis_time=0.0)
+        with self.assertRaises(ServerNotReachable):
+            PipelinedLoop(strategy, latest_only=False, with_validation=False).run(budget=5)
+        self.assertEqual(strategy.knowledge.monitored_data["n"], [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import time
+import unittest
+
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.exemplars.replay_exemplar import ReplayExemplar, ReplayModel
+from UPISAS.exemplars.stub_exemplar import StubExemplar
+from UPISAS.loop_logger import LoopLogger
+from UPISAS.recording import RecordingTransport, read_trace
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.transport import HTTPTransport
+
+
+class TestReplayExemplar(unittest.TestCase):
+    """
+    Test cases for recording the traffic of a strategy and replaying it with a ReplayExemplar.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "run.trace")
+        self.exemplar = StubExemplar(auto_start=True, latency={"monitor": 0.02})
+        self.recorded = self._strategy(self.exemplar, RecordingTransport(HTTPTransport(), self.path))
+        self.recorded.get_adaptation_options()
+        self._run(self.recorded, 5)
+        self.recorded.transport.close()
+
+    def tearDown(self):
+        self.exemplar.stop_container()
+        self.directory.cleanup()
+
+    def _strategy(self, exemplar, transport=None):
+        return DemoStrategy(exemplar, transport, loop_logger=LoopLogger(handlers=[], max_rate=0))
+
+    def _run(self, strategy, ticks):
+        for _ in range(ticks):
+            strategy.monitor()
+            if strategy.analyze():
+                if strategy.plan():
+                    strategy.execute()
+
+    def test_trace(self):
+        records = read_trace(self.path)
+        self.assertEqual([r.endpoint for r in records[:3]],
+                         ["adaptation_options", "adaptation_options_schema", "monitor"])
+        self.assertEqual(sum(r.endpoint == "monitor" for r in records), 5)
+        self.assertTrue(all(r.status_code == 200 for r in records))
+        self.assertEqual(sorted(r.time for r in records), [r.time for r in records])
+
+    def test_replay_reproduces_the_run(self):
+        replay = ReplayExemplar(self.path, auto_start=True)
+        strategy = self._strategy(replay)
+        strategy.get_adaptation_options()
+        self._run(strategy, 5)
+        self.assertEqual(list(strategy.knowledge.monitored_data["f"]), list(self.recorded.knowledge.monitored_data["f"]))
+        self.assertEqual(replay.model.executed, replay.model.recorded_executions)
+        with self.assertRaises(ServerNotReachable):
+            strategy.monitor()
+
+    def test_replay_at_recorded_speed(self):
+        strategy = self._strategy(ReplayExemplar(self.path, speed=1.0, auto_start=True))
+        start = time.monotonic()
+        self._run(strategy, 5)
+        self.assertGreaterEqual(time.monotonic() - start, 4 * 0.02)
+
+    def test_replay_over_http(self):
+        stub = StubExemplar(auto_start=True, model=ReplayModel(self.path))
+        try:
+            strategy = self._strategy(stub)
+            self._run(strategy, 5)
+            self.assertEqual(list(strategy.knowledge.monitored_data["f"]),
+                             list(self.recorded.knowledge.monitored_data["f"]))
+        finally:
+            strategy.transport.close()
+            stub.stop_container()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import time
+import unittest
+
+from UPISAS.async_strategy import run_loops
+from UPISAS.async_transport import AsyncHTTPTransport
+from UPISAS.exceptions import CircuitOpen, ServerNotReachable
+from UPISAS.exemplars.demo_model import DemoModel
+from UPISAS.exemplars.stub_exemplar import StubExemplar
+from UPISAS.resilience import AsyncResilientTransport, CircuitBreaker, ResilientTransport
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.transport import HTTPTransport, Response, Transport
+from UPISAS.tests.upisas.helpers import AsyncConstantStrategy
+
+
+class _FlakyTransport(Transport):
+    """Fails the first failures requests, by raising ServerNotReachable or answering with an error status."""
+
+    def __init__(self, failures, status_code=None):
+        self.failures = failures
+        self.status_code = status_code
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, kwargs.get("timeout")))
+        if len(self.requests) <= self.failures:
+            if self.status_code is None:
+                raise ServerNotReachable
+            return Response(self.status_code, b"error")
+        return Response(200, json.dumps({"f": 1.0}).encode())
+
+
+class _BrokenTransport(Transport):
+
+    def request(self, method, url, **kwargs):
+        raise ValueError("truncated response")
+
+
+class _HangingAsyncTransport:
+
+    async def request(self, method, url, **kwargs):
+        await asyncio.sleep(60)
+
+
+class _IdleStrategy(AsyncConstantStrategy):
+    outcome = False
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Test cases for the CircuitBreaker of an exemplar.
+    """
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            breaker.before_request()
+            breaker.record_failure()
+        breaker.record_success()
+        for _ in range(3):
+            breaker.before_request()
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpen):
+            breaker.before_request()
+
+    def test_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_request()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpen):
+            # Only one probe at a time.
+            breaker.before_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        time.sleep(0.06)
+        breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.before_request()
+
+
+class TestResilientTransport(unittest.TestCase):
+    """
+    Test cases for the deadlines, retries and circuit breaker of the ResilientTransport.
+    """
+
+    def setUp(self):
+        self.exemplar = None
+
+    def tearDown(self):
+        if self.exemplar is not None:
+            self.exemplar.stop_container()
+
+    def test_gets_are_retried(self):
+        flaky = _FlakyTransport(failures=2)
+        transport = ResilientTransport(flaky, retries=2, backoff=0.001, seed=0)
+        self.assertEqual(transport.get("http://exemplar/monitor").json(), {"f": 1.0})
+        self.assertEqual(len(flaky.requests), 3)
+        self.assertEqual(transport.retried, 2)
+        self.assertEqual(transport.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_error_statuses_are_retried(self):
+        flaky = _FlakyTransport(failures=1, status_code=503)
+        transport = ResilientTransport(flaky, backoff=0.001)
+        self.assertEqual(transport.get("http://exemplar/monitor").status_code, 200)
+        self.assertEqual(len(flaky.requests), 2)
+
+    def test_error_statuses_raise_once_retries_are_spent(self):
+        flaky = _FlakyTransport(failures=10, status_code=500)
+        transport = ResilientTransport(flaky, retries=2, backoff=0.001)
+        with self.assertRaises(ServerNotReachable):
+            transport.get("http://exemplar/monitor")
+        self.assertEqual(len(flaky.requests), 3)
+        self.assertEqual(transport.put("http://exemplar/execute", json={"x": 1}).status_code, 500)
+
+    def test_deadline_lowers_the_timeouts_of_the_transport(self):
+        flaky = _FlakyTransport(failures=0)
+        flaky.timeout = (1.0, 2.0)
+        ResilientTransport(flaky, default_deadline=30.0).get("http://exemplar/monitor")
+        ResilientTransport(flaky, default_deadline=1.5).get("http://exemplar/monitor")
+        self.assertEqual(flaky.requests[0][1], (1.0, 2.0))
+        connect, read = flaky.requests[1][1]
+        self.assertEqual(connect, 1.0)
+        self.assertLessEqual(read, 1.5)
+
+    def test_retries_are_bounded(self):
+        flaky = _FlakyTransport(failures=10)
+        transport = ResilientTransport(flaky, retries=2, backoff=0.001)
+        with self.assertRaises(ServerNotReachable):
+            transport.get("http://exemplar/monitor")
+        self.assertEqual(len(flaky.requests), 3)
+
+    def test_puts_are_not_retried(self):
+        flaky = _FlakyTransport(failures=1)
+        transport = ResilientTransport(flaky, backoff=0.001)
+        with self.assertRaises(ServerNotReachable):
+            transport.put("http://exemplar/execute", json={"x": 1})
+        self.assertEqual(len(flaky.requests), 1)
+
+    def test_deadline_per_endpoint(self):
+        flaky = _FlakyTransport(failures=0)
+        transport = ResilientTransport(flaky, deadlines={"monitor": 2.0}, default_deadline=None)
+        transport.get("http://exemplar/monitor")
+        transport.get("http://exemplar/monitor_schema")
+        self.assertLessEqual(flaky.requests[0][1], 2.0)
+        self.assertIsNone(flaky.requests[1][1])
+
+    def test_deadline_bounds_slow_requests(self):
+        self.exemplar = StubExemplar(auto_start=True, latency={"monitor": 1.0})
+        transport = ResilientTransport(HTTPTransport(), deadlines={"monitor": 0.2}, backoff=0.01)
+        start = time.monotonic()
+        with self.assertRaises(ServerNotReachable):
+            transport.get(self.exemplar.base_endpoint + "/monitor")
+        self.assertLess(time.monotonic() - start, 0.5)
+        transport.close()
+
+    def test_circuit_fails_fast(self):
+        self.exemplar = StubExemplar(auto_start=True, error_rate={"monitor": 1.0}, error_status=503)
+        transport = ResilientTransport(HTTPTransport(), retries=0, breaker=CircuitBreaker(failure_threshold=2))
+        strategy = DemoStrategy(self.exemplar, transport)
+        for _ in range(2):
+            with self.assertRaises(ServerNotReachable):
+                strategy.monitor(with_validation=False)
+        with self.assertRaises(CircuitOpen):
+            strategy.monitor(with_validation=False)
+        self.assertEqual(self.exemplar.requests[("GET", "monitor")], 2)
+        transport.close()
+
+    def test_unexpected_error_of_a_probe_reopens_the_circuit(self):
+        flaky = _FlakyTransport(failures=1)
+        transport = ResilientTransport(flaky, retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+        with self.assertRaises(ServerNotReachable):
+            transport.get("http://exemplar/monitor")
+        time.sleep(0.06)
+        transport.transport = _BrokenTransport()
+        with self.assertRaises(ValueError):
+            transport.get("http://exemplar/monitor")
+        self.assertEqual(transport.breaker.state, CircuitBreaker.OPEN)
+        transport.transport = flaky
+        time.sleep(0.06)
+        for _ in range(3):
+            self.assertEqual(transport.get("http://exemplar/monitor").status_code, 200)
+        self.assertEqual(transport.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_cancelled_async_probe_reopens_the_circuit(self):
+        transport = AsyncResilientTransport(_HangingAsyncTransport(),
+                                            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+        # The circuit opens, and lets the next request through as a probe right away.
+        transport.breaker.record_failure()
+
+        async def cancel_probe():
+            task = asyncio.ensure_future(transport.get("http://exemplar/monitor"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_probe())
+        self.assertEqual(transport.breaker.state, CircuitBreaker.OPEN)
+
+    def test_one_unreachable_exemplar_does_not_stop_the_others(self):
+        self.exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False))
+        down = StubExemplar(auto_start=True)
+        down.stop_container()
+        strategies = [_IdleStrategy(exemplar, AsyncResilientTransport(AsyncHTTPTransport(), backoff=0.001))
+                      for exemplar in (self.exemplar, down)]
+        asyncio.run(run_loops(strategies, period=0.05, budget=0.3))
+        self.assertGreater(len(strategies[0].knowledge.monitored_data["f"]), 2)
+        self.assertGreater(strategies[1].metrics.counters["failed_ticks"], 2)
+        self.assertEqual(strategies[1].transport.breaker.state, CircuitBreaker.OPEN)
+
+    def test_one_failing_exemplar_does_not_stop_the_others(self):
+        self.exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False))
+        failing = StubExemplar(auto_start=True, error_rate={"monitor": 1.0}, error_status=500)
+        try:
+            strategies = [_IdleStrategy(exemplar, AsyncResilientTransport(AsyncHTTPTransport(), backoff=0.001))
+                          for exemplar in (self.exemplar, failing)]
+            asyncio.run(run_loops(strategies, period=0.05, budget=0.3))
+        finally:
+            failing.stop_container()
+        self.assertGreater(len(strategies[0].knowledge.monitored_data["f"]), 2)
+        self.assertGreater(strategies[1].metrics.counters["failed_ticks"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
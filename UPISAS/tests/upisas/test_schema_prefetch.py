@@ -0,0 +1,102 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from UPISAS.exceptions import IncompleteJSONSchema
+from UPISAS.exemplars.demo_model import DemoModel
+from UPISAS.exemplars.stub_exemplar import StubExemplar
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.strategy import PREFETCHED_ENDPOINTS
+from UPISAS.tests.upisas.helpers import AsyncConstantStrategy
+
+
+class _DigestStubExemplar(StubExemplar):
+
+    def image_digest(self):
+        return "sha256:0123456789abcdef"
+
+
+class TestSchemaPrefetch(unittest.TestCase):
+    """
+    Test cases for the concurrent prefetch of the schemas and its on-disk cache.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.exemplars = []
+
+    def tearDown(self):
+        for exemplar in self.exemplars:
+            exemplar.stop_container()
+        self.cache_dir.cleanup()
+
+    def _exemplar(self, exemplar_class=_DigestStubExemplar):
+        exemplar = exemplar_class(auto_start=True, model=DemoModel(enable_random=False))
+        self.exemplars.append(exemplar)
+        return exemplar
+
+    def _assert_prefetched(self, strategy):
+        model = DemoModel
+        self.assertEqual(strategy.knowledge.monitor_schema, model.monitor_schema)
+        self.assertEqual(strategy.knowledge.execute_schema, model.execute_schema)
+        self.assertEqual(strategy.knowledge.adaptation_options_schema, model.adaptation_options_schema)
+        self.assertEqual(strategy.knowledge.adaptation_options, model.adaptation_options)
+
+    def _gets(self, exemplar):
+        return sum(exemplar.requests[("GET", endpoint)] for endpoint in PREFETCHED_ENDPOINTS)
+
+    def test_prefetch(self):
+        exemplar = self._exemplar()
+        strategy = DemoStrategy(exemplar)
+        strategy.prefetch_schemas(cache_dir=self.cache_dir.name)
+        self._assert_prefetched(strategy)
+        self.assertEqual(self._gets(exemplar), len(PREFETCHED_ENDPOINTS))
+        self.assertEqual(os.listdir(self.cache_dir.name), ["sha256_0123456789abcdef.json"])
+        strategy.transport.close()
+
+    def test_cached_schemas_are_not_fetched(self):
+        first = DemoStrategy(self._exemplar())
+        first.prefetch_schemas(cache_dir=self.cache_dir.name)
+        first.transport.close()
+        exemplar = self._exemplar()
+        strategy = DemoStrategy(exemplar)
+        strategy.prefetch_schemas(cache_dir=self.cache_dir.name)
+        self._assert_prefetched(strategy)
+        self.assertEqual(self._gets(exemplar), 0)
+        strategy.transport.close()
+
+    def test_no_cache_without_digest(self):
+        exemplar = self._exemplar(StubExemplar)
+        self.assertIsNone(exemplar.image_digest())
+        for _ in range(2):
+            strategy = DemoStrategy(exemplar)
+            strategy.prefetch_schemas(cache_dir=self.cache_dir.name)
+            strategy.transport.close()
+        self.assertEqual(self._gets(exemplar), 2 * len(PREFETCHED_ENDPOINTS))
+        self.assertEqual(os.listdir(self.cache_dir.name), [])
+
+    def test_adaptation_options_are_validated(self):
+        exemplar = self._exemplar()
+        exemplar.model.adaptation_options = {"x": "not an option"}
+        strategy = DemoStrategy(exemplar)
+        with self.assertRaises(IncompleteJSONSchema):
+            strategy.prefetch_schemas(cache_dir=None)
+        strategy.transport.close()
+
+    def test_async_prefetch(self):
+        exemplar = self._exemplar()
+        strategy = AsyncConstantStrategy(exemplar)
+
+        async def prefetch():
+            await strategy.prefetch_schemas(cache_dir=self.cache_dir.name)
+            await strategy.close()
+
+        asyncio.run(prefetch())
+        self._assert_prefetched(strategy)
+        self.assertEqual(self._gets(exemplar), len(PREFETCHED_ENDPOINTS))
+        self.assertEqual(len(os.listdir(self.cache_dir.name)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
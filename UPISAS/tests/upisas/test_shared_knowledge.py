@@ -0,0 +1,57 @@
+import multiprocessing
+import unittest
+
+import numpy as np
+
+from UPISAS.columnar import ColumnarKnowledge
+from UPISAS.knowledge import Knowledge
+from UPISAS.shared_knowledge import SharedKnowledge, publish_knowledge
+
+
+def _publish_from_child(queue, columnar):
+    knowledge = ColumnarKnowledge.empty() if columnar else Knowledge.empty()
+    for t in range(1000):
+        knowledge.add_sample({"basic_rt": t / 1000, "servers": t % 3, "label": "x",
+                              "utilization": [{"utilization_value": 0.5}]}, timestamp=float(t))
+    queue.put(publish_knowledge(knowledge))
+
+
+class TestSharedKnowledge(unittest.TestCase):
+    """
+    Test cases for exporting Knowledge columns from a child process through shared memory.
+    """
+
+    def _publish_in_child(self, columnar):
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_publish_from_child, args=(queue, columnar))
+        process.start()
+        manifest = queue.get()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        return manifest
+
+    def test_attach_to_list_backed_knowledge(self):
+        with SharedKnowledge(self._publish_in_child(columnar=False)) as shared:
+            self.assertEqual(set(shared.columns), {"basic_rt", "servers"})
+            np.testing.assert_array_equal(shared.columns["servers"], np.arange(1000) % 3)
+            np.testing.assert_array_equal(shared.times["basic_rt"], np.arange(1000))
+
+    def test_attach_to_columnar_knowledge(self):
+        with SharedKnowledge(self._publish_in_child(columnar=True)) as shared:
+            self.assertIn("utilization.0.utilization_value", shared.columns)
+            self.assertNotIn("label", shared.columns)
+            self.assertAlmostEqual(shared.columns["basic_rt"].sum(), 499.5)
+            self.assertEqual(len(shared._segments), len(shared.columns) + 1)
+
+    def test_ragged_and_list_valued_keys_are_skipped(self):
+        knowledge = Knowledge.empty()
+        for t, servers in enumerate([1, 2, 2]):
+            knowledge.add_sample({"basic_rt": 0.1 * t, "b": [t, t + 1],
+                                  "utilization": [{"utilization_value": 0.5}] * servers}, timestamp=float(t))
+        with SharedKnowledge(publish_knowledge(knowledge)) as shared:
+            self.assertEqual(set(shared.columns), {"basic_rt"})
+            np.testing.assert_allclose(shared.columns["basic_rt"], [0.0, 0.1, 0.2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+
+from UPISAS.exceptions import EndpointNotReachable
+from UPISAS.exemplars.demo_model import DemoModel, demo_function
+from UPISAS.exemplars.stub_exemplar import StubExemplar
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.transport import HTTPTransport
+
+
+class TestStubExemplar(unittest.TestCase):
+    """
+    Test cases for the StubExemplar, which serves the openapi.yaml contract without docker.
+    """
+
+    def setUp(self):
+        self.exemplar = None
+        self.transport = HTTPTransport(read_timeout=5)
+
+    def tearDown(self):
+        self.transport.close()
+        if self.exemplar and self.exemplar.exemplar_container:
+            self.exemplar.stop_container()
+
+    def test_lifecycle(self):
+        self.exemplar = StubExemplar(auto_start=False)
+        self.assertEqual(self.exemplar.get_container_status(), "created")
+        self.assertTrue(self.exemplar.start_container())
+        self.assertEqual(self.exemplar.get_container_status(), "running")
+        self.assertTrue(self.exemplar.pause_container())
+        self.assertEqual(self.exemplar.get_container_status(), "paused")
+        self.assertTrue(self.exemplar.unpause_container())
+        self.assertEqual(self.exemplar.get_container_status(), "running")
+        self.assertTrue(self.exemplar.stop_container(remove=False))
+        self.assertEqual(self.exemplar.get_container_status(), "exited")
+        self.assertTrue(self.exemplar.start_container())
+        self.assertEqual(self.transport.get(self.exemplar.base_endpoint).text, "alive")
+        self.assertTrue(self.exemplar.stop_container(remove=True))
+        self.assertEqual(self.exemplar.get_container_status(), "removed")
+
+    def test_demo_strategy_loop(self):
+        self.exemplar = StubExemplar(auto_start=True, model=DemoModel(enable_random=False))
+        strategy = DemoStrategy(self.exemplar, self.transport)
+        strategy.get_adaptation_options()
+        self.assertEqual(strategy.knowledge.adaptation_options, DemoModel.adaptation_options)
+        for _ in range(2):
+            strategy.monitor()
+            if strategy.analyze():
+                if strategy.plan():
+                    strategy.execute()
+        self.assertEqual(strategy.knowledge.monitored_data["f"], [demo_function(0, 0), demo_function(2, 5)])
+        self.assertEqual((self.exemplar.model.x, self.exemplar.model.y), (2, 5))
+        # The second plan is the adaptation already applied.
+        self.assertEqual(self.exemplar.requests[("PUT", "execute")], 1)
+
+    def test_payload_override_and_unknown_endpoint(self):
+        self.exemplar = StubExemplar(auto_start=True, payloads={"monitor": lambda: {"f": 42}})
+        strategy = DemoStrategy(self.exemplar, self.transport)
+        strategy.monitor()
+        self.assertEqual(strategy.knowledge.monitored_data["f"], [42])
+        with self.assertRaises(EndpointNotReachable):
+            strategy._perform_get_request("unknown")
+
+    def test_error_injection(self):
+        self.exemplar = StubExemplar(auto_start=True, error_rate={"monitor": 1.0}, error_status=503)
+        url = self.exemplar.base_endpoint
+        self.assertEqual(self.transport.get(url + "/monitor").status_code, 503)
+        self.assertEqual(self.transport.get(url + "/monitor_schema").status_code, 200)
+
+    def test_latency_injection(self):
+        self.exemplar = StubExemplar(auto_start=True, latency={"monitor": 0.1})
+        start = time.monotonic()
+        self.transport.get(self.exemplar.base_endpoint + "/monitor")
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_requests_wait_while_paused(self):
+        self.exemplar = StubExemplar(auto_start=True)
+        self.exemplar.pause_container()
+        responses = []
+        request = threading.Thread(target=lambda: responses.append(self.transport.get(self.exemplar.base_endpoint)))
+        request.start()
+        time.sleep(0.1)
+        self.assertEqual(responses, [])
+        self.exemplar.unpause_container()
+        request.join()
+        self.assertEqual(responses[0].status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
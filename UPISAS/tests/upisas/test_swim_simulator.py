@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from UPISAS.exemplars.in_process_exemplar import InProcessExemplar
+from UPISAS.exemplars.swim_simulator import SWIMSimulator, sweep
+from UPISAS.loop_logger import LoopLogger
+from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager, reactive_plan
+
+RATES = 30 + 25 * np.sin(np.linspace(0, 4 * np.pi, 200))
+
+
+class TestSWIMSimulator(unittest.TestCase):
+    """
+    Test cases for the vectorized SWIM surrogate.
+    """
+
+    def test_boot_delay(self):
+        simulator = SWIMSimulator(scenarios=2, arrival_rate=10.0, boot_delay=120, period=60)
+        simulator.execute_arrays(np.array([2, 1]), 1.0)
+        observations = [simulator.step() for _ in range(3)]
+        self.assertEqual([o["servers"].tolist() for o in observations], [[2, 1]] * 3)
+        self.assertEqual([o["active_servers"].tolist() for o in observations], [[1, 1], [2, 1], [2, 1]])
+
+    def test_overload_builds_a_backlog(self):
+        simulator = SWIMSimulator(arrival_rate=np.array([100.0, 100.0, 1.0, 1.0]))
+        rts = [simulator.step()["basic_rt"][0] for _ in range(4)]
+        self.assertLess(rts[0], rts[1])
+        self.assertGreater(rts[1], rts[3])
+        self.assertGreater(rts[2], rts[3])
+
+    def test_monitor_payload_validates(self):
+        exemplar = InProcessExemplar(auto_start=True, model=SWIMSimulator(arrival_rate=RATES))
+        strategy = ReactiveAdaptationManager(exemplar, loop_logger=LoopLogger(handlers=[], max_rate=0))
+        strategy.get_monitor_schema()
+        self.assertTrue(strategy.monitor())
+        self.assertEqual(len(strategy.knowledge.monitored_data["utilization"][-1]), 1)
+
+    def test_vectorized_plan_matches_the_strategy(self):
+        exemplar = InProcessExemplar(auto_start=True, model=SWIMSimulator(arrival_rate=RATES))
+        strategy = ReactiveAdaptationManager(exemplar, loop_logger=LoopLogger(handlers=[], max_rate=0))
+        strategy.RT_THRESHOLD = 0.1
+        vectorized = SWIMSimulator(scenarios=1, arrival_rate=RATES)
+        for _ in range(len(RATES)):
+            strategy.monitor(with_validation=False)
+            if strategy.analyze():
+                if strategy.plan():
+                    strategy.execute(with_validation=False)
+            server_number, dimmer_factor, execute = reactive_plan(vectorized.step(), 0.1, strategy.DIMMER_MARGIN)
+            vectorized.execute_arrays(server_number, dimmer_factor, where=execute)
+            self.assertEqual(exemplar.model.servers[0], vectorized.servers[0])
+            self.assertAlmostEqual(exemplar.model.dimmer[0], vectorized.dimmer[0])
+
+    def test_sweep(self):
+        results = sweep([0.1, 0.5], [0.1, 0.2], steps=100, repetitions=3, arrival_rate=RATES)
+        self.assertEqual(results["rt_threshold"].tolist(), [0.1] * 6 + [0.5] * 6)
+        self.assertEqual(results["dimmer_margin"].tolist(), ([0.1] * 3 + [0.2] * 3) * 2)
+        self.assertTrue(np.all((results["rt_violations"] >= 0) & (results["rt_violations"] <= 1)))
+        # Identical arrival rates across repetitions make them identical.
+        self.assertEqual(len(set(results["mean_basic_rt"][:3])), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
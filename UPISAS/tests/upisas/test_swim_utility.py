@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from UPISAS.columnar import ColumnarKnowledge
+from UPISAS.knowledge import Knowledge
+from UPISAS.swim_utility import OnlineUtility, history_utility, utility
+
+MAX_SERVICE_RATE = 1 / 0.04452713
+
+
+def _reference_utility(sample, rt_threshold):
+    """The per-sample loop SWIM_example.populate_run_data used to compute."""
+    maxServers = int(sample["max_servers"])
+    arrivalRateMean = sample["arrival_rate"]
+    dimmer = sample["dimmer_factor"]
+    maxThroughput = maxServers * MAX_SERVICE_RATE
+    avgResponseTime = (sample["basic_rt"] * sample["basic_throughput"] + sample["opt_rt"] * sample["opt_throughput"]) / \
+                      (sample["basic_throughput"] + sample["opt_throughput"])
+    Ur = (arrivalRateMean * ((1 - dimmer) * 1 + dimmer * 1.5))
+    Uc = 10 * (maxServers - sample["servers"])
+    UrOpt = arrivalRateMean * 1.5
+    if avgResponseTime <= rt_threshold and Ur >= UrOpt - 1e-5:
+        return Ur + Uc
+    if avgResponseTime <= rt_threshold:
+        return Ur
+    return min(0.0, arrivalRateMean - maxThroughput) * 1.5
+
+
+def _samples(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"max_servers": 3, "servers": int(rng.integers(1, 4)), "dimmer_factor": float(rng.choice([0.0, 0.5, 1.0])),
+             "arrival_rate": float(rng.uniform(5, 120)), "basic_rt": float(rng.uniform(0.03, 0.3)),
+             "opt_rt": float(rng.uniform(0.03, 0.3)), "basic_throughput": float(rng.uniform(0.1, 50)),
+             "opt_throughput": float(rng.uniform(0.1, 50))} for _ in range(count)]
+
+
+class TestSWIMUtility(unittest.TestCase):
+    """
+    Test cases for the offline and online SWIM utility.
+    """
+
+    def setUp(self):
+        self.samples = _samples(300)
+        self.expected = [_reference_utility(sample, 0.1) for sample in self.samples]
+
+    def test_covers_every_branch(self):
+        self.assertTrue(any(u > 0 for u in self.expected) and any(u < 0 for u in self.expected))
+
+    def test_history_utility_matches_the_reference(self):
+        for knowledge in (Knowledge.empty(), ColumnarKnowledge.empty()):
+            for sample in self.samples:
+                knowledge.add_sample(sample)
+            np.testing.assert_allclose(history_utility(knowledge.monitored_data, 0.1, MAX_SERVICE_RATE), self.expected)
+
+    def test_online_utility_matches_the_reference(self):
+        online = OnlineUtility(0.1, MAX_SERVICE_RATE)
+        knowledge = Knowledge.empty()
+        for sample, expected in zip(self.samples, self.expected):
+            knowledge.add_sample(sample)
+            self.assertAlmostEqual(online.update_from(knowledge), expected)
+        self.assertEqual(online.count, len(self.samples))
+        self.assertAlmostEqual(online.total, sum(self.expected))
+
+    def test_no_throughput(self):
+        value = utility(3, 0.0, 0.5, 1, 0.05, 0.0, 0.08, 0.0, rt_threshold=0.1)
+        self.assertEqual(float(value), 20.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from UPISAS import tracing
+from UPISAS.exemplar import Exemplar
+from UPISAS.strategy import Strategy
+from UPISAS.transport import Response, Transport
+
+
+class _Transport(Transport):
+
+    def request(self, method, url, **kwargs):
+        if method == "PUT":
+            return Response(200, b'"ok"')
+        return Response(200, b'{"f": 1}')
+
+
+class _Container:
+    """Stands in for a docker container."""
+
+    status = "created"
+
+    def reload(self):
+        pass
+
+    def start(self):
+        self.status = "running"
+
+    def pause(self):
+        self.status = "paused"
+
+
+class _Exemplar(Exemplar):
+
+    def __init__(self, base_endpoint):
+        self.base_endpoint = base_endpoint
+        self.exemplar_container = _Container()
+
+    def start_run(self):
+        pass
+
+
+class _Strategy(Strategy):
+
+    def analyze(self):
+        return True
+
+    def plan(self):
+        self.knowledge.plan_data = {"x": 1}
+        return True
+
+
+class TestTracing(unittest.TestCase):
+    """
+    Test cases for the Chrome trace output of strategies and exemplars.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trace.json")
+        self.tracer = tracing.enable()
+
+    def tearDown(self):
+        tracing.disable()
+        self.directory.cleanup()
+
+    def _flush(self):
+        self.tracer.flush(self.path)
+        with open(self.path) as f:
+            return json.load(f)["traceEvents"]
+
+    def _tick(self, strategy):
+        strategy.monitor(with_validation=False)
+        if strategy.analyze():
+            if strategy.plan():
+                strategy.execute(with_validation=False)
+
+    def test_strategy_spans(self):
+        self._tick(_Strategy(_Exemplar("http://a"), _Transport()))
+        spans = [e for e in self._flush() if e["ph"] == "X"]
+        self.assertEqual([s["name"] for s in spans], ["GET monitor", "monitor", "analyze", "plan", "PUT execute", "execute"])
+        by_name = {s["name"]: s for s in spans}
+        self.assertEqual(by_name["GET monitor"]["cat"], "http")
+        self.assertLessEqual(by_name["monitor"]["ts"], by_name["GET monitor"]["ts"])
+        self.assertGreaterEqual(by_name["monitor"]["dur"], by_name["GET monitor"]["dur"])
+
+    def test_container_spans(self):
+        exemplar = _Exemplar("http://a")
+        exemplar.start_container()
+        exemplar.pause_container()
+        names = [e["name"] for e in self._flush() if e["ph"] == "X"]
+        self.assertEqual(names, ["reload", "start_container", "reload", "pause_container"])
+
+    def test_one_row_per_exemplar_and_thread(self):
+        strategies = [_Strategy(_Exemplar(f"http://{name}"), _Transport()) for name in "ab"]
+        threads = [threading.Thread(target=self._tick, args=(strategy,)) for strategy in strategies]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._tick(strategies[0])
+        events = self._flush()
+        rows = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(len({e["tid"] for e in events if e["ph"] == "X"}), 3)
+        self.assertTrue(all(name.startswith(("http://a", "http://b")) for name in rows.values()))
+
+    def test_disabled(self):
+        tracing.disable()
+        self._tick(_Strategy(_Exemplar("http://a"), _Transport()))
+        self.assertEqual(len(self.tracer.events), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
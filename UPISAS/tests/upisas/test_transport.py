@@ -0,0 +1,68 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.transport import HTTPTransport
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._reply({"path": self.path})
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self._reply(json.loads(self.rfile.read(length)))
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHTTPTransport(unittest.TestCase):
+    """
+    Test cases for the HTTPTransport class, using a local HTTP server.
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.transport = HTTPTransport(pool_size=2, connect_timeout=1, read_timeout=1)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_and_put_successfully(self):
+        self.assertEqual(self.transport.get(self.base_endpoint + "/monitor").json(), {"path": "/monitor"})
+        self.assertEqual(self.transport.put(self.base_endpoint + "/execute", json={"x": 1}).json(), {"x": 1})
+
+    def test_latency_is_recorded_per_request(self):
+        for _ in range(3):
+            self.transport.get(self.base_endpoint + "/monitor")
+        self.assertEqual(len(self.transport.latencies), 3)
+        record = self.transport.latencies[-1]
+        self.assertEqual((record.method, record.status_code), ("GET", 200))
+        self.assertGreaterEqual(record.seconds, 0)
+
+    def test_server_not_reachable(self):
+        self.server.shutdown()
+        self.server.server_close()
+        with self.assertRaises(ServerNotReachable):
+            self.transport.get(self.base_endpoint + "/monitor")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import jsonschema
+
+from UPISAS import validate_schema, clear_validator_cache
+from UPISAS.exceptions import IncompleteJSONSchema
+
+MONITOR_SCHEMA = {"type": "object", "properties": {"f": {"type": "number"}, "servers": {"type": "integer"}}}
+
+
+class TestValidateSchema(unittest.TestCase):
+    """
+    Test cases for validate_schema and its validator cache.
+    """
+
+    def setUp(self):
+        clear_validator_cache()
+
+    def test_validate_successfully(self):
+        with self.assertLogs() as cm:
+            validate_schema({"f": 0.5, "servers": 2}, MONITOR_SCHEMA)
+            validate_schema({"f": 0.7, "servers": 3}, MONITOR_SCHEMA)
+        self.assertEqual(cm.output.count("INFO:root:JSON object validated by JSON Schema"), 2)
+
+    def test_keys_misaligned(self):
+        with self.assertRaises(IncompleteJSONSchema):
+            validate_schema({"f": 0.5}, MONITOR_SCHEMA)
+
+    def test_no_complete_schema_present(self):
+        with self.assertRaises(IncompleteJSONSchema):
+            validate_schema({"f": 0.5}, {"type": "object"})
+
+    def test_invalid_schema_is_reported_on_every_call(self):
+        schema = {"type": "strange_value", "properties": {"f": {"type": "number"}}}
+        for _ in range(2):
+            with self.assertRaises(jsonschema.exceptions.SchemaError):
+                validate_schema({"f": 0.5}, schema)
+
+    def test_fast_path_does_not_accept_a_different_shape(self):
+        validate_schema({"f": 0.5, "servers": 2}, MONITOR_SCHEMA)
+        with self.assertRaises(jsonschema.exceptions.ValidationError):
+            validate_schema({"f": 0.5, "servers": "two"}, MONITOR_SCHEMA)
+        with self.assertRaises(jsonschema.exceptions.ValidationError):
+            validate_schema({"f": 0.5, "servers": 2.5}, MONITOR_SCHEMA)
+
+    def test_value_constraints_are_checked_on_every_call(self):
+        schema = {"type": "object", "properties": {"dimmer": {"type": "number", "maximum": 1}}}
+        validate_schema({"dimmer": 0.5}, schema)
+        with self.assertRaises(jsonschema.exceptions.ValidationError):
+            validate_schema({"dimmer": 1.5}, schema)
+
+    def test_nested_instances(self):
+        schema = {"type": "object", "properties": {"utilization": {"type": "array", "items": {
+            "type": "object", "properties": {"utilization_value": {"type": "number"}}}}}}
+        validate_schema({"utilization": [{"utilization_value": 0.2}]}, schema)
+        validate_schema({"utilization": [{"utilization_value": 0.3}]}, schema)
+        with self.assertRaises(jsonschema.exceptions.ValidationError):
+            validate_schema({"utilization": [{"utilization_value": "high"}]}, schema)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from UPISAS.columnar import ColumnarKnowledge
+from UPISAS.knowledge import Knowledge
+from UPISAS.strategy import Strategy
+from UPISAS.wal import KnowledgeLog
+from UPISAS.tests.upisas.helpers import CounterTransport, FakeExemplar
+
+
+class _CountingStrategy(Strategy):
+
+    def analyze(self):
+        self.knowledge.analysis_data["mean_f"] = self.knowledge.monitored_stats["f"].mean
+        return True
+
+    def plan(self):
+        self.knowledge.plan_data = {"x": self.knowledge.monitored_data["f"][-1]}
+        return True
+
+
+class TestKnowledgeLog(unittest.TestCase):
+    """
+    Test cases for recovering the Knowledge of a Strategy from a KnowledgeLog.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _run(self, strategy, ticks):
+        for _ in range(ticks):
+            strategy.monitor(with_validation=False)
+            if strategy.analyze():
+                if strategy.plan():
+                    strategy.execute(with_validation=False)
+
+    def _check_recovery(self, snapshot_every, knowledge_factory):
+        log = KnowledgeLog(self.directory.name, snapshot_every=snapshot_every)
+        strategy = _CountingStrategy(FakeExemplar(), CounterTransport("f"), knowledge_factory(), log)
+        self._run(strategy, 25)
+        log.close()
+
+        recovered = _CountingStrategy(FakeExemplar(), CounterTransport("f"), knowledge_factory(),
+                                      KnowledgeLog(self.directory.name, snapshot_every=snapshot_every))
+        self.assertEqual(list(recovered.knowledge.monitored_data["f"]), list(range(1, 26)))
+        self.assertEqual(recovered.knowledge.analysis_data, {"mean_f": 13})
+        self.assertEqual(recovered.knowledge.plan_data, {"x": 25})
+        self.assertEqual(recovered.knowledge.last_adaptation, {"x": 25})
+        self.assertEqual(recovered.knowledge.monitored_stats["f"].count, 25)
+        return strategy, recovered
+
+    def test_recover_from_log(self):
+        strategy, recovered = self._check_recovery(1000, Knowledge.empty)
+        self.assertEqual(recovered.knowledge.monitored_data["f"].times, strategy.knowledge.monitored_data["f"].times)
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, KnowledgeLog.SNAPSHOT_FILE)))
+
+    def test_recover_from_snapshot_and_log(self):
+        self._check_recovery(7, Knowledge.empty)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, KnowledgeLog.SNAPSHOT_FILE)))
+
+    def test_recover_columnar_knowledge(self):
+        self._check_recovery(7, ColumnarKnowledge.empty)
+
+    def test_torn_record_is_dropped(self):
+        log = KnowledgeLog(self.directory.name)
+        strategy = _CountingStrategy(FakeExemplar(), CounterTransport("f"), None, log)
+        self._run(strategy, 3)
+        log.close()
+        wal_path = os.path.join(self.directory.name, KnowledgeLog.WAL_FILE)
+        with open(wal_path, "r+b") as f:
+            f.truncate(os.path.getsize(wal_path) - 3)
+
+        log = KnowledgeLog(self.directory.name)
+        recovered = _CountingStrategy(FakeExemplar(), CounterTransport("f"), None, log)
+        self.assertEqual(recovered.knowledge.monitored_data["f"], [1, 2, 3])
+        recovered.monitor(with_validation=False)
+        log.close()
+        self.assertEqual(KnowledgeLog(self.directory.name).recover().monitored_data["f"], [1, 2, 3, 1])
+
+    def test_snapshots_wait_for_the_loop_thread(self):
+        log = KnowledgeLog(self.directory.name, snapshot_every=2)
+        strategy = _CountingStrategy(FakeExemplar(), CounterTransport("f"), None, log)
+        snapshot_path = os.path.join(self.directory.name, KnowledgeLog.SNAPSHOT_FILE)
+        log.log_execute({"x": 1})
+        log.log_execute({"x": 2})
+        self.assertFalse(os.path.exists(snapshot_path))
+        strategy.monitor(with_validation=False)
+        self.assertTrue(os.path.exists(snapshot_path))
+
+    def test_closing_the_strategy_closes_the_log(self):
+        log = KnowledgeLog(self.directory.name)
+        strategy = _CountingStrategy(FakeExemplar(), CounterTransport("f"), None, log)
+        self._run(strategy, 1)
+        strategy.close()
+        self.assertIsNone(log._wal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import collections
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_tracer = None
+
+
+class Tracer:
+    """
+    Collects timeline spans and writes them in the Chrome trace event format, to be opened in
+    chrome://tracing or https://ui.perfetto.dev. Spans are appended as plain tuples to a deque, which is
+    thread-safe without a lock, and only turned into trace events by flush(). Every (track, thread) pair,
+    where the track is typically the base endpoint of an exemplar, gets its own row in the timeline.
+    """
+
+    def __init__(self):
+        '''Create an instance of the Tracer class'''
+        self.events = collections.deque()
+        self._origin = time.perf_counter()
+        self._rows = {}
+
+    @contextmanager
+    def span(self, name, category, track=None, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self.events.append((name, category, track, threading.get_ident(), start, time.perf_counter(), args))
+
+    def flush(self, path):
+        '''Writes the spans recorded since the last flush to path as a Chrome trace JSON file'''
+        pid = os.getpid()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        trace_events = []
+        rows = {}
+        while self.events:
+            name, category, track, thread, start, end, args = self.events.popleft()
+            row = rows.get((track, thread))
+            if row is None:
+                row = rows[(track, thread)] = self._rows.setdefault((track, thread), len(self._rows) + 1)
+                thread_name = thread_names.get(thread, str(thread))
+                trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": row,
+                                     "args": {"name": thread_name if track is None else f"{track} ({thread_name})"}})
+            trace_events.append({"name": name, "cat": category, "ph": "X", "pid": pid, "tid": row,
+                                 "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6, "args": args})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+
+def enable(tracer: "Tracer to record into, a new one if None" = None):
+    '''Starts recording the spans of every Strategy and Exemplar, and returns the tracer'''
+    global _tracer
+    _tracer = tracer if tracer is not None else Tracer()
+    return _tracer
+
+
+def disable():
+    '''Stops recording spans, and returns the tracer that was recording them'''
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def active():
+    return _tracer
+
+
+def span(name, category, track=None, **args):
+    """ A span of the active tracer, or a no-op context manager if tracing is disabled."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.span(name, category, track, **args)
@@ -0,0 +1,81 @@
+import json
+import time
+import logging
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from UPISAS.exceptions import ServerNotReachable
+
+LatencyRecord = namedtuple("LatencyRecord", ["method", "url", "status_code", "seconds"])
+
+
+class Response:
+    """
+    A fully read response, returned by transports that are not built on requests.
+    """
+
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers if headers is not None else {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class Transport(ABC):
+    """
+    The channel through which a Strategy sends its requests to an exemplar.
+    """
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, json=None, **kwargs):
+        return self.request("PUT", url, json=json, **kwargs)
+
+    @abstractmethod
+    def request(self, method, url, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+class HTTPTransport(Transport):
+    """
+    A pooled keep-alive HTTP transport used by a Strategy to talk to its exemplar.
+    Connections are reused across MAPE-K ticks and every request is bounded by a (connect, read) timeout.
+    """
+
+    def __init__(self, pool_size: "Max number of pooled connections per host" = 4,
+                 connect_timeout: "Seconds to wait for a connection to be established" = 3.05,
+                 read_timeout: "Seconds to wait for the server to send a response" = 30,
+                 latency_history: "Number of latency records to keep" = 1000):
+        '''Create an instance of the HTTPTransport class'''
+        self.timeout = (connect_timeout, read_timeout)
+        self.latencies = deque(maxlen=latency_history)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        logging.info(f"{method} request to {url}")
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            self.latencies.append(LatencyRecord(method, url, None, time.perf_counter() - start))
+            logging.error(e)
+            logging.error("Please check that the server is reachable and retry.")
+            raise ServerNotReachable
+        self.latencies.append(LatencyRecord(method, url, response.status_code, time.perf_counter() - start))
+        return response
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,148 @@
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+import logging
+
+from UPISAS.knowledge import Knowledge
+
+MONITOR = 1
+ANALYSIS = 2
+PLAN = 3
+EXECUTE = 4
+
+# sequence number, record kind, monotonic timestamp, payload length, payload crc32
+_HEADER = struct.Struct("<QBdII")
+
+
+class KnowledgeLog:
+    """
+    An append-only binary write-ahead log of monitored samples, analysis and plan outputs and executed adaptations,
+    with a compact snapshot of the whole Knowledge taken every snapshot_every records.
+    A Strategy given a KnowledgeLog rebuilds its Knowledge from the snapshot and the records after it on restart.
+    """
+
+    WAL_FILE = "knowledge.wal"
+    SNAPSHOT_FILE = "knowledge.snapshot"
+
+    def __init__(self, directory: "Directory holding the log and the snapshot, e.g. the run directory",
+                 snapshot_every: "Number of records after which a snapshot is taken and the log truncated" = 1000,
+                 fsync: "Whether to fsync every record, to also survive an OS crash" = False):
+        '''Create an instance of the KnowledgeLog class'''
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.knowledge = None
+        self._seq = 0
+        self._records_since_snapshot = 0
+        os.makedirs(directory, exist_ok=True)
+        self._wal_path = os.path.join(directory, self.WAL_FILE)
+        self._snapshot_path = os.path.join(directory, self.SNAPSHOT_FILE)
+        self._wal = None
+        self._valid_length = 0
+        # Coalesced adaptations are executed, hence logged, from a background thread.
+        self._lock = threading.Lock()
+
+    def recover(self, knowledge=None):
+        '''
+        Rebuilds the Knowledge from the last snapshot and the records logged after it, and starts logging on top of it.
+        Without a snapshot, the records are replayed into the given (empty) knowledge.
+        '''
+        snapshot_seq = 0
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, "rb") as f:
+                snapshot_seq, knowledge = pickle.load(f)
+        elif knowledge is None:
+            knowledge = Knowledge.empty()
+        self._seq = snapshot_seq
+        replayed = 0
+        for seq, kind, timestamp, payload in self._read_records():
+            # Records already contained in the snapshot are left over from a crash during truncation.
+            if seq <= snapshot_seq:
+                continue
+            _apply(knowledge, kind, timestamp, payload)
+            self._seq = seq
+            replayed += 1
+        if snapshot_seq or replayed:
+            logging.info(f"knowledge recovered from snapshot #{snapshot_seq} and {replayed} logged records")
+        self.knowledge = knowledge
+        self._records_since_snapshot = replayed
+        self._wal = open(self._wal_path, "ab")
+        self._wal.truncate(self._valid_length)
+        return knowledge
+
+    def log_monitor(self, sample, timestamp):
+        self._append(MONITOR, sample, timestamp)
+
+    def log_analysis(self, analysis_data):
+        self._append(ANALYSIS, analysis_data)
+
+    def log_plan(self, plan_data):
+        self._append(PLAN, plan_data)
+
+    def log_execute(self, adaptation):
+        # Also logged from the thread executing coalesced adaptations, which must not pickle the Knowledge while
+        # the loop thread changes it: the snapshot waits for the next record of the loop.
+        self._append(EXECUTE, adaptation, may_snapshot=False)
+
+    def snapshot(self):
+        '''Writes the whole Knowledge to the snapshot file atomically, then truncates the log'''
+        tmp_path = self._snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((self._seq, self.knowledge), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+        self._wal.close()
+        self._wal = open(self._wal_path, "wb")
+        self._records_since_snapshot = 0
+
+    def close(self):
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+    def _append(self, kind, payload, timestamp=None, may_snapshot=True):
+        if self._wal is None:
+            raise RuntimeError("KnowledgeLog.recover() must be called before logging")
+        data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self._lock:
+            self._seq += 1
+            self._wal.write(_HEADER.pack(self._seq, kind, timestamp, len(data), zlib.crc32(data)) + data)
+            self._wal.flush()
+            if self.fsync:
+                os.fsync(self._wal.fileno())
+            self._records_since_snapshot += 1
+            if may_snapshot and self._records_since_snapshot >= self.snapshot_every:
+                self.snapshot()
+
+    def _read_records(self):
+        self._valid_length = 0
+        if not os.path.exists(self._wal_path):
+            return
+        with open(self._wal_path, "rb") as f:
+            content = f.read()
+        position = 0
+        while position + _HEADER.size <= len(content):
+            seq, kind, timestamp, length, crc = _HEADER.unpack_from(content, position)
+            data = content[position + _HEADER.size:position + _HEADER.size + length]
+            if len(data) < length or zlib.crc32(data) != crc:
+                logging.warning("ignoring a torn record at the end of the knowledge log")
+                return
+            yield seq, kind, timestamp, pickle.loads(data)
+            position += _HEADER.size + length
+            self._valid_length = position
+
+
+def _apply(knowledge, kind, timestamp, payload):
+    if kind == MONITOR:
+        knowledge.add_sample(payload, timestamp)
+    elif kind == ANALYSIS:
+        knowledge.analysis_data = payload
+    elif kind == PLAN:
+        knowledge.plan_data = payload
+    elif kind == EXECUTE:
+        knowledge.last_adaptation = payload
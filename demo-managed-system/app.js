@@ -3,6 +3,11 @@ var express = require('express');
 // Constants
 const PORT = 3000;
 const HOST = '0.0.0.0';
+// f is sampled every SAMPLE_PERIOD ms, and the last MAX_SAMPLES samples are kept for /monitor_batch
+const SAMPLE_PERIOD = 100;
+const MAX_SAMPLES = 1000;
+// Idle /monitor_stream connections get a comment every HEARTBEAT_PERIOD ms, so that clients know they are alive
+const HEARTBEAT_PERIOD = 15000;
 
 /**
  * Optimizing function:
@@ -23,17 +28,79 @@ var y = 0.0
 
 var enableRandom = true
 
+// The schemas and the adaptation options never change while the system runs. Express answers a request
+// with 304 Not Modified when its If-None-Match matches the ETag of the response, or when its If-Modified-Since
+// is not older than Last-Modified, so that clients can revalidate these documents instead of downloading them.
+var startedAt = new Date()
+startedAt.setMilliseconds(0)
+
+function revalidated(req, res, next) {
+    res.set('Cache-Control', 'no-cache')
+    res.set('Last-Modified', startedAt.toUTCString())
+    next()
+}
+
 app.get('/', function (req, res) {
     res.send("alive")
 });
 
-app.get('/monitor', function (req, res) {
+function monitor() {
     var rnd = 1
     if (enableRandom) {
         rnd = Math.random()
     }
-    res.send(JSON.stringify({
+    return {
         f: rnd * ( 0.4 + -1 * (0.3 * (1 - x) * x + y * (2 - y) * 0.3 + x * y / 100))
+    }
+}
+
+// Samples numbered by a cursor: samples[i] has the cursor nextCursor - samples.length + i
+var samples = []
+var nextCursor = 0
+// Open /monitor_stream responses, each sample is pushed to
+var streams = new Set()
+
+function sendEvent(res, cursor, sample) {
+    res.write('id: ' + cursor + '\ndata: ' + JSON.stringify(sample) + '\n\n')
+}
+
+setInterval(function () {
+    var sample = {time: Date.now() / 1000, data: monitor()}
+    samples.push(sample)
+    if (samples.length > MAX_SAMPLES) {
+        samples.shift()
+    }
+    streams.forEach(function (res) {
+        sendEvent(res, nextCursor, sample)
+    })
+    nextCursor++
+}, SAMPLE_PERIOD);
+
+setInterval(function () {
+    streams.forEach(function (res) {
+        res.write(': keep-alive\n\n')
+    })
+}, HEARTBEAT_PERIOD);
+
+app.get('/monitor', function (req, res) {
+    res.set('Cache-Control', 'no-store')
+    res.send(JSON.stringify(monitor()));
+});
+
+app.get('/monitor_batch', function (req, res) {
+    res.set('Cache-Control', 'no-store')
+    var since = parseInt(req.query.since) || 0
+    if (since > nextCursor) {
+        // The cursor was given by an earlier run
+        since = 0
+    }
+    var first = nextCursor - samples.length
+    var start = Math.max(since, first)
+    res.send(JSON.stringify({
+        cursor: nextCursor,
+        time: Date.now() / 1000,
+        dropped: start - since,
+        samples: samples.slice(start - first)
     }));
 });
 
@@ -46,7 +113,7 @@ app.put('/execute', function (req, res) {
     res.send("ok")
 });
 
-app.get('/monitor_schema', function (req, res) {
+app.get('/monitor_schema', revalidated, function (req, res) {
     res.send(JSON.stringify({
         type: "object",
         properties: {
@@ -57,7 +124,30 @@ app.get('/monitor_schema', function (req, res) {
     }));
 });
 
-app.get('/execute_schema', function (req, res) {
+app.get('/monitor_stream', function (req, res) {
+    res.set({
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-store',
+        'Connection': 'keep-alive'
+    })
+    res.flushHeaders()
+    res.write('retry: 1000\n\n')
+    // A reconnecting client resumes after the last event it received
+    var lastEventId = parseInt(req.get('Last-Event-ID'))
+    if (!isNaN(lastEventId)) {
+        var since = lastEventId + 1 > nextCursor ? 0 : lastEventId + 1
+        var first = nextCursor - samples.length
+        for (var cursor = Math.max(since, first); cursor < nextCursor; cursor++) {
+            sendEvent(res, cursor, samples[cursor - first])
+        }
+    }
+    streams.add(res)
+    req.on('close', function () {
+        streams.delete(res)
+    })
+});
+
+app.get('/execute_schema', revalidated, function (req, res) {
     res.send(JSON.stringify({
         type: "object",
         properties: {
@@ -71,7 +161,7 @@ app.get('/execute_schema', function (req, res) {
     }));
 });
 
-app.get('/adaptation_options', function (req, res) {
+app.get('/adaptation_options', revalidated, function (req, res) {
     res.send(JSON.stringify({
         x: {
             "start": -4.0,
@@ -86,7 +176,7 @@ app.get('/adaptation_options', function (req, res) {
     }));
 });
 
-app.get('/adaptation_options_schema', function (req, res) {
+app.get('/adaptation_options_schema', revalidated, function (req, res) {
     res.send(JSON.stringify({
         type: "object",
         properties: {
@@ -1,6 +1,10 @@
 from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager
+from UPISAS.exceptions import ServerNotReachable
 from UPISAS.exemplar import Exemplar
 from UPISAS.exemplars.swim import SWIM
+from UPISAS.resilience import ResilientTransport
+from UPISAS.transport import HTTPTransport
+import logging
 import signal
 import sys
 import time
@@ -13,18 +17,19 @@ if __name__ == '__main__':
     time.sleep(3)
 
     try:
-        strategy = ReactiveAdaptationManager(exemplar)
+        strategy = ReactiveAdaptationManager(exemplar, ResilientTransport(HTTPTransport(), deadlines={"monitor": 5.0}))
 
-        strategy.get_monitor_schema()
-        strategy.get_adaptation_options_schema()
-        strategy.get_execute_schema()
+        strategy.prefetch_schemas()
 
         while True:
             input("Try to adapt?")
-            strategy.monitor(verbose=True)
-            if strategy.analyze():
-                if strategy.plan():
-                    strategy.execute()
+            try:
+                strategy.monitor(verbose=True)
+                if strategy.analyze():
+                    if strategy.plan():
+                        strategy.execute()
+            except ServerNotReachable as e:
+                logging.warning(f"SWIM could not be reached, try again later: {e!r}")
             
     except (Exception, KeyboardInterrupt) as e:
         print(str(e))